@@ -0,0 +1,186 @@
+# admin_grid.py
+
+from datetime import datetime, timedelta
+
+from flask import request, url_for
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import User, Category, Product, Order
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+ORDER_STATUSES = ['Pending', 'Processing', 'Shipped', 'Delivered', 'Cancelled']
+
+# Filter values arrive as query-string text; parse_date accepts YYYY-MM-DD
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def parse_choice(choices):
+    def parse(value):
+        if value not in choices:
+            raise ValueError(f'Unknown value: {value}')
+        return value
+    return parse
+
+# One admin list: a base query (with its eager loading), the sortable columns and the filters.
+# filters maps a query-string name to (parse, apply): parse turns the text into a value or raises
+# ValueError, apply(query, value) narrows the query. Invalid filter values are ignored.
+class AdminGrid:
+    def __init__(self, base_query, sort_columns, default_sort, primary_key, filters=None, serialize=None):
+        self.base_query = base_query  # Called per request, returns a fresh query
+        self.sort_columns = sort_columns
+        self.default_sort = default_sort  # Column name, '-' prefix for descending
+        self.primary_key = primary_key  # Tie-breaker that makes page boundaries stable
+        self.filters = filters or {}
+        self.serialize = serialize
+
+    def page(self, args):
+        query = self.base_query()
+        active_filters = {}
+        for name, (parse, apply) in self.filters.items():
+            raw = (args.get(name) or '').strip()
+            if not raw:
+                continue
+            try:
+                value = parse(raw)
+            except ValueError:
+                continue
+            query = apply(query, value)
+            active_filters[name] = raw
+
+        sort = args.get('sort') or self.default_sort
+        if sort.lstrip('-') not in self.sort_columns:
+            sort = self.default_sort
+        column = self.sort_columns[sort.lstrip('-')]
+        if sort.startswith('-'):
+            query = query.order_by(column.desc(), self.primary_key.desc())
+        else:
+            query = query.order_by(column.asc(), self.primary_key.asc())
+
+        per_page = min(max(args.get('per_page', DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+        pagination = query.paginate(page=args.get('page', 1, type=int), per_page=per_page, error_out=False)
+        return GridPage(self, pagination, sort, active_filters, request.endpoint)
+
+class GridPage:
+    def __init__(self, grid, pagination, sort, filters, endpoint):
+        self.grid = grid
+        self.pagination = pagination
+        self.items = pagination.items
+        self.sort = sort
+        self.filters = filters
+        self.endpoint = endpoint
+
+    # URL of this grid with the current sort and filters, overridden by `changes`
+    def url(self, **changes):
+        args = dict(self.filters, sort=self.sort, page=self.pagination.page, per_page=self.pagination.per_page)
+        args.update(changes)
+        return url_for(self.endpoint, **{name: value for name, value in args.items() if value is not None})
+
+    # Sorting by the current column flips its direction; a new column starts ascending
+    def sort_url(self, column):
+        return self.url(sort=column[1:] if self.sort == '-' + column else ('-' + column if self.sort == column else column),
+                        page=1)
+
+    def sort_indicator(self, column):
+        if self.sort == column:
+            return '▲'
+        if self.sort == '-' + column:
+            return '▼'
+        return ''
+
+    def to_dict(self):
+        pagination = self.pagination
+        return {
+            'items': [self.grid.serialize(item) for item in self.items],
+            'page': pagination.page,
+            'per_page': pagination.per_page,
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'sort': self.sort,
+            'filters': self.filters,
+            'next': self.url(page=pagination.next_num, format='json') if pagination.has_next else None,
+            'prev': self.url(page=pagination.prev_num, format='json') if pagination.has_prev else None,
+        }
+
+# JSON when asked for with ?format=json or an Accept header preferring it
+def wants_json():
+    return request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
+
+product_grid = AdminGrid(
+    base_query=lambda: Product.query.options(joinedload(Product.category)),
+    sort_columns={'id': Product.id, 'name': Product.name, 'price': Product.price},
+    default_sort='name',
+    primary_key=Product.id,
+    filters={
+        'category': (int, lambda query, value: query.filter(Product.category_id == value)),
+        'q': (str, lambda query, value: query.filter(Product.name.contains(value, autoescape=True))),
+    },
+    serialize=lambda product: {
+        'id': product.id,
+        'name': product.name,
+        'price': product.price,
+        'category_id': product.category_id,
+        'category': product.category.name if product.category else None,
+        'inventory_count': product.inventory_count,
+    },
+)
+
+order_grid = AdminGrid(
+    base_query=lambda: Order.query.options(joinedload(Order.user)),
+    sort_columns={'id': Order.id, 'order_date': Order.order_date, 'total_amount': Order.total_amount, 'status': Order.status},
+    default_sort='-order_date',
+    primary_key=Order.id,
+    filters={
+        'status': (parse_choice(ORDER_STATUSES), lambda query, value: query.filter(Order.status == value)),
+        'date_from': (parse_date, lambda query, value: query.filter(Order.order_date >= value)),
+        # Inclusive: the whole of the end day
+        'date_to': (parse_date, lambda query, value: query.filter(Order.order_date < value + timedelta(days=1))),
+        'user': (int, lambda query, value: query.filter(Order.user_id == value)),
+    },
+    serialize=lambda order: {
+        'id': order.id,
+        'user_id': order.user_id,
+        'username': order.user.username if order.user else None,
+        'order_date': order.order_date.isoformat() if order.order_date else None,
+        'status': order.status,
+        'total_amount': order.total_amount,
+    },
+)
+
+user_grid = AdminGrid(
+    base_query=lambda: User.query,
+    sort_columns={'id': User.id, 'username': User.username, 'email': User.email},
+    default_sort='username',
+    primary_key=User.id,
+    filters={
+        # roles is a comma-separated list; match whole role names only
+        'role': (str, lambda query, value: query.filter(
+            (',' + User.roles + ',').contains(f',{value},', autoescape=True))),
+        'q': (str, lambda query, value: query.filter(db.or_(User.username.contains(value, autoescape=True),
+                                                            User.email.contains(value, autoescape=True)))),
+    },
+    serialize=lambda user: {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'roles': [role for role in user.roles.split(',') if role],
+    },
+)
+
+category_grid = AdminGrid(
+    base_query=lambda: Category.query.options(joinedload(Category.parent)),
+    sort_columns={'id': Category.id, 'name': Category.name},
+    default_sort='name',
+    primary_key=Category.id,
+    filters={
+        'parent': (int, lambda query, value: query.filter(Category.parent_id == value)),
+        'q': (str, lambda query, value: query.filter(Category.name.contains(value, autoescape=True))),
+    },
+    serialize=lambda category: {
+        'id': category.id,
+        'name': category.name,
+        'parent_id': category.parent_id,
+        'parent': category.parent.name if category.parent else None,
+    },
+)
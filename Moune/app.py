@@ -1,58 +1,84 @@
 # app.py
-from flask import Flask, render_template, redirect, url_for, flash, request, session
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Flask, Response, current_app, jsonify, render_template, redirect, url_for, flash, request, session
 from functools import wraps
 from config import Config
 from extensions import db
-from models import User, Category, Product, Order, OrderItem, Cart, CartItem, Warehouse, Inventory
+from models import User, Category, Product, Order, OrderItem, Cart, CartItem, Warehouse, Inventory, ProductStock, StockThreshold, SalesDaily
 from forms import ProductForm, CategoryForm, RegistrationForm, LoginForm, UpdateCartForm, AdminUserForm
+from stock import check_product_stock, rebuild_product_stock
+from sales_report import record_status_change, rebuild_sales_rollups, sales_summary
+from search import search_catalog, rebuild_search_index, search_index_size
+from catalog import paginate_products
+from catalog_api import (API_VERSION, PRODUCT_FIELDS, DEFAULT_PRODUCT_FIELDS, CATEGORY_FIELDS, ApiError, json_response,
+                         error_response, parse_fields, parse_ids, products_by_ids, product_page, product_by_id, categories)
+from category_cache import get_category_tree, invalidate_category_cache
+from identity import ADMIN_ROLES, get_current_user
+from audit import init_audit_log, log_model_insert, log_model_update, log_model_delete
+from log_reader import read_log_page
+from checkout import place_order, CheckoutError
+from cart_batch import apply_cart_operations, CartBatchError
+from inventory_report import low_stock_query, stock_grid_query, set_threshold, list_thresholds
+from migrations import upgrade_schema, current_version
+from engine_profile import init_engine_profile, read_only
+from metrics import init_metrics, registry as metrics_registry
+from warmup import init_template_cache, warm_up
+from view_registry import ViewRegistry
+from admin_grid import product_grid, order_grid, user_grid, category_grid, wants_json, ORDER_STATUSES
+from passwords import init_passwords, PasswordHasherBusy
+from page_cache import init_page_cache, cached_page, listing_key, product_key, invalidate_products, invalidate_listings
 
 import os
+import time
+import click
 import logging
 from logging.handlers import RotatingFileHandler
 from sqlalchemy import event
+from sqlalchemy.orm import joinedload
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Initialize SQLAlchemy
-db.init_app(app)
-
-# Ensure the logs directory exists
-if not os.path.exists('logs'):
-    os.mkdir('logs')
-
-# Configure Main Logger
 main_logger = logging.getLogger('main_logger')
 main_logger.setLevel(logging.INFO)
 
-main_handler = RotatingFileHandler('logs/moune_ecommerce.log', maxBytes=10240, backupCount=10)
-main_formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
-main_handler.setFormatter(main_formatter)
-main_logger.addHandler(main_handler)
-
-# Configure Model Logger
-model_logger = logging.getLogger('model_logger')
-model_logger.setLevel(logging.INFO)
-
-model_handler = RotatingFileHandler('logs/models.log', maxBytes=10240, backupCount=10)
-model_formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
-model_handler.setFormatter(model_formatter)
-model_logger.addHandler(model_handler)
-
-# Logging Functions for All Models
-def log_model_insert(mapper, connection, target):
-    model_logger.info(f'Inserted {target.__class__.__name__}: {target}')
-
-def log_model_update(mapper, connection, target):
-    model_logger.info(f'Updated {target.__class__.__name__}: {target}')
-
-def log_model_delete(mapper, connection, target):
-    model_logger.info(f'Deleted {target.__class__.__name__}: {target}')
+# Routes, error handlers and CLI commands below are attached to each app by create_app()
+views = ViewRegistry()
+
+# Build and configure an application. Importing this module has no side effects;
+# the schema and sample data are created by `flask init-db`.
+def create_app(config_class=Config, **overrides):
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    app.config.update(overrides)
+    init_template_cache(app)
+    init_page_cache(app)
+    init_passwords(app)
+
+    # Initialize SQLAlchemy
+    db.init_app(app)
+    init_engine_profile(app)
+
+    # Per-request SQL, latency and render-time metrics
+    init_metrics(app)
+
+    # Ensure the logs directory exists
+    if not os.path.exists('logs'):
+        os.mkdir('logs')
+
+    # Configure Main Logger (once per process)
+    if not main_logger.handlers:
+        main_handler = RotatingFileHandler('logs/moune_ecommerce.log', maxBytes=10240, backupCount=10)
+        main_formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
+        main_handler.setFormatter(main_formatter)
+        main_logger.addHandler(main_handler)
+
+    # Configure Model Audit Log (JSON lines, written after commit by a background thread)
+    init_audit_log(app.config)
+
+    views.init_app(app)
+    if app.config.get('WARM_UP'):
+        warm_up(app)
+    return app
 
 # List of all models to attach logging
-models = [User, Category, Product, Order, OrderItem, Cart, CartItem, Warehouse, Inventory]
+models = [User, Category, Product, Order, OrderItem, Cart, CartItem, Warehouse, Inventory, StockThreshold]
 
 # Attach Event Listeners to All Models
 for model in models:
@@ -60,25 +86,6 @@ for model in models:
     event.listen(model, 'after_update', log_model_update)
     event.listen(model, 'after_delete', log_model_delete)
 
-# Roles for users
-ROLE_PERMISSIONS = {
-    'super_admin': ['manage_products', 'manage_orders', 'manage_inventory', 'manage_categories', 'manage_users'],
-    'product_manager': ['manage_products'],
-    'order_manager': ['manage_orders'],
-    'inventory_manager': ['manage_inventory'],
-    'category_manager': ['manage_categories'],
-    'user_manager': ['manage_users'],
-}
-
-ADMIN_ROLES = [
-    'super_admin',
-    'product_manager',
-    'order_manager',
-    'inventory_manager',
-    'category_manager',
-    'user_manager'
-]
-
 # Decorators
 
 def customer_login_required(f):
@@ -97,16 +104,12 @@ def permission_required(permission):
             if not session.get('admin_logged_in'):
                 flash('Please log in as admin first.', 'danger')
                 return redirect(url_for('admin_login'))
-            user = User.query.get(session['user_id'])
+            user = get_current_user()
             if not user:
                 session.clear()
                 flash('User not found.', 'danger')
                 return redirect(url_for('admin_login'))
-            user_roles = user.roles.split(',')
-            user_permissions = set()
-            for role in user_roles:
-                user_permissions.update(ROLE_PERMISSIONS.get(role, []))
-            if 'super_admin' in user_roles or permission in user_permissions:
+            if user.is_super_admin or permission in user.permissions:
                 return f(*args, **kwargs)
             else:
                 flash('You do not have permission to access this page.', 'danger')
@@ -128,15 +131,14 @@ def admin_login_required(f):
             flash('User ID missing in session.', 'danger')
             return redirect(url_for('admin_login'))
         
-        # Fetch the user from the database
-        user = User.query.get(user_id)
+        # Fetch the user once per request (shared with the other decorators via g)
+        user = get_current_user()
         if not user:
             flash('User not found.', 'danger')
             return redirect(url_for('admin_login'))
         
         # Check if the user has any admin roles
-        user_roles = user.roles.split(',')
-        if not any(role in ADMIN_ROLES for role in user_roles):
+        if not user.is_admin:
             flash('Admin access required.', 'danger')
             return redirect(url_for('admin_login'))
         
@@ -150,8 +152,8 @@ def superadmin_required(f):
         if not user_id:
             flash('Please log in first.', 'danger')
             return redirect(url_for('admin_login'))
-        user = User.query.get(user_id)
-        if not user or 'super_admin' not in user.roles.split(','):
+        user = get_current_user()
+        if not user or not user.is_super_admin:
             flash('Superadmin access required.', 'danger')
             return redirect(url_for('admin_login'))
         return f(*args, **kwargs)
@@ -159,11 +161,11 @@ def superadmin_required(f):
 
 # Routes
 
-@app.route('/')
+@views.route('/')
 def home():
     return render_template('home.html')  # Ensure you have a home.html template
 
-@app.route('/register', methods=['GET', 'POST'])
+@views.route('/register', methods=['GET', 'POST'])
 def customer_register():
     form = RegistrationForm()
     if form.validate_on_submit():
@@ -178,6 +180,10 @@ def customer_register():
             flash(str(e), 'danger')  # Display the error message to the user
             main_logger.debug(f'Registration failed for {user.username}: {str(e)}')
             return render_template('customer_register.html', form=form)
+        except PasswordHasherBusy as e:
+            flash(str(e), 'danger')
+            main_logger.warning('Registration rejected: password hashing pool is full.')
+            return render_template('customer_register.html', form=form), 503, {'Retry-After': '1'}
         
         db.session.add(user)
         db.session.commit()
@@ -187,12 +193,19 @@ def customer_register():
     return render_template('customer_register.html', form=form)
 
 # Customer Login Route
-@app.route('/login', methods=['GET', 'POST'])
+@views.route('/login', methods=['GET', 'POST'])
 def customer_login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
-        if user and 'customer' in user.roles.split(',') and user.check_password(form.password.data):
+        try:
+            authenticated = user and 'customer' in user.roles.split(',') and user.check_password(form.password.data)
+        except PasswordHasherBusy as e:
+            flash(str(e), 'danger')
+            main_logger.warning('Customer login rejected: password hashing pool is full.')
+            return render_template('customer_login.html', form=form), 503, {'Retry-After': '1'}
+        if authenticated:
+            db.session.commit()  # Keeps a rehashed password
             session.permanent = True  # Make the session persistent
             session['user_id'] = user.id
             session['customer_logged_in'] = True
@@ -204,7 +217,7 @@ def customer_login():
     return render_template('customer_login.html', form=form)
 
 # Admin Login Route
-@app.route('/admin/login', methods=['GET', 'POST'])
+@views.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     form = LoginForm()
     if form.validate_on_submit():
@@ -219,7 +232,14 @@ def admin_login():
         user_roles = user.roles.split(',') if user else []
         is_admin = any(role in ADMIN_ROLES for role in user_roles)
         
-        if user and user.check_password(password) and is_admin:
+        try:
+            authenticated = user and is_admin and user.check_password(password)
+        except PasswordHasherBusy as e:
+            flash(str(e), 'danger')
+            main_logger.warning('Admin login rejected: password hashing pool is full.')
+            return render_template('admin_login.html', form=form), 503, {'Retry-After': '1'}
+        if authenticated:
+            db.session.commit()  # Keeps a rehashed password
             session.permanent = True  # Make the session persistent
             session['user_id'] = user.id
             session['admin_logged_in'] = True
@@ -233,22 +253,20 @@ def admin_login():
     return render_template('admin_login.html', form=form)
 
 # Admin Logout Route
-@app.route('/admin/logout')
+@views.route('/admin/logout')
 def admin_logout():
     user_id = session.pop('user_id', None)
     admin_logged_in = session.pop('admin_logged_in', None)
     admin_user = session.pop('admin_user', None)
     
-    if user_id:
-        user = User.query.get(user_id)
-        if user:
-            main_logger.info(f'Admin {user.username} logged out.')
+    if user_id and admin_user:
+        main_logger.info(f'Admin {admin_user} logged out.')
     
     flash('You have been logged out.', 'info')
     return redirect(url_for('home'))
 
 # Customer Logout Route
-@app.route('/customer/logout')
+@views.route('/customer/logout')
 @customer_login_required
 def customer_logout():
     session.pop('user_id', None)
@@ -259,29 +277,28 @@ def customer_logout():
     return redirect(url_for('customer_login'))
 
 # Customer Dashboard
-@app.route('/customer/dashboard')
+@views.route('/customer/dashboard')
 @customer_login_required
 def customer_dashboard():
-    user = User.query.filter_by(username=session['customer_user']).first()
-    if not user or 'customer' not in user.roles.split(','):
+    identity = get_current_user()
+    if not identity or 'customer' not in identity.roles:
         flash('Access denied.', 'danger')
         return redirect(url_for('home'))
+    user = db.session.get(User, identity.id)
     return render_template('customer_dashboard.html', user=user)
 
 # Admin Dashboard
-@app.route('/admin/dashboard')
+@views.route('/admin/dashboard')
 @admin_login_required
 def admin_dashboard():
-    user = User.query.get(session['user_id'])
-    user_roles = user.roles.split(',')
-    user_permissions = set()
-    for role in user_roles:
-        user_permissions.update(ROLE_PERMISSIONS.get(role, []))
-    return render_template('admin_dashboard.html', username=user.username, roles=user_roles, permissions=user_permissions)
+    user = get_current_user()
+    sales = sales_summary() if 'manage_orders' in user.permissions else None
+    return render_template('admin_dashboard.html', username=user.username, roles=sorted(user.roles),
+                           permissions=user.permissions, sales=sales)
 
 # Remove duplicate /logout route
 # Commented out to avoid conflicts
-# @app.route('/logout')
+# @views.route('/logout')
 # @customer_login_required
 # def customer_logout():
 #     session.clear()
@@ -289,7 +306,7 @@ def admin_dashboard():
 #     return redirect(url_for('customer_login'))
 
 # Create Super Admin Route (should be removed after initial setup)
-@app.route('/create_super_admin')
+@views.route('/create_super_admin')
 def create_super_admin():
     admin_email = 'admin@example.com'
     admin_username = 'admin'
@@ -328,28 +345,35 @@ def create_super_admin():
     return redirect(url_for('admin_login'))
 
 # View Logs Route
-@app.route('/admin/view_logs')
+@views.route('/admin/view_logs')
 @superadmin_required
 def view_logs():
-    try:
-        with open('logs/models.log', 'r') as file:
-            logs = file.read()
-    except FileNotFoundError:
-        logs = "No logs available."
-    return render_template('view_logs.html', logs=logs)
+    page = request.args.get('page', 1, type=int)
+    model = request.args.get('model') or None
+    operation = request.args.get('op') or None
+    log_page = read_log_page(current_app.config['AUDIT_LOG_PATH'], page=page, per_page=100, model=model, operation=operation)
+    return render_template('view_logs.html', log_page=log_page, model=model, op=operation,
+                           model_names=[m.__name__ for m in models], operations=['insert', 'update', 'delete', 'upsert'])
+
+@views.route('/admin/metrics')
+@superadmin_required
+def admin_metrics():
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
 
 # Admin Product Management Routes
-@app.route('/admin/products')
+@views.route('/admin/products')
 @permission_required('manage_products')
 def admin_products():
-    products = Product.query.all()
-    return render_template('admin_products.html', products=products)
+    grid = product_grid.page(request.args)
+    if wants_json():
+        return jsonify(grid.to_dict())
+    return render_template('admin_products.html', grid=grid, categories=get_category_tree().categories)
 
-@app.route('/admin/products/add', methods=['GET', 'POST'])
+@views.route('/admin/products/add', methods=['GET', 'POST'])
 @permission_required('manage_products')
 def admin_add_product():
     form = ProductForm()
-    form.category_id.choices = [(c.id, c.name) for c in Category.query.order_by('name')]
+    form.category_id.choices = get_category_tree().choices()
     if form.validate_on_submit():
         product = Product(
             name=form.name.data,
@@ -359,44 +383,52 @@ def admin_add_product():
         )
         db.session.add(product)
         db.session.commit()
+        invalidate_products([product.id], [product.category_id])
         
         flash('Product added successfully! Please assign inventory levels.', 'success')
         main_logger.info(f'Product added: {product.name} by Admin ID {session["user_id"]}')
         return redirect(url_for('admin_products'))
     return render_template('admin_product_form.html', form=form, action='Add')
 
-@app.route('/admin/products/edit/<int:product_id>', methods=['GET', 'POST'])
+@views.route('/admin/products/edit/<int:product_id>', methods=['GET', 'POST'])
 @permission_required('manage_products')
 def admin_edit_product(product_id):
     product = Product.query.get_or_404(product_id)
     form = ProductForm(obj=product)
-    form.category_id.choices = [(c.id, c.name) for c in Category.query.order_by('name')]
+    form.category_id.choices = get_category_tree().choices()
     if form.validate_on_submit():
+        old_category_id = product.category_id
         form.populate_obj(product)
         db.session.commit()
+        invalidate_products([product.id], [old_category_id, product.category_id])
         flash('Product updated successfully!', 'success')
         main_logger.info(f'Product updated: {product.name} by Admin ID {session["user_id"]}')
         return redirect(url_for('admin_products'))
     return render_template('admin_product_form.html', form=form, action='Edit')
 
-@app.route('/admin/products/delete/<int:product_id>', methods=['POST'])
+@views.route('/admin/products/delete/<int:product_id>', methods=['POST'])
 @permission_required('manage_products')
 def admin_delete_product(product_id):
     product = Product.query.get_or_404(product_id)
+    category_id = product.category_id
     db.session.delete(product)
     db.session.commit()
+    invalidate_products([product_id], [category_id])
     flash('Product deleted successfully!', 'success')
     main_logger.info(f'Product deleted: {product.name} by Admin ID {session["user_id"]}')
     return redirect(url_for('admin_products'))
 
-import csv
 from io import TextIOWrapper
-from forms import BulkUploadForm
+from forms import BulkUploadForm, BulkInventoryForm
+from bulk_import import import_products, DEFAULT_BATCH_SIZE
+from inventory_import import import_inventory, FORMATS as INVENTORY_FORMATS, MODES as INVENTORY_MODES, \
+    DEFAULT_BATCH_SIZE as INVENTORY_BATCH_SIZE
 
-@app.route('/admin/products/bulk_upload', methods=['GET', 'POST'])
+@views.route('/admin/products/bulk_upload', methods=['GET', 'POST'])
 @permission_required('manage_products')
 def admin_bulk_upload():
     form = BulkUploadForm()
+    report = None
     if form.validate_on_submit():
         file = form.csv_file.data
         if not file:
@@ -408,72 +440,38 @@ def admin_bulk_upload():
             return redirect(request.url)
 
         try:
+            # Expected CSV columns: name, description, price, category
             stream = TextIOWrapper(file.stream, encoding='utf-8')
-            csv_reader = csv.DictReader(stream)
-            products_added = 0
-            for row in csv_reader:
-                # Expected CSV columns: name, description, price, category
-                name = row.get('name')
-                description = row.get('description')
-                price = row.get('price')
-                category_name = row.get('category')
-                
-                if not name or not description or not price or not category_name:
-                    main_logger.warning(f'Skipping row with missing data: {row}')
-                    continue
-                
-                try:
-                    price = float(price)
-                except ValueError:
-                    main_logger.warning(f'Invalid price for product "{name}": {price}')
-                    continue
-                
-                category = Category.query.filter_by(name=category_name).first()
-                if not category:
-                    # Optionally, create the category if it doesn't exist
-                    category = Category(name=category_name)
-                    db.session.add(category)
-                    db.session.commit()
-                    main_logger.info(f'Created new category "{category_name}"')
-                
-                # Check if the product already exists to avoid duplicates
-                existing_product = Product.query.filter_by(name=name, category_id=category.id).first()
-                if existing_product:
-                    main_logger.warning(f'Product "{name}" in category "{category_name}" already exists. Skipping.')
-                    continue
-                
-                product = Product(
-                    name=name,
-                    description=description,
-                    price=price,
-                    category_id=category.id
-                )
-                db.session.add(product)
-                products_added += 1
-            
-            db.session.commit()
-            flash(f'Successfully added {products_added} products.', 'success')
-            main_logger.info(f'Bulk uploaded {products_added} products via CSV by Admin ID {session["user_id"]}')
-            return redirect(url_for('admin_products'))
-        
+            report = import_products(stream, dry_run=form.dry_run.data)
         except Exception as e:
             main_logger.error(f'Error processing CSV upload: {str(e)}')
             flash('An error occurred while processing the file.', 'danger')
             return redirect(request.url)
+
+        if not report.dry_run:
+            invalidate_listings()
+        for line, message in report.errors[:10]:
+            main_logger.warning(f'Bulk upload row {line} skipped: {message}')
+        flash(report.summary(), 'warning' if report.error_count else 'success')
+        if not report.dry_run:
+            main_logger.info(f'Bulk upload by Admin ID {session["user_id"]}: {report.summary()}')
     
-    return render_template('admin_bulk_upload.html', form=form)
+    return render_template('admin_bulk_upload.html', form=form, report=report)
+
 # Admin Category Management Routes
-@app.route('/admin/categories')
+@views.route('/admin/categories')
 @permission_required('manage_categories')
 def admin_categories():
-    categories = Category.query.order_by('name').all()
-    return render_template('admin_categories.html', categories=categories)
+    grid = category_grid.page(request.args)
+    if wants_json():
+        return jsonify(grid.to_dict())
+    return render_template('admin_categories.html', grid=grid)
 
-@app.route('/admin/categories/add', methods=['GET', 'POST'])
+@views.route('/admin/categories/add', methods=['GET', 'POST'])
 @permission_required('manage_categories')
 def admin_add_category():
     form = CategoryForm()
-    form.parent_id.choices = [(0, 'None')] + [(c.id, c.name) for c in Category.query.order_by('name')]
+    form.parent_id.choices = [(0, 'None')] + get_category_tree().choices()
     if form.validate_on_submit():
         parent_id = form.parent_id.data if form.parent_id.data != 0 else None
         category = Category(
@@ -482,55 +480,63 @@ def admin_add_category():
         )
         db.session.add(category)
         db.session.commit()
+        invalidate_category_cache()
         flash('Category added successfully!', 'success')
         main_logger.info(f'Category added: {category.name} by Admin ID {session["user_id"]}')
         return redirect(url_for('admin_categories'))
     return render_template('admin_category_form.html', form=form, action='Add')
 
-@app.route('/admin/categories/edit/<int:category_id>', methods=['GET', 'POST'])
+@views.route('/admin/categories/edit/<int:category_id>', methods=['GET', 'POST'])
 @permission_required('manage_categories')
 def admin_edit_category(category_id):
     category = Category.query.get_or_404(category_id)
     form = CategoryForm(obj=category)
-    form.parent_id.choices = [(0, 'None')] + [(c.id, c.name) for c in Category.query.order_by('name') if c.id != category.id]
+    form.parent_id.choices = [(0, 'None')] + get_category_tree().choices(exclude_id=category.id)
     if form.validate_on_submit():
         category.name = form.name.data
         category.parent_id = form.parent_id.data if form.parent_id.data != 0 else None
         db.session.commit()
+        invalidate_category_cache()
+        invalidate_listings([category.id])
         flash('Category updated successfully!', 'success')
         main_logger.info(f'Category updated: {category.name} by Admin ID {session["user_id"]}')
         return redirect(url_for('admin_categories'))
     return render_template('admin_category_form.html', form=form, action='Edit')
 
-@app.route('/admin/categories/delete/<int:category_id>', methods=['POST'])
+@views.route('/admin/categories/delete/<int:category_id>', methods=['POST'])
 @permission_required('manage_categories')
 def admin_delete_category(category_id):
     category = Category.query.get_or_404(category_id)
     db.session.delete(category)
     db.session.commit()
+    invalidate_category_cache()
+    invalidate_listings()
     flash('Category deleted successfully!', 'success')
     main_logger.info(f'Category deleted: {category.name} by Admin ID {session["user_id"]}')
     return redirect(url_for('admin_categories'))
 
 # Admin Order Management Routes
-@app.route('/admin/orders')
+@views.route('/admin/orders')
 @permission_required('manage_orders')
 def admin_orders():
-    orders = Order.query.order_by(Order.order_date.desc()).all()
-    return render_template('admin_orders.html', orders=orders)
+    grid = order_grid.page(request.args)
+    if wants_json():
+        return jsonify(grid.to_dict())
+    return render_template('admin_orders.html', grid=grid, statuses=ORDER_STATUSES)
 
-@app.route('/admin/orders/<int:order_id>')
+@views.route('/admin/orders/<int:order_id>')
 @permission_required('manage_orders')
 def admin_order_detail(order_id):
     order = Order.query.get_or_404(order_id)
     return render_template('admin_order_detail.html', order=order)
 
-@app.route('/admin/orders/<int:order_id>/update', methods=['POST'])
+@views.route('/admin/orders/<int:order_id>/update', methods=['POST'])
 @permission_required('manage_orders')
 def admin_update_order_status(order_id):
     order = Order.query.get_or_404(order_id)
     new_status = request.form.get('status')
-    if new_status in ['Pending', 'Processing', 'Shipped', 'Delivered', 'Cancelled']:
+    if new_status in ORDER_STATUSES:
+        record_status_change(db.session.connection(), order.id, order.status, new_status)
         order.status = new_status
         db.session.commit()
         flash('Order status updated successfully!', 'success')
@@ -540,14 +546,16 @@ def admin_update_order_status(order_id):
     return redirect(url_for('admin_order_detail', order_id=order_id))
 
 # Admin User Management Routes
-@app.route('/admin/users')
+@views.route('/admin/users')
 @superadmin_required
 @permission_required('manage_users')
 def admin_users():
-    users = User.query.all()
-    return render_template('admin_users.html', users=users)
+    grid = user_grid.page(request.args)
+    if wants_json():
+        return jsonify(grid.to_dict())
+    return render_template('admin_users.html', grid=grid, roles=ADMIN_ROLES + ['customer'])
 
-@app.route('/admin/users/add', methods=['GET', 'POST'])
+@views.route('/admin/users/add', methods=['GET', 'POST'])
 @superadmin_required
 @permission_required('manage_users')
 def admin_add_user():
@@ -560,7 +568,7 @@ def admin_add_user():
         )
         try:
             user.set_password(form.password.data)
-        except ValueError as e:
+        except (ValueError, PasswordHasherBusy) as e:
             flash(str(e), 'danger')
             main_logger.debug(f'Failed to add user {user.username}: {str(e)}')
             return render_template('admin_user_form.html', form=form, action='Add')
@@ -571,7 +579,7 @@ def admin_add_user():
         return redirect(url_for('admin_users'))
     return render_template('admin_user_form.html', form=form, action='Add')
 
-@app.route('/admin/users/delete/<int:user_id>', methods=['POST'])
+@views.route('/admin/users/delete/<int:user_id>', methods=['POST'])
 @superadmin_required
 @permission_required('manage_users')
 def admin_delete_user(user_id):
@@ -587,13 +595,13 @@ def admin_delete_user(user_id):
 
 # Shopping Cart Functionality
 
-@app.route('/add_to_cart/<int:product_id>', methods=['POST'])
+@views.route('/add_to_cart/<int:product_id>', methods=['POST'])
 def add_to_cart(product_id):
     if not session.get('customer_logged_in'):
         flash('Please log in to add items to your cart.', 'danger')
         return redirect(url_for('customer_login'))
     product = Product.query.get_or_404(product_id)
-    user = User.query.filter_by(username=session['customer_user']).first()
+    user = get_current_user()
 
     # Get the quantity from the form
     try:
@@ -604,7 +612,7 @@ def add_to_cart(product_id):
         quantity = 1
 
     # Get total quantity already in cart
-    cart = user.cart
+    cart = Cart.query.filter_by(user_id=user.id).first()
     existing_cart_item = None
     existing_quantity = 0
     if cart:
@@ -628,7 +636,7 @@ def add_to_cart(product_id):
     if not cart:
         cart = Cart(user_id=user.id)
         db.session.add(cart)
-        db.session.commit()
+        db.session.flush()  # Assigns cart.id; committed with the item below
 
     if existing_cart_item:
         existing_cart_item.quantity += quantity
@@ -640,12 +648,12 @@ def add_to_cart(product_id):
     flash(f'Added {quantity} units of {product.name} to your cart.', 'success')
     return redirect(url_for('view_cart'))
 
-@app.route('/update_cart_item/<int:item_id>', methods=['POST'])
+@views.route('/update_cart_item/<int:item_id>', methods=['POST'])
 def update_cart_item(item_id):
     if not session.get('customer_logged_in'):
         flash('Please log in first.', 'danger')
         return redirect(url_for('customer_login'))
-    user = User.query.filter_by(username=session['customer_user']).first()
+    user = get_current_user()
     cart_item = CartItem.query.get_or_404(item_id)
 
     if cart_item.cart.user_id != user.id:
@@ -679,12 +687,12 @@ def update_cart_item(item_id):
         flash('Invalid quantity.', 'danger')
     return redirect(url_for('view_cart'))
 
-@app.route('/remove_cart_item/<int:item_id>', methods=['POST'])
+@views.route('/remove_cart_item/<int:item_id>', methods=['POST'])
 def remove_cart_item(item_id):
     if not session.get('customer_logged_in'):
         flash('Please log in first.', 'danger')
         return redirect(url_for('customer_login'))
-    user = User.query.filter_by(username=session['customer_user']).first()
+    user = get_current_user()
     cart_item = CartItem.query.get_or_404(item_id)
     
     # Verify that the cart item belongs to the current user
@@ -700,105 +708,193 @@ def remove_cart_item(item_id):
     flash(f'Removed {product_name} from your cart.', 'success')
     return redirect(url_for('view_cart'))
 
-@app.route('/cart')
+# Apply a JSON list of cart operations in one transaction, e.g.
+# {"operations": [{"op": "add", "product_id": 3, "quantity": 2}, {"op": "remove", "product_id": 5}]}
+# Requires a JSON body, which cross-site forms cannot send.
+@views.route('/cart/batch', methods=['POST'])
+def cart_batch():
+    if not session.get('customer_logged_in'):
+        return jsonify({'errors': [{'index': None, 'error': 'Please log in first.'}]}), 401
+    if not request.is_json:
+        return jsonify({'errors': [{'index': None, 'error': 'Expected a JSON body.'}]}), 415
+    body = request.get_json(silent=True) or {}
+    try:
+        cart = apply_cart_operations(session['user_id'], body.get('operations') if isinstance(body, dict) else None)
+    except CartBatchError as e:
+        return jsonify({'errors': e.errors}), 422
+    return jsonify(cart)
+
+@views.route('/cart')
 def view_cart():
     if not session.get('customer_logged_in'):
         flash('Please log in first.', 'danger')
         return redirect(url_for('customer_login'))
-    user = User.query.filter_by(username=session['customer_user']).first()
-    cart = user.cart
+    # Load the cart, its items, their products and stock rollups in a single query
+    cart = (Cart.query
+            .options(joinedload(Cart.items).joinedload(CartItem.product))
+            .filter_by(user_id=session['user_id'])
+            .first())
     if not cart or not cart.items:
         return render_template('cart.html', cart=None)
 
     forms = {}
+    subtotals = {}
     for item in cart.items:
         form = UpdateCartForm(prefix=str(item.id))
         form.quantity.data = item.quantity
         forms[item.id] = form
+        subtotals[item.id] = item.product.price * item.quantity
 
-    total = sum(item.product.price * item.quantity for item in cart.items)
-    return render_template('cart.html', cart=cart, forms=forms, total=total)
+    total = sum(subtotals.values())
+    return render_template('cart.html', cart=cart, forms=forms, subtotals=subtotals, total=total)
 
-# Checkout Route (Placeholder)
-@app.route('/checkout', methods=['GET', 'POST'])
+# Checkout Route
+@views.route('/checkout', methods=['GET', 'POST'])
 def checkout():
     if not session.get('customer_logged_in'):
         flash('Please log in first.', 'danger')
         return redirect(url_for('customer_login'))
-    # Placeholder for checkout functionality
-    flash('Checkout functionality to be implemented.', 'info')
-    return redirect(url_for('view_cart'))
+    if request.method != 'POST':
+        return redirect(url_for('view_cart'))
+    try:
+        order = place_order(session['user_id'])
+    except CheckoutError as e:
+        flash(str(e), 'warning')
+        return redirect(url_for('view_cart'))
+    # Stock shown on the catalog pages went down
+    invalidate_products([item.product_id for item in order.order_items])
+    flash(f'Order #{order.id} placed successfully!', 'success')
+    main_logger.info(f'Order {order.id} placed by User ID {session["user_id"]} for {order.total_amount:.2f}')
+    return redirect(url_for('customer_dashboard'))
 
 # Customer-Facing Product Browsing Routes
-@app.route('/products')
+@views.route('/products')
+@read_only
+@cached_page(listing_key)
 def view_products():
     category_id = request.args.get('category', type=int)
     page = request.args.get('page', 1, type=int)
     per_page = 10  # Number of products per page
     sort = request.args.get('sort', 'name')  # Default sort by name
-    sort_options = {
-        'name': Product.name.asc(),
-        'price_asc': Product.price.asc(),
-        'price_desc': Product.price.desc(),
-        # Add more sort options as needed
-    }
-    sort_order = sort_options.get(sort, Product.name.asc())
+    # Cursor (keyset) pagination: 'after' and 'before' hold the position of the neighbouring page's edge row
+    after = request.args.get('after')
+    before = request.args.get('before')
     
-    if category_id:
-        selected_category = Category.query.get(category_id)
-        products_pagination = Product.query.filter_by(category_id=category_id).order_by(sort_order).paginate(page=page, per_page=per_page, error_out=False)
-    else:
-        selected_category = None
-        products_pagination = Product.query.order_by(sort_order).paginate(page=page, per_page=per_page, error_out=False)
+    category_tree = get_category_tree()
+    selected_category = category_tree.get(category_id) if category_id else None
+    products_pagination = paginate_products(category_id=category_id, sort=sort, after=after, before=before,
+                                            page=page, per_page=per_page)
     
-    categories = Category.query.order_by(Category.name).all()
     return render_template('view_products.html', 
                            products=products_pagination.items, 
-                           categories=categories, 
+                           categories=category_tree.categories, 
                            selected_category=selected_category,  # Pass the Category object
                            pagination=products_pagination, 
                            sort=sort)
 
-@app.route('/products/<int:product_id>')
+@views.route('/products/<int:product_id>')
+@read_only
+@cached_page(product_key)
 def view_product_detail(product_id):
     product = Product.query.get_or_404(product_id)
     return render_template('view_product_detail.html', product=product)
 
-@app.route('/search', methods=['GET'])
+# Read-only JSON catalog API (see catalog_api.py); ?fields= picks the fields, ETags allow conditional GETs
+@views.route(f'/api/{API_VERSION}/products')
+@read_only
+def api_products():
+    try:
+        fields = parse_fields(PRODUCT_FIELDS, DEFAULT_PRODUCT_FIELDS)
+        ids = request.args.get('ids')
+        return json_response(products_by_ids(parse_ids(ids), fields) if ids is not None else product_page(fields))
+    except ApiError as e:
+        return error_response(e)
+
+@views.route(f'/api/{API_VERSION}/products/<int:product_id>')
+@read_only
+def api_product(product_id):
+    try:
+        return json_response(product_by_id(product_id, parse_fields(PRODUCT_FIELDS, tuple(PRODUCT_FIELDS))))
+    except ApiError as e:
+        return error_response(e)
+
+@views.route(f'/api/{API_VERSION}/categories')
+@read_only
+def api_categories():
+    try:
+        return json_response(categories(parse_fields(CATEGORY_FIELDS, tuple(CATEGORY_FIELDS))))
+    except ApiError as e:
+        return error_response(e)
+
+@views.route('/search', methods=['GET'])
+@read_only
 def search_products():
     query = request.args.get('q', '')
+    page = request.args.get('page', 1, type=int)
+    per_page = 10  # Number of results per page
     if query:
-        # Perform case-insensitive search using ilike
-        products = Product.query.filter(Product.name.ilike(f'%{query}%')).all()
+        # Ranked full-text search over name, description and category name
+        pagination = search_catalog(query, page=page, per_page=per_page)
+        products = pagination.items
         flash(f'Search results for "{query}":', 'info')
     else:
+        pagination = None
         products = []
         flash('Please enter a search term.', 'danger')
     
-    categories = Category.query.order_by(Category.name).all()
     return render_template('view_products.html', 
                            products=products, 
-                           categories=categories, 
+                           categories=get_category_tree().categories, 
                            selected_category=None, 
                            search_query=query, 
-                           pagination=None, 
+                           pagination=pagination, 
                            sort=None)
 
 # Inventory Management Routes
 LOW_STOCK_THRESHOLD = 5
 
-@app.route('/admin/inventory')
+@views.route('/admin/inventory')
 @permission_required('manage_inventory')
 def admin_inventory():
-    warehouses = Warehouse.query.all()
-    low_stock_items = []
-    for warehouse in warehouses:
-        for inventory in warehouse.inventories:
-            if inventory.quantity <= LOW_STOCK_THRESHOLD:
-                low_stock_items.append(inventory)
-    return render_template('admin_inventory.html', warehouses=warehouses, low_stock_items=low_stock_items)
-
-@app.route('/admin/inventory/update', methods=['GET', 'POST'])
+    warehouse_id = request.args.get('warehouse', type=int)
+    low_page = request.args.get('low_page', 1, type=int)
+    grid_page = request.args.get('grid_page', 1, type=int)
+    per_page = 50  # Rows per page in each table
+
+    low_stock_pagination = low_stock_query(LOW_STOCK_THRESHOLD, warehouse_id).paginate(
+        page=low_page, per_page=per_page, error_out=False)
+    grid_pagination = stock_grid_query(warehouse_id).paginate(page=grid_page, per_page=per_page, error_out=False)
+    warehouses = db.session.query(Warehouse.id, Warehouse.name).order_by(Warehouse.name).all()
+    return render_template('admin_inventory.html',
+                           warehouses=warehouses,
+                           selected_warehouse=warehouse_id,
+                           low_stock=low_stock_pagination,
+                           grid=grid_pagination,
+                           thresholds=list_thresholds(),
+                           default_threshold=LOW_STOCK_THRESHOLD)
+
+@views.route('/admin/inventory/thresholds', methods=['POST'])
+@permission_required('manage_inventory')
+def admin_set_stock_threshold():
+    product_id = request.form.get('product_id', type=int)
+    warehouse_id = request.form.get('warehouse_id', type=int)
+    threshold = request.form.get('threshold', type=int)  # Empty removes the override
+    if threshold is not None and threshold < 0:
+        flash('Threshold must be zero or more.', 'danger')
+        return redirect(url_for('admin_inventory'))
+    if product_id and not db.session.get(Product, product_id):
+        flash('Product not found.', 'danger')
+        return redirect(url_for('admin_inventory'))
+    try:
+        set_threshold(threshold, product_id=product_id or None, warehouse_id=warehouse_id or None)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin_inventory'))
+    flash('Low-stock threshold updated.', 'success')
+    main_logger.info(f'Low-stock threshold for Product ID {product_id} / Warehouse ID {warehouse_id} set to {threshold} by Admin ID {session["user_id"]}')
+    return redirect(url_for('admin_inventory'))
+
+@views.route('/admin/inventory/update', methods=['GET', 'POST'])
 @permission_required('manage_inventory')
 def admin_update_inventory():
     if request.method == 'POST':
@@ -813,6 +909,7 @@ def admin_update_inventory():
             inventory = Inventory(warehouse_id=warehouse_id, product_id=product_id, quantity=quantity)
             db.session.add(inventory)
         db.session.commit()
+        invalidate_products([product_id])
         flash('Inventory updated successfully!', 'success')
         main_logger.info(f'Inventory updated: Product ID {product_id} in Warehouse ID {warehouse_id} set to {quantity} by Admin ID {session["user_id"]}')
         return redirect(url_for('admin_inventory'))
@@ -821,33 +918,255 @@ def admin_update_inventory():
     products = Product.query.all()
     return render_template('admin_update_inventory.html', warehouses=warehouses, products=products)
 
+# Raw request bodies the bulk inventory endpoint streams without a form
+INVENTORY_BODY_FORMATS = {'text/csv': 'csv', 'application/x-ndjson': 'jsonl', 'application/jsonl': 'jsonl'}
+
+# Bulk stock levels from a CSV or JSON-lines file. Warehouse sync jobs can instead POST the file as the
+# request body (Content-Type text/csv or application/x-ndjson, ?mode=set|delta, ?dry_run=1) and get the
+# report back as JSON.
+@views.route('/admin/inventory/bulk', methods=['GET', 'POST'])
+@permission_required('manage_inventory')
+def admin_bulk_inventory():
+    if request.method == 'POST' and request.mimetype in INVENTORY_BODY_FORMATS:
+        try:
+            report = import_inventory(TextIOWrapper(request.stream, encoding='utf-8'),
+                                      input_format=INVENTORY_BODY_FORMATS[request.mimetype],
+                                      mode=request.args.get('mode', 'set'),
+                                      dry_run=request.args.get('dry_run') == '1')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not report.dry_run:
+            invalidate_products(report.product_ids)
+            main_logger.info(f'Bulk inventory sync by Admin ID {session["user_id"]}: {report.summary()}')
+        return jsonify(report.to_dict())
+
+    form = BulkInventoryForm()
+    report = None
+    if form.validate_on_submit():
+        file = form.data_file.data
+        input_format = 'jsonl' if file.filename.lower().endswith('.jsonl') else 'csv'
+        try:
+            report = import_inventory(TextIOWrapper(file.stream, encoding='utf-8'), input_format=input_format,
+                                      mode=form.mode.data, dry_run=form.dry_run.data)
+        except Exception as e:
+            main_logger.error(f'Error processing inventory upload: {str(e)}')
+            flash('An error occurred while processing the file.', 'danger')
+            return redirect(request.url)
+
+        if not report.dry_run:
+            invalidate_products(report.product_ids)
+            main_logger.info(f'Bulk inventory upload by Admin ID {session["user_id"]}: {report.summary()}')
+        flash(report.summary(), 'warning' if report.error_count else 'success')
+    return render_template('admin_bulk_inventory.html', form=form, report=report)
+
+from flask import stream_with_context
+from admin_grid import parse_date
+from data_export import export_products, export_orders, export_inventory, export_filename, \
+    FORMATS as EXPORT_FORMATS, MIMETYPES as EXPORT_MIMETYPES
+
+# Stream an export as a download (?format=csv|jsonl, ?gzip=1 to compress it on the fly). Rows are read
+# off the cursor a batch at a time while the response is being sent, so memory stays flat.
+def export_download(make_export, **filters):
+    output_format = request.args.get('format', 'csv')
+    if output_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(EXPORT_FORMATS)}.'}), 400
+    compress = request.args.get('gzip') == '1'
+    export = make_export(**filters)
+    main_logger.info(f'{export.name.capitalize()} export ({output_format}) by Admin ID {session["user_id"]}')
+    return Response(stream_with_context(export.chunks(output_format, compress)),
+                    mimetype='application/gzip' if compress else EXPORT_MIMETYPES[output_format],
+                    headers={'Content-Disposition':
+                             f'attachment; filename={export_filename(export, output_format, compress)}'})
+
+@views.route('/admin/export/products')
+@permission_required('manage_products')
+@read_only
+def admin_export_products():
+    return export_download(export_products)
+
+# ?date_from= and ?date_to= (YYYY-MM-DD, inclusive) as on the orders list
+@views.route('/admin/export/orders')
+@permission_required('manage_orders')
+@read_only
+def admin_export_orders():
+    try:
+        start, end = (parse_date(request.args[name]) if request.args.get(name) else None
+                      for name in ('date_from', 'date_to'))
+    except ValueError:
+        return jsonify({'error': 'date_from and date_to must be YYYY-MM-DD.'}), 400
+    return export_download(export_orders, start=start, end=end)
+
+@views.route('/admin/export/inventory')
+@permission_required('manage_inventory')
+@read_only
+def admin_export_inventory():
+    return export_download(export_inventory)
+
 # Error Handlers
-@app.errorhandler(400)
+@views.errorhandler(400)
 def bad_request_error(error):
     return render_template('errors/400.html'), 400
 
-@app.errorhandler(401)
+@views.errorhandler(401)
 def unauthorized_error(error):
     main_logger.warning(f'401 Unauthorized access: {request.url}')
     return render_template('errors/401.html'), 401
 
-@app.errorhandler(403)
+@views.errorhandler(403)
 def forbidden_error(error):
     main_logger.warning(f'403 Forbidden access: {request.url}')
     return render_template('errors/403.html'), 403
 
-@app.errorhandler(404)
+@views.errorhandler(404)
 def page_not_found_error(error):
     return render_template('errors/404.html'), 404
 
-@app.errorhandler(500)
+@views.errorhandler(500)
 def internal_server_error(error):
     main_logger.error(f'500 Internal Server Error: {error}, Route: {request.url}')
     return render_template('errors/500.html'), 500
 
-with app.app_context():
+# CLI Commands
+@views.cli.command('upgrade-schema')
+def upgrade_schema_command():
+    """Apply pending schema migrations (indexes, constraints)."""
+    applied = upgrade_schema()
+    with db.engine.connect() as connection:
+        version = current_version(connection)
+    click.echo(f'Applied migrations: {applied or "none"}. Schema version {version}.')
+
+@views.cli.command('check-stock')
+@click.option('--rebuild', is_flag=True, help='Rebuild the stock rollup from Inventory rows after checking.')
+def check_stock_command(rebuild):
+    """Diff the ProductStock rollup against the raw Inventory rows."""
+    mismatches = check_product_stock()
+    for product_id, actual, expected in mismatches:
+        click.echo(f'Product ID {product_id}: rollup {actual}, inventory {expected}')
+    click.echo(f'{len(mismatches)} mismatched products.')
+    if rebuild:
+        rebuilt = rebuild_product_stock()
+        click.echo(f'Rebuilt stock rollup for {rebuilt} products.')
+        main_logger.info(f'Stock rollup rebuilt for {rebuilt} products ({len(mismatches)} mismatches).')
+
+@views.cli.command('import-inventory')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--format', 'input_format', type=click.Choice(INVENTORY_FORMATS),
+              help='Input format (default: from the file extension, else csv).')
+@click.option('--mode', type=click.Choice(INVENTORY_MODES), default='set', show_default=True,
+              help='set replaces stock levels, delta adds to them.')
+@click.option('--batch-size', default=INVENTORY_BATCH_SIZE, show_default=True, help='Rows per transaction.')
+@click.option('--dry-run', is_flag=True, help='Validate the file without writing anything.')
+def import_inventory_command(path, input_format, mode, batch_size, dry_run):
+    """Bulk upsert stock levels (product_id, warehouse_id, quantity) from CSV or JSON lines; - reads stdin."""
+    input_format = input_format or ('jsonl' if path.lower().endswith('.jsonl') else 'csv')
+    with click.open_file(path, encoding='utf-8') as stream:
+        report = import_inventory(stream, input_format=input_format, mode=mode, batch_size=batch_size,
+                                  dry_run=dry_run)
+    for line, message in report.errors:
+        click.echo(f'Line {line}: {message}')
+    if report.error_count > len(report.errors):
+        click.echo(f'... {report.error_count - len(report.errors)} more errors')
+    for product_id, warehouse_id in report.clamped:
+        click.echo(f'Clamped at zero: product {product_id} in warehouse {warehouse_id}')
+    click.echo(report.summary())
+    if not dry_run:
+        main_logger.info(f'Bulk inventory import from {path}: {report.summary()}')
+
+@views.cli.command('rebuild-sales')
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), help='First day to rebuild (YYYY-MM-DD).')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day to rebuild (YYYY-MM-DD).')
+def rebuild_sales_command(start, end):
+    """Rebuild the daily sales rollups from the raw orders, entirely or for a range of days."""
+    days = rebuild_sales_rollups(start.date() if start else None, end.date() if end else None)
+    click.echo(f'Rebuilt sales rollups for {days} days with sales.')
+    main_logger.info(f'Sales rollups rebuilt for {days} days.')
+
+@views.cli.command('import-products')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows per transaction.')
+@click.option('--dry-run', is_flag=True, help='Validate the file without writing anything.')
+def import_products_command(csv_path, batch_size, dry_run):
+    """Bulk import products from a CSV file (name, description, price, category)."""
+    with open(csv_path, newline='', encoding='utf-8') as stream:
+        report = import_products(stream, batch_size=batch_size, dry_run=dry_run)
+    for line, message in report.errors:
+        click.echo(f'Line {line}: {message}')
+    if report.error_count > len(report.errors):
+        click.echo(f'... {report.error_count - len(report.errors)} more errors')
+    click.echo(report.summary())
+    if not dry_run:
+        main_logger.info(f'Bulk import from {csv_path}: {report.summary()}')
+
+@views.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the product full-text search index."""
+    indexed = rebuild_search_index()
+    click.echo(f'Indexed {indexed} products.')
+    main_logger.info(f'Search index rebuilt with {indexed} products.')
+
+from static_export import export_catalog
+
+EXPORTS = {'products': export_products, 'orders': export_orders, 'inventory': export_inventory}
+
+@views.cli.command('export-catalog')
+@click.argument('output_dir', type=click.Path(file_okay=False))
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True, help='Rendering processes.')
+@click.option('--full', is_flag=True, help='Re-render every page instead of only the changed ones.')
+def export_catalog_command(output_dir, workers, full):
+    """Render the public catalog to static HTML files, re-rendering only changed pages."""
+    report = export_catalog(current_app, output_dir, workers=workers, full=full)
+    for path, status in report.failed:
+        click.echo(f'{path}: HTTP {status}')
+    click.echo(report.summary())
+    main_logger.info(f'Catalog exported to {output_dir}: {report.summary()}')
+
+@views.cli.command('export')
+@click.argument('dataset', type=click.Choice(list(EXPORTS)))
+@click.argument('path', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option('--format', 'output_format', type=click.Choice(EXPORT_FORMATS),
+              help='Output format (default: from the file extension, else csv).')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip the output (implied by a .gz path).')
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), help='Orders: first day (YYYY-MM-DD).')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), help='Orders: last day (YYYY-MM-DD).')
+def export_command(dataset, path, output_format, compress, start, end):
+    """Stream products, orders (with their items) or inventory to a CSV or JSON-lines file; - writes stdout."""
+    compress = compress or path.endswith('.gz')
+    output_format = output_format or ('jsonl' if path.removesuffix('.gz').endswith('.jsonl') else 'csv')
+    export = export_orders(start, end) if dataset == 'orders' else EXPORTS[dataset]()
+    started = time.perf_counter()
+    with click.open_file(path, 'wb') as stream:
+        for chunk in export.chunks(output_format, compress):
+            stream.write(chunk)
+    if path != '-':
+        click.echo(f'Exported {export.count} {dataset} to {path} in {time.perf_counter() - started:.2f}s.')
+
+# Create the schema, apply migrations and, optionally, seed the sample users, catalog and inventory.
+# Also backfills the derived tables (stock rollup, search index) of databases created before them.
+def init_database(sample_data=True):
     db.create_all()
-    
+    applied_migrations = upgrade_schema()
+    if applied_migrations:
+        main_logger.info(f'Applied schema migrations: {applied_migrations}')
+
+    if sample_data:
+        seed_sample_data()
+
+    # Backfill the stock rollup for databases created before it existed
+    if ProductStock.query.count() == 0 and Inventory.query.count() > 0:
+        rebuild_product_stock()
+        main_logger.info('Stock rollup backfilled.')
+
+    # Backfill the sales rollups for databases created before they existed
+    if SalesDaily.query.count() == 0 and Order.query.count() > 0:
+        days = rebuild_sales_rollups()
+        main_logger.info(f'Sales rollups backfilled for {days} days.')
+
+    # Backfill the search index for databases created before it existed
+    if search_index_size() == 0 and Product.query.count() > 0:
+        rebuild_search_index()
+        main_logger.info('Search index backfilled.')
+
+def seed_sample_data():
     # Create or update admin user
     admin_email = 'admin@example.com'
     admin_username = 'admin'
@@ -953,6 +1272,13 @@ with app.app_context():
         db.session.commit()
         main_logger.info('Inventory seeded.')
 
+@views.cli.command('init-db')
+@click.option('--no-sample-data', is_flag=True, help='Only create the schema; skip the sample users and catalog.')
+def init_db_command(no_sample_data):
+    """Create the database schema and seed the sample users, catalog and inventory."""
+    init_database(sample_data=not no_sample_data)
+    click.echo('Database initialized.')
+
 # Run the Flask application
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,144 @@
+# audit.py
+
+import atexit
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+DROP_POLICIES = ('drop', 'block')
+BLOCK_TIMEOUT = 1.0  # Seconds a committing request waits for queue space under the 'block' policy
+MAX_BATCHES_PER_WRITE = 64  # Queued commits coalesced into one file write
+
+_STOP = object()
+
+# Queue-based audit writer: committed model changes are handed over as one batch per
+# transaction and written as JSON lines by a background thread, off the request path.
+class AuditLog:
+    def __init__(self, path, max_bytes, backup_count, queue_size=1000, drop_policy='drop'):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f'Unknown audit drop policy: {drop_policy}')
+        self.handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        self.handler.setFormatter(logging.Formatter('%(message)s'))
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, records):
+        try:
+            if self.drop_policy == 'block':
+                self.queue.put(records, timeout=BLOCK_TIMEOUT)
+            else:
+                self.queue.put_nowait(records)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += len(records)
+
+    def _run(self):
+        while True:
+            batches = [self.queue.get()]
+            while len(batches) < MAX_BATCHES_PER_WRITE:
+                try:
+                    batches.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(batch is _STOP for batch in batches)
+            records = [record for batch in batches if batch is not _STOP for record in batch]
+            try:
+                self._write(records)
+            finally:
+                for _ in batches:
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, records):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            records.append({'ts': datetime.utcnow().isoformat(), 'op': 'dropped', 'count': dropped})
+        if not records:
+            return
+        lines = '\n'.join(json.dumps(record, default=str) for record in records)
+        self.handler.emit(logging.makeLogRecord({'msg': lines, 'levelno': logging.INFO, 'levelname': 'INFO'}))
+
+    # Block until everything queued so far has been written
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        self.handler.close()
+
+audit_log = None
+
+def init_audit_log(config):
+    global audit_log
+    if audit_log is not None:
+        audit_log.close()
+    audit_log = AuditLog(
+        config['AUDIT_LOG_PATH'],
+        max_bytes=config['AUDIT_LOG_MAX_BYTES'],
+        backup_count=config['AUDIT_LOG_BACKUP_COUNT'],
+        queue_size=config['AUDIT_QUEUE_SIZE'],
+        drop_policy=config['AUDIT_DROP_POLICY'],
+    )
+    return audit_log
+
+# Mapper events only stash the change on the session; nothing is written until commit
+def _record(operation, target):
+    session = object_session(target)
+    if session is None:
+        return
+    session.info.setdefault('audit_pending', []).append({
+        'ts': datetime.utcnow().isoformat(),
+        'op': operation,
+        'model': target.__class__.__name__,
+        'id': getattr(target, 'id', None),
+        'repr': repr(target),
+    })
+
+# Core statements (bulk inventory imports, batched cart writes) bypass the mapper events. Their
+# callers hand over the rows they wrote, as dicts of column values, and the rows are logged with
+# the same commit as ORM changes.
+def record_rows(session, operation, model, rows):
+    ts = datetime.utcnow().isoformat()
+    session.info.setdefault('audit_pending', []).extend({
+        'ts': ts,
+        'op': operation,
+        'model': model.__name__,
+        'id': row.get('id'),
+        'values': row,
+    } for row in rows)
+
+def log_model_insert(mapper, connection, target):
+    _record('insert', target)
+
+def log_model_update(mapper, connection, target):
+    _record('update', target)
+
+def log_model_delete(mapper, connection, target):
+    _record('delete', target)
+
+def _after_commit(session):
+    records = session.info.pop('audit_pending', None)
+    if records and audit_log is not None:
+        audit_log.submit(records)
+
+def _after_rollback(session):
+    # Rolled-back changes are never logged
+    session.info.pop('audit_pending', None)
+
+event.listen(Session, 'after_commit', _after_commit)
+event.listen(Session, 'after_rollback', _after_rollback)
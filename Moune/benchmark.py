@@ -0,0 +1,353 @@
+# benchmark.py
+#
+# Load benchmark: builds a throwaway database with a synthetic catalog, drives the real routes
+# through the Flask test client with concurrent workers and reports latency percentiles and
+# throughput per scenario. Results are written as JSON so runs can be compared.
+#
+#   python benchmark.py                      # full scale (100k products, millions of rows)
+#   python benchmark.py --scale 0.05 --requests 200 --output results.json
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+from itertools import count
+
+INSERT_CHUNK = 50000  # Rows per executemany while seeding
+DEEP_PAGES = (50, 500)  # Listing pages the products_deep_page scenario jumps to
+LISTING_PAGE_SIZE = 10  # Products per listing page, as in view_products
+ORDER_STATUSES = ['Pending', 'Processing', 'Shipped', 'Delivered', 'Cancelled']
+SEARCH_TERMS = ['widget', 'steel', 'blue', 'compact', 'pro', 'deluxe', 'organic', 'wireless']
+WORDS = ['steel', 'blue', 'compact', 'pro', 'deluxe', 'organic', 'wireless', 'classic', 'smart', 'portable',
+         'red', 'green', 'heavy', 'light', 'mini', 'ultra', 'eco', 'vintage', 'modern', 'travel']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load benchmark for the Moune routes on a synthetic catalog.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier applied to every dataset size')
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--categories', type=int, default=2000)
+    parser.add_argument('--category-depth', type=int, default=8, help='Levels in the category tree')
+    parser.add_argument('--warehouses', type=int, default=50)
+    parser.add_argument('--stock-per-product', type=int, default=20, help='Warehouses stocking each product')
+    parser.add_argument('--customers', type=int, default=10000)
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--items-per-order', type=int, default=3, help='Maximum items per order')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent workers per scenario')
+    parser.add_argument('--upload-rows', type=int, default=500, help='CSV rows per bulk upload request')
+    parser.add_argument('--scenarios', help='Comma-separated scenario names to run (default: all)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workdir', help='Directory for the database and logs (default: a new temp dir)')
+    parser.add_argument('--output', default='benchmark_results.json')
+    return parser.parse_args()
+
+def scaled(args, value, minimum=1):
+    return max(minimum, int(value * args.scale))
+
+def insert_chunks(connection, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_CHUNK:
+            connection.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        connection.execute(table.insert(), batch)
+
+# Populate the database with core inserts; returns the ids the scenarios need
+def build_dataset(args, db, models):
+    User, Category, Product, Order, OrderItem, Warehouse, Inventory = models
+    rng = random.Random(args.seed)
+    connection = db.session.connection()
+
+    # Deep category tree: every level hangs off random categories of the level above
+    category_count = scaled(args, args.categories)
+    depth = max(1, args.category_depth)
+    category_table = Category.__table__
+    category_ids = []
+    previous_level = [None]
+    per_level = max(1, category_count // depth)
+    for level in range(depth):
+        size = per_level if level < depth - 1 else category_count - per_level * (depth - 1)
+        rows = [{'name': f'Bench Category {level}-{i}', 'parent_id': rng.choice(previous_level)} for i in range(size)]
+        level_ids = connection.execute(category_table.insert().returning(category_table.c.id), rows).scalars().all()
+        category_ids.extend(level_ids)
+        previous_level = level_ids or previous_level
+
+    warehouse_table = Warehouse.__table__
+    warehouse_ids = connection.execute(
+        warehouse_table.insert().returning(warehouse_table.c.id),
+        [{'name': f'Bench Warehouse {i}', 'location': f'Region {i % 10}'} for i in range(scaled(args, args.warehouses))],
+    ).scalars().all()
+
+    product_table = Product.__table__
+    product_ids = []
+    product_count = scaled(args, args.products)
+    for start in range(0, product_count, INSERT_CHUNK):
+        rows = [{'name': f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} widget {i:06}',
+                 'description': ' '.join(rng.choice(WORDS) for _ in range(12)),
+                 'price': round(rng.uniform(1, 1000), 2), 'category_id': rng.choice(category_ids)}
+                for i in range(start, min(start + INSERT_CHUNK, product_count))]
+        product_ids.extend(connection.execute(product_table.insert().returning(product_table.c.id), rows).scalars().all())
+
+    stock_per_product = min(args.stock_per_product, len(warehouse_ids))
+    insert_chunks(connection, Inventory.__table__, (
+        {'product_id': product_id, 'warehouse_id': warehouse_id, 'quantity': rng.randint(0, 500),
+         'last_updated': datetime.utcnow()}
+        for product_id in product_ids for warehouse_id in rng.sample(warehouse_ids, stock_per_product)
+    ))
+
+    user_table = User.__table__
+    customer_ids = []
+    customer_count = scaled(args, args.customers)
+    for start in range(0, customer_count, INSERT_CHUNK):
+        rows = [{'username': f'bench{i}', 'email': f'bench{i}@example.com', 'password_hash': 'unused',
+                 'role': 'customer', 'membership_tier': 'Normal', 'roles': 'customer'}
+                for i in range(start, min(start + INSERT_CHUNK, customer_count))]
+        customer_ids.extend(connection.execute(user_table.insert().returning(user_table.c.id), rows).scalars().all())
+
+    order_table = Order.__table__
+    order_count = scaled(args, args.orders)
+    first_day = datetime(2023, 1, 1)
+    for start in range(0, order_count, INSERT_CHUNK):
+        rows = [{'user_id': rng.choice(customer_ids), 'order_date': first_day + timedelta(minutes=i),
+                 'status': rng.choice(ORDER_STATUSES), 'total_amount': 0.0}
+                for i in range(start, min(start + INSERT_CHUNK, order_count))]
+        order_ids = connection.execute(order_table.insert().returning(order_table.c.id), rows).scalars().all()
+        insert_chunks(connection, OrderItem.__table__, (
+            {'order_id': order_id, 'product_id': rng.choice(product_ids), 'quantity': rng.randint(1, 4),
+             'unit_price': round(rng.uniform(1, 1000), 2)}
+            for order_id in order_ids for _ in range(rng.randint(1, args.items_per_order))
+        ))
+    db.session.commit()
+
+    return {
+        'category_ids': category_ids,
+        'product_ids': product_ids,
+        'customer_ids': customer_ids,
+        'counts': {
+            'categories': len(category_ids),
+            'products': len(product_ids),
+            'warehouses': len(warehouse_ids),
+            'inventory_rows': len(product_ids) * stock_per_product,
+            'customers': len(customer_ids),
+            'orders': order_count,
+        },
+    }
+
+# The listing is keyset-paginated: a deep page is only reachable through the cursor its Next link
+# carries, the (name, id) of the last product on the page before. Returns (page, cursor) pairs for
+# the DEEP_PAGES range, or for every page past the first when the catalog is smaller.
+def deep_page_cursors(db, Product):
+    from catalog import encode_cursor
+    first, last = DEEP_PAGES
+    rows = (db.session.query(Product.name, Product.id).order_by(Product.name, Product.id)
+            .limit((last - 1) * LISTING_PAGE_SIZE))
+    cursors = [(index // LISTING_PAGE_SIZE + 2, encode_cursor(name, product_id))
+               for index, (name, product_id) in enumerate(rows) if (index + 1) % LISTING_PAGE_SIZE == 0]
+    return [(page, cursor) for page, cursor in cursors if page >= first] or cursors
+
+# A benchmark scenario: one route, how to build each request and who is logged in.
+# page_cache=False runs it with the rendered page cache turned off.
+class Scenario:
+    def __init__(self, name, make_request, login=None, page_cache=True):
+        self.name = name
+        self.make_request = make_request  # (client, rng) -> response
+        self.login = login  # None, 'customer' or 'admin'
+        self.page_cache = page_cache
+
+def build_scenarios(args, dataset):
+    product_ids = dataset['product_ids']
+    category_ids = dataset['category_ids']
+    deep_pages = dataset['deep_pages']
+    upload_counter = count()
+
+    def bulk_upload(client, rng):
+        batch = next(upload_counter)
+        lines = ['name,description,price,category']
+        lines.extend(f'Uploaded {batch}-{i},Benchmark upload,{rng.uniform(1, 100):.2f},Bench Uploads'
+                     for i in range(args.upload_rows))
+        data = {'csv_file': (BytesIO('\n'.join(lines).encode()), 'upload.csv', 'text/csv')}
+        return client.post('/admin/products/bulk_upload', data=data, content_type='multipart/form-data')
+
+    return [
+        Scenario('products', lambda client, rng: client.get('/products')),
+        Scenario('products_category', lambda client, rng: client.get(
+            f'/products?category={rng.choice(category_ids)}&sort={rng.choice(["name", "price_asc", "price_desc"])}')),
+        # Uncached, so every request pays for the keyset seek instead of replaying a stored page
+        Scenario('products_deep_page', lambda client, rng: client.get(
+            '/products?page={}&after={}'.format(*rng.choice(deep_pages))), page_cache=False),
+        Scenario('search', lambda client, rng: client.get(f'/search?q={rng.choice(SEARCH_TERMS)}')),
+        Scenario('product_detail', lambda client, rng: client.get(f'/products/{rng.choice(product_ids)}')),
+        Scenario('add_to_cart', lambda client, rng: client.post(
+            f'/add_to_cart/{rng.choice(product_ids)}', data={'quantity': 1}), login='customer'),
+        Scenario('cart', lambda client, rng: client.get('/cart'), login='customer'),
+        Scenario('admin_orders', lambda client, rng: client.get('/admin/orders'), login='admin'),
+        Scenario('admin_dashboard', lambda client, rng: client.get('/admin/dashboard'), login='admin'),
+        Scenario('admin_inventory', lambda client, rng: client.get('/admin/inventory'), login='admin'),
+        Scenario('bulk_upload', bulk_upload, login='admin'),
+    ]
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+def log_in(client, login, user_id):
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        if login == 'customer':
+            session['customer_logged_in'] = True
+        else:
+            session['admin_logged_in'] = True
+
+# Run one scenario with `workers` threads, each with its own test client and session
+def run_scenario(app, scenario, args, user_ids):
+    latencies = []
+    statuses = {}
+    errors = 0
+    lock = threading.Lock()
+    remaining = count()
+
+    def worker(worker_id):
+        nonlocal errors
+        rng = random.Random(args.seed * 1000 + worker_id)
+        client = app.test_client()
+        if scenario.login:
+            log_in(client, scenario.login, user_ids[scenario.login][worker_id % len(user_ids[scenario.login])])
+        local = []
+        while next(remaining) < args.requests:
+            started = time.perf_counter()
+            try:
+                response = scenario.make_request(client, rng)
+                status = response.status_code
+            except Exception:
+                status = 'exception'
+            local.append(time.perf_counter() - started)
+            with lock:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if status == 'exception' or status >= 500:
+                    errors += 1
+        with lock:
+            latencies.extend(local)
+
+    page_cache = app.config['PAGE_CACHE_ENABLED'] and scenario.page_cache
+    cache_setting = app.config['PAGE_CACHE_ENABLED']
+    app.config['PAGE_CACHE_ENABLED'] = page_cache
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(worker, range(args.workers)))
+    finally:
+        app.config['PAGE_CACHE_ENABLED'] = cache_setting
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    milliseconds = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'page_cache': page_cache,
+        'statuses': statuses,
+        'elapsed_seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'p50_ms': milliseconds(percentile(latencies, 0.50)),
+        'p95_ms': milliseconds(percentile(latencies, 0.95)),
+        'p99_ms': milliseconds(percentile(latencies, 0.99)),
+        'mean_ms': milliseconds(sum(latencies) / len(latencies)) if latencies else None,
+        'max_ms': milliseconds(latencies[-1]) if latencies else None,
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix='moune-bench-'))
+    os.makedirs(workdir, exist_ok=True)
+
+    # The app configures its database from the environment and writes logs to the working directory
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'benchmark.db')
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from app import create_app, init_database
+    from extensions import db
+    from models import User, Category, Product, Order, OrderItem, Warehouse, Inventory
+    from search import rebuild_search_index
+    from stock import rebuild_product_stock
+    from sales_report import rebuild_sales_rollups
+    from sqlalchemy import text
+
+    app = create_app(WTF_CSRF_ENABLED=False)
+
+    print(f'Building dataset in {workdir} ...', flush=True)
+    build_started = time.perf_counter()
+    with app.app_context():
+        init_database()
+        dataset = build_dataset(args, db, (User, Category, Product, Order, OrderItem, Warehouse, Inventory))
+        rebuild_product_stock()
+        rebuild_sales_rollups()
+        rebuild_search_index()
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        dataset['deep_pages'] = deep_page_cursors(db, Product)
+        admin_ids = [user_id for user_id, roles in db.session.query(User.id, User.roles) if 'super_admin' in roles.split(',')]
+        db.session.remove()
+    build_seconds = time.perf_counter() - build_started
+    print(f'Dataset built in {build_seconds:.1f}s: {dataset["counts"]}', flush=True)
+
+    scenarios = build_scenarios(args, dataset)
+    if args.scenarios:
+        wanted = set(args.scenarios.split(','))
+        unknown = wanted - {scenario.name for scenario in scenarios}
+        if unknown:
+            raise SystemExit(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+        scenarios = [scenario for scenario in scenarios if scenario.name in wanted]
+    user_ids = {'customer': dataset['customer_ids'], 'admin': admin_ids}
+
+    results = {}
+    print(f'{"scenario":<20}{"requests":>9}{"errors":>8}{"rps":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    for scenario in scenarios:
+        result = run_scenario(app, scenario, args, user_ids)
+        results[scenario.name] = result
+        print(f'{scenario.name:<20}{result["requests"]:>9}{result["errors"]:>8}{result["rps"]:>10}'
+              f'{result["p50_ms"]:>10}{result["p95_ms"]:>10}{result["p99_ms"]:>10}', flush=True)
+
+    report = {
+        'started_at': datetime.utcnow().isoformat(),
+        'git_revision': git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'parameters': vars(args),
+        'dataset': dict(dataset['counts'], build_seconds=round(build_seconds, 1)),
+        'scenarios': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+# bulk_import.py
+
+import csv
+import time
+from itertools import islice
+
+from extensions import db
+from audit import record_rows
+from models import Category, Product
+from search import index_products
+from catalog import invalidate_product_count
+from category_cache import invalidate_category_cache
+
+REQUIRED_COLUMNS = ('name', 'description', 'price', 'category')
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100  # Row errors kept in the report; the rest are only counted
+
+product_table = Product.__table__
+category_table = Category.__table__
+
+class ImportReport:
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.rows_read = 0
+        self.products_added = 0
+        self.categories_created = 0
+        self.duplicates_skipped = 0
+        self.error_count = 0
+        self.errors = []  # (line number, message)
+        self.batches = 0
+        self.elapsed = 0.0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        verb = 'Would add' if self.dry_run else 'Added'
+        return (f'{verb} {self.products_added} products and {self.categories_created} categories from '
+                f'{self.rows_read} rows ({self.duplicates_skipped} duplicates, {self.error_count} errors) '
+                f'in {self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/s).')
+
+# Validate one CSV row; returns (name, description, price, category name) or raises ValueError
+def parse_row(row):
+    values = {column: (row.get(column) or '').strip() for column in REQUIRED_COLUMNS}
+    missing = [column for column in REQUIRED_COLUMNS if not values[column]]
+    if missing:
+        raise ValueError(f'Missing {", ".join(missing)}')
+    try:
+        price = float(values['price'])
+    except ValueError:
+        raise ValueError(f'Invalid price "{values["price"]}"')
+    if price < 0:
+        raise ValueError(f'Negative price "{values["price"]}"')
+    return values['name'], values['description'], price, values['category']
+
+# Stream products from a CSV text stream into the database.
+# Existing categories and (name, category) keys are prefetched once; each batch of rows is inserted
+# with a single executemany and committed in its own transaction, together with its audit records.
+# With dry_run nothing is written.
+def import_products(stream, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    report = ImportReport(dry_run=dry_run)
+    started = time.perf_counter()
+
+    reader = csv.DictReader(stream)
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing_columns:
+        report.add_error(1, f'Missing CSV columns: {", ".join(missing_columns)}')
+        return report
+
+    # Prefetch lookups; the first category with a given name wins, as with filter_by(name=...).first()
+    category_ids = {}
+    for category_id, name in db.session.query(Category.id, Category.name).order_by(Category.id):
+        category_ids.setdefault(name, category_id)
+    existing_keys = set(db.session.query(Product.name, Product.category_id))
+    pending_category = -1  # Placeholder ids for categories a dry run would create
+
+    line = 1  # Header line
+    try:
+        while True:
+            chunk = list(islice(reader, batch_size))
+            if not chunk:
+                break
+
+            new_products = []
+            for row in chunk:
+                line += 1
+                report.rows_read += 1
+                try:
+                    name, description, price, category_name = parse_row(row)
+                except ValueError as e:
+                    report.add_error(line, str(e))
+                    continue
+
+                category_id = category_ids.get(category_name)
+                if category_id is None:
+                    if dry_run:
+                        category_id = pending_category
+                        pending_category -= 1
+                    else:
+                        category_id = db.session.execute(
+                            category_table.insert().values(name=category_name)
+                        ).inserted_primary_key[0]
+                        record_rows(db.session, 'insert', Category, [{'id': category_id, 'name': category_name}])
+                    category_ids[category_name] = category_id
+                    report.categories_created += 1
+
+                key = (name, category_id)
+                if key in existing_keys:
+                    report.duplicates_skipped += 1
+                    continue
+                existing_keys.add(key)
+                new_products.append({'name': name, 'description': description, 'price': price, 'category_id': category_id})
+
+            if new_products and not dry_run:
+                product_ids = db.session.execute(
+                    product_table.insert().returning(product_table.c.id, sort_by_parameter_order=True), new_products
+                ).scalars().all()
+                index_products(db.session.connection(), product_ids)
+                record_rows(db.session, 'insert', Product,
+                            [dict(row, id=product_id) for row, product_id in zip(new_products, product_ids)])
+            if not dry_run:
+                db.session.commit()
+            report.products_added += len(new_products)
+            report.batches += 1
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        # Batches committed before a failure are visible too
+        if not dry_run:
+            invalidate_product_count()
+            invalidate_category_cache()
+
+    report.elapsed = time.perf_counter() - started
+    return report
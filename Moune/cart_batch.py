@@ -0,0 +1,138 @@
+# cart_batch.py
+
+from extensions import db
+from audit import record_rows
+from models import Cart, CartItem, Product, ProductStock
+from sqlalchemy import delete, insert, select, update
+
+MAX_OPERATIONS = 100
+OPERATIONS = ('add', 'update', 'remove')
+
+class CartBatchError(Exception):
+    def __init__(self, errors):
+        self.errors = errors  # [{'index': position in the batch or None, 'error': message}]
+        super().__init__('; '.join(error['error'] for error in errors))
+
+def _whole_number(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+# Check the shape of every operation before touching the database
+def parse_operations(operations):
+    if not isinstance(operations, list) or not operations:
+        raise CartBatchError([{'index': None, 'error': 'Expected a non-empty list of operations.'}])
+    if len(operations) > MAX_OPERATIONS:
+        raise CartBatchError([{'index': None, 'error': f'At most {MAX_OPERATIONS} operations per batch.'}])
+    parsed = []
+    errors = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+            errors.append({'index': index, 'error': f'Operation must be one of: {", ".join(OPERATIONS)}.'})
+            continue
+        product_id = operation.get('product_id')
+        quantity = operation.get('quantity', 1 if operation['op'] == 'add' else None)
+        if not _whole_number(product_id):
+            errors.append({'index': index, 'error': 'product_id must be an integer.'})
+        elif operation['op'] == 'add' and not (_whole_number(quantity) and quantity >= 1):
+            errors.append({'index': index, 'error': 'quantity must be a positive integer.'})
+        elif operation['op'] == 'update' and not _whole_number(quantity):
+            errors.append({'index': index, 'error': 'quantity must be zero or a positive integer.'})
+        else:
+            parsed.append((index, operation['op'], product_id, quantity))
+    if errors:
+        raise CartBatchError(errors)
+    return parsed
+
+# Apply a batch of cart operations for a user in one transaction and return the resulting cart.
+#   add:    {'op': 'add', 'product_id': 3, 'quantity': 2}  adds to the line, creating it if needed
+#   update: {'op': 'update', 'product_id': 3, 'quantity': 5}  sets the quantity; 0 removes the line
+#   remove: {'op': 'remove', 'product_id': 3}
+# Operations apply in order. The final quantities are checked against stock in one query, and nothing
+# is written if any check fails. The statement count does not depend on the batch size: one read of
+# the cart, one of the products with their stock, then at most one INSERT, UPDATE and DELETE each
+# (plus one INSERT for a first cart).
+def apply_cart_operations(user_id, operations):
+    parsed = parse_operations(operations)
+
+    lines = db.session.execute(
+        select(Cart.id, CartItem.id, CartItem.product_id, CartItem.quantity)
+        .outerjoin(CartItem, CartItem.cart_id == Cart.id)
+        .where(Cart.user_id == user_id)
+    ).all()
+    cart_id = lines[0][0] if lines else None
+    existing = {product_id: (item_id, quantity) for _, item_id, product_id, quantity in lines if item_id}
+
+    quantities = {product_id: quantity for product_id, (_, quantity) in existing.items()}
+    last_change = {}  # product_id -> index of the operation that last changed its quantity
+    for index, op, product_id, quantity in parsed:
+        if op == 'add':
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        elif op == 'update':
+            quantities[product_id] = quantity
+        else:
+            quantities[product_id] = 0
+        last_change[product_id] = index
+
+    products = {row.id: row for row in db.session.execute(
+        select(Product.id, Product.name, Product.price, db.func.coalesce(ProductStock.quantity, 0).label('stock'))
+        .outerjoin(ProductStock, ProductStock.product_id == Product.id)
+        .where(Product.id.in_(quantities))
+    )}
+
+    errors = []
+    for product_id, index in sorted(last_change.items(), key=lambda change: change[1]):
+        product = products.get(product_id)
+        quantity = quantities[product_id]
+        if product is None and quantity > 0:
+            errors.append({'index': index, 'error': f'Product {product_id} does not exist.'})
+        elif product is not None and quantity > product.stock and quantity > existing.get(product_id, (None, 0))[1]:
+            errors.append({'index': index, 'error': f'Only {product.stock} units of {product.name} are available '
+                                                    f'(requested {quantity}).'})
+    if errors:
+        raise CartBatchError(errors)
+
+    try:
+        if cart_id is None:
+            cart_id = db.session.execute(insert(Cart).values(user_id=user_id).returning(Cart.id)).scalar()
+            record_rows(db.session, 'insert', Cart, [{'id': cart_id, 'user_id': user_id}])
+        removed = [product_id for product_id in last_change if product_id in existing and quantities[product_id] == 0]
+        changed = [{'id': existing[product_id][0], 'quantity': quantities[product_id]} for product_id in last_change
+                   if product_id in existing and quantities[product_id] not in (0, existing[product_id][1])]
+        added = [{'cart_id': cart_id, 'product_id': product_id, 'quantity': quantities[product_id]}
+                 for product_id in last_change if product_id not in existing and quantities[product_id] > 0]
+        item_ids = {product_id: item_id for product_id, (item_id, _) in existing.items()}
+        if removed:
+            db.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id, CartItem.product_id.in_(removed)))
+            record_rows(db.session, 'delete', CartItem, [{'id': existing[product_id][0], 'cart_id': cart_id,
+                                                          'product_id': product_id} for product_id in removed])
+        if changed:
+            db.session.execute(update(CartItem), changed)
+            record_rows(db.session, 'update', CartItem, changed)
+        if added:
+            item_ids.update((product_id, item_id) for item_id, product_id in db.session.execute(
+                insert(CartItem).returning(CartItem.id, CartItem.product_id), added))
+            record_rows(db.session, 'insert', CartItem, [dict(row, id=item_ids[row['product_id']]) for row in added])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    items = []
+    for product_id, quantity in quantities.items():
+        if quantity == 0:
+            continue
+        product = products.get(product_id)
+        items.append({
+            'item_id': item_ids[product_id],
+            'product_id': product_id,
+            'name': product.name if product else None,
+            'price': product.price if product else None,
+            'quantity': quantity,
+            'subtotal': product.price * quantity if product else None,
+            'available': product.stock if product else 0,
+        })
+    items.sort(key=lambda item: item['item_id'])
+    return {
+        'cart_id': cart_id,
+        'items': items,
+        'total': sum(item['subtotal'] or 0 for item in items),
+    }
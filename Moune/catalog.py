@@ -0,0 +1,146 @@
+# catalog.py
+
+import base64
+import json
+import math
+import threading
+import time
+
+from extensions import db
+from models import Product, ProductStock
+from sqlalchemy import event
+
+# Columns the product listing renders; description is deliberately left out
+LISTING_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.price,
+    db.func.coalesce(ProductStock.quantity, 0).label('inventory_count'),
+)
+
+# Sort options: (sort column, descending). Every ordering is tie-broken on Product.id
+# in the same direction so the cursor position is always unique.
+SORT_KEYS = {
+    'name': (Product.name, False),
+    'price_asc': (Product.price, False),
+    'price_desc': (Product.price, True),
+}
+
+COUNT_CACHE_TTL = 60  # Seconds a cached listing count stays valid
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+def encode_cursor(sort_value, product_id):
+    payload = json.dumps([sort_value, product_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, product_id = json.loads(base64.urlsafe_b64decode(padded))
+        return sort_value, int(product_id)
+    except (ValueError, TypeError):
+        return None
+
+# Approximate listing size, cached per category so listing pages never run COUNT(*)
+def cached_product_count(category_id=None):
+    now = time.monotonic()
+    with _count_cache_lock:
+        cached = _count_cache.get(category_id)
+        if cached and cached[1] > now:
+            return cached[0]
+    query = db.session.query(db.func.count(Product.id))
+    if category_id:
+        query = query.filter(Product.category_id == category_id)
+    count = query.scalar()
+    with _count_cache_lock:
+        _count_cache[category_id] = (count, now + COUNT_CACHE_TTL)
+    return count
+
+def invalidate_product_count(*args):
+    with _count_cache_lock:
+        _count_cache.clear()
+
+# Product inserts, deletes and category moves change the listing sizes
+event.listen(Product, 'after_insert', invalidate_product_count)
+event.listen(Product, 'after_update', invalidate_product_count)
+event.listen(Product, 'after_delete', invalidate_product_count)
+
+class KeysetPagination:
+    def __init__(self, items, page, per_page, total, has_prev, has_next, prev_cursor, next_cursor):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+
+    @property
+    def pages(self):
+        return max(self.page, math.ceil(self.total / self.per_page), 1)
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+# Fetch one listing page positioned by a cursor instead of an OFFSET.
+# `after` continues forward from a cursor, `before` goes back from one; with neither the first page is returned.
+# `columns` must include Product.id and the sort column.
+def paginate_products(category_id=None, sort='name', after=None, before=None, page=1, per_page=10,
+                      columns=LISTING_COLUMNS):
+    sort_column, descending = SORT_KEYS.get(sort, SORT_KEYS['name'])
+    position = decode_cursor(before or after) if (before or after) else None
+    backwards = position is not None and before is not None
+
+    query = (db.session.query(*columns)
+             .outerjoin(ProductStock, ProductStock.product_id == Product.id))
+    if category_id:
+        query = query.filter(Product.category_id == category_id)
+
+    # Walking backwards flips the direction of the scan; rows are reversed again below
+    scan_descending = descending != backwards
+    if position is not None:
+        sort_value, product_id = position
+        if scan_descending:
+            query = query.filter(db.or_(sort_column < sort_value,
+                                        db.and_(sort_column == sort_value, Product.id < product_id)))
+        else:
+            query = query.filter(db.or_(sort_column > sort_value,
+                                        db.and_(sort_column == sort_value, Product.id > product_id)))
+    if scan_descending:
+        query = query.order_by(sort_column.desc(), Product.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Product.id.asc())
+
+    # Fetch one extra row to learn whether another page exists in the scan direction
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    sort_attr = sort_column.key
+    first_cursor = encode_cursor(getattr(rows[0], sort_attr), rows[0].id) if rows else None
+    last_cursor = encode_cursor(getattr(rows[-1], sort_attr), rows[-1].id) if rows else None
+    if backwards:
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = position is not None, has_more
+
+    return KeysetPagination(
+        items=rows,
+        page=max(page, 1) if position is not None else 1,
+        per_page=per_page,
+        total=cached_product_count(category_id),
+        has_prev=has_prev,
+        has_next=has_next,
+        prev_cursor=first_cursor,
+        next_cursor=last_cursor,
+    )
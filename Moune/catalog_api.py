@@ -0,0 +1,138 @@
+# catalog_api.py
+
+import hashlib
+import json
+
+from flask import Response, request, url_for
+
+from extensions import db
+from models import Category, Product, ProductStock
+from catalog import SORT_KEYS, paginate_products
+
+try:
+    import orjson
+except ImportError:  # Plain json is slower but produces the same documents
+    orjson = None
+
+API_VERSION = 'v1'
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_IDS = 100
+
+# Fields a client may ask for with ?fields=; the id is always returned
+PRODUCT_FIELDS = {
+    'id': Product.id,
+    'name': Product.name,
+    'description': Product.description,
+    'price': Product.price,
+    'category_id': Product.category_id,
+    'stock': db.func.coalesce(ProductStock.quantity, 0).label('stock'),
+}
+DEFAULT_PRODUCT_FIELDS = ('id', 'name', 'price', 'category_id', 'stock')
+CATEGORY_FIELDS = {
+    'id': Category.id,
+    'name': Category.name,
+    'parent_id': Category.parent_id,
+}
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        self.status = status
+        super().__init__(message)
+
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+# Serialize a payload with a strong ETag; a matching If-None-Match gets a 304 without the body
+def json_response(payload, status=200):
+    response = Response(dumps(payload), status=status, mimetype='application/json')
+    if status == 200:
+        response.set_etag(hashlib.blake2b(response.get_data(), digest_size=16).hexdigest())
+        response.cache_control.public = True
+        response.cache_control.no_cache = True  # Always revalidate; a match costs a 304
+        response = response.make_conditional(request)
+    return response
+
+def error_response(error):
+    return json_response({'error': str(error)}, error.status)
+
+# ?fields=name,price -> ('id', 'name', 'price'), in the order the fields are declared
+def parse_fields(available, default):
+    raw = request.args.get('fields')
+    if not raw:
+        return default
+    wanted = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = wanted - set(available)
+    if unknown:
+        raise ApiError(f'Unknown fields: {", ".join(sorted(unknown))}. Available: {", ".join(available)}.')
+    return tuple(name for name in available if name == 'id' or name in wanted)
+
+def parse_ids(raw):
+    try:
+        ids = [int(value) for value in raw.split(',') if value.strip()]
+    except ValueError:
+        raise ApiError('ids must be a comma-separated list of integers.')
+    if not ids or len(ids) > MAX_IDS:
+        raise ApiError(f'Pass between 1 and {MAX_IDS} ids.')
+    return list(dict.fromkeys(ids))
+
+# Rows are plain tuples; they are zipped with the field names without building ORM objects
+def to_documents(fields, rows):
+    return [dict(zip(fields, row)) for row in rows]
+
+def product_query(fields):
+    return (db.session.query(*(PRODUCT_FIELDS[name] for name in fields))
+            .outerjoin(ProductStock, ProductStock.product_id == Product.id))
+
+# GET /api/v1/products?ids=3,1,2 -> the products in the order asked for, resolved in one query
+def products_by_ids(ids, fields):
+    found = {row[0]: row for row in product_query(fields).filter(Product.id.in_(ids))}
+    return {
+        'data': to_documents(fields, [found[product_id] for product_id in ids if product_id in found]),
+        'missing': [product_id for product_id in ids if product_id not in found],
+    }
+
+# GET /api/v1/products -> one cursor page of the catalog, as on the HTML listing
+def product_page(fields):
+    sort = request.args.get('sort', 'name')
+    if sort not in SORT_KEYS:
+        raise ApiError(f'sort must be one of: {", ".join(SORT_KEYS)}.')
+    limit = min(max(request.args.get('limit', DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+    category_id = request.args.get('category', type=int)
+
+    # The cursor needs the sort column even when the client did not ask for it
+    sort_field = SORT_KEYS[sort][0].key
+    query_fields = fields if sort_field in fields else fields + (sort_field,)
+    pagination = paginate_products(category_id=category_id, sort=sort, after=request.args.get('after'),
+                                   before=request.args.get('before'), per_page=limit,
+                                   columns=[PRODUCT_FIELDS[name] for name in query_fields])
+
+    def link(**cursor):
+        args = {'sort': sort, 'limit': limit, **cursor}
+        if category_id:
+            args['category'] = category_id
+        if request.args.get('fields'):
+            args['fields'] = request.args['fields']
+        return url_for('api_products', **args)
+
+    rows = pagination.items if query_fields == fields else [row[:len(fields)] for row in pagination.items]
+    return {
+        'data': to_documents(fields, rows),
+        'links': {
+            'next': link(after=pagination.next_cursor) if pagination.has_next and pagination.items else None,
+            'prev': link(before=pagination.prev_cursor) if pagination.has_prev and pagination.items else None,
+        },
+        'meta': {'total': pagination.total},  # Approximate: cached for a minute
+    }
+
+def product_by_id(product_id, fields):
+    row = product_query(fields).filter(Product.id == product_id).first()
+    if row is None:
+        raise ApiError(f'Product {product_id} does not exist.', 404)
+    return {'data': to_documents(fields, [row])[0]}
+
+def categories(fields):
+    rows = db.session.query(*(CATEGORY_FIELDS[name] for name in fields)).order_by(Category.name, Category.id)
+    return {'data': to_documents(fields, rows)}
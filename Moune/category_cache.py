@@ -0,0 +1,66 @@
+# category_cache.py
+
+import threading
+from collections import namedtuple
+
+from extensions import db
+from models import Category
+
+# Detached, read-only view of a category row, safe to share across requests and threads
+CachedCategory = namedtuple('CachedCategory', ['id', 'name', 'parent_id'])
+
+class CategoryTree:
+    def __init__(self, categories, version):
+        self.version = version
+        self.categories = tuple(categories)  # Ordered by name
+        self.by_id = {c.id: c for c in self.categories}
+        self.names = {c.id: c.name for c in self.categories}
+        children = {}
+        for c in self.categories:
+            children.setdefault(c.parent_id, []).append(c.id)
+        self.children = {parent_id: tuple(ids) for parent_id, ids in children.items()}
+
+    def get(self, category_id):
+        return self.by_id.get(category_id)
+
+    def roots(self):
+        return [self.by_id[i] for i in self.children.get(None, ())]
+
+    def descendant_ids(self, category_id):
+        ids = []
+        stack = list(self.children.get(category_id, ()))
+        while stack:
+            child_id = stack.pop()
+            ids.append(child_id)
+            stack.extend(self.children.get(child_id, ()))
+        return ids
+
+    # (id, name) pairs for SelectField choices, in name order
+    def choices(self, exclude_id=None):
+        return [(c.id, c.name) for c in self.categories if c.id != exclude_id]
+
+_tree = None
+_version = 0
+_lock = threading.Lock()
+
+# Return the process-wide category tree, loading it with one query on first use after an invalidation
+def get_category_tree():
+    global _tree
+    tree = _tree
+    if tree is not None:
+        return tree
+    with _lock:
+        if _tree is None:
+            rows = db.session.query(Category.id, Category.name, Category.parent_id).order_by(Category.name).all()
+            _tree = CategoryTree((CachedCategory(*row) for row in rows), _version)
+        return _tree
+
+# Drop the cached tree; call after committing any category write
+def invalidate_category_cache():
+    global _tree, _version
+    with _lock:
+        _version += 1
+        _tree = None
+
+def category_cache_version():
+    return _version
@@ -0,0 +1,100 @@
+# checkout.py
+
+from datetime import datetime
+
+from extensions import db
+from audit import record_rows
+from models import Cart, CartItem, Inventory, Order, OrderItem, Product
+from stock import adjust_product_stock
+from sales_report import record_order_sales
+from sqlalchemy import select, update
+
+MAX_RESERVE_ATTEMPTS = 5  # Re-plans of a product's allocation after losing a race for a warehouse row
+
+inventory = Inventory.__table__
+
+class CheckoutError(Exception):
+    pass
+
+class EmptyCartError(CheckoutError):
+    def __init__(self):
+        super().__init__('Your cart is empty.')
+
+class InsufficientStockError(CheckoutError):
+    def __init__(self, product_name, requested, available):
+        self.product_name = product_name
+        self.requested = requested
+        self.available = available
+        super().__init__(f'Only {available} units of {product_name} are available (requested {requested}).')
+
+# Take `quantity` units of a product out of its warehouses, largest stock first.
+# Every decrement is a conditional UPDATE (quantity >= n), so concurrent buyers can never
+# drive a row negative; a lost race simply re-plans against the fresh quantities.
+# Returns the decremented inventory rows with their new quantities, for the audit log.
+def reserve_stock(connection, product_id, product_name, quantity):
+    remaining = quantity
+    changed = []
+    for _ in range(MAX_RESERVE_ATTEMPTS):
+        rows = connection.execute(
+            select(inventory.c.id, inventory.c.quantity)
+            .where(inventory.c.product_id == product_id, inventory.c.quantity > 0)
+            .order_by(inventory.c.quantity.desc(), inventory.c.id)
+        ).all()
+        available = sum(row.quantity for row in rows)
+        if available < remaining:
+            raise InsufficientStockError(product_name, quantity, available + quantity - remaining)
+
+        for row in rows:
+            take = min(row.quantity, remaining)
+            left = connection.execute(
+                update(inventory)
+                .where(inventory.c.id == row.id, inventory.c.quantity >= take)
+                .values(quantity=inventory.c.quantity - take, last_updated=datetime.utcnow())
+                .returning(inventory.c.quantity)
+            ).scalar()
+            if left is not None:
+                remaining -= take
+                changed.append({'id': row.id, 'product_id': product_id, 'quantity': left})
+            if remaining == 0:
+                adjust_product_stock(connection, product_id, -quantity)
+                return changed
+    raise InsufficientStockError(product_name, quantity, quantity - remaining)
+
+# Turn the user's cart into an Order in one short transaction: reserve stock for every line,
+# create the order and its items, add it to the sales rollups, and empty the cart. Nothing is kept if any line fails.
+# The core stock updates and cart deletes are audited with the same commit as the order.
+def place_order(user_id):
+    items = (db.session.query(CartItem.id, CartItem.product_id, CartItem.quantity, Product.name, Product.price)
+             .join(Cart, Cart.id == CartItem.cart_id)
+             .join(Product, Product.id == CartItem.product_id)
+             .filter(Cart.user_id == user_id)
+             .order_by(CartItem.product_id)  # Same row order for every buyer
+             .all())
+    if not items:
+        raise EmptyCartError()
+
+    try:
+        connection = db.session.connection()
+        for item in items:
+            record_rows(db.session, 'update', Inventory,
+                        reserve_stock(connection, item.product_id, item.name, item.quantity))
+
+        order = Order(
+            user_id=user_id,
+            status='Pending',
+            total_amount=sum(item.price * item.quantity for item in items),
+        )
+        order.order_items = [
+            OrderItem(product_id=item.product_id, quantity=item.quantity, unit_price=item.price)
+            for item in items
+        ]
+        db.session.add(order)
+        db.session.flush()
+        record_order_sales(connection, order.id)
+        CartItem.query.filter(CartItem.id.in_([item.id for item in items])).delete(synchronize_session=False)
+        record_rows(db.session, 'delete', CartItem, [{'id': item.id, 'product_id': item.product_id} for item in items])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return order
@@ -1,13 +1,63 @@
 import os
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, '.env'))
 
+# Pool settings for the database engines; in-memory SQLite keeps SQLAlchemy's single-connection pool
+def engine_options(uri):
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') == 'sqlite:'):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # Seconds before a pooled connection is replaced
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_pre_ping': True,
+    }
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY')
     if not SECRET_KEY:
         raise ValueError("No SECRET_KEY set for Flask application")
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'moune_ecommerce.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # Optional read-only engine (a replica, or the same SQLite file) used by the catalog read routes
+    SQLALCHEMY_READ_DATABASE_URI = os.environ.get('READ_DATABASE_URL')
+    # Applied to every new SQLite connection; WAL lets readers run alongside a writer
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # Milliseconds to wait on a locked database
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -65536)),  # Negative values are KiB, i.e. 64 MB
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+    }
+    # Seconds a logged-in user's identity and permissions are cached between requests (0 disables)
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 30))
+    # Worker boot: warm up mappers, templates and pool connections in create_app()
+    WARM_UP = os.environ.get('WARM_UP', '1') == '1'
+    WARM_UP_CONNECTIONS = int(os.environ.get('WARM_UP_CONNECTIONS', 2))
+    # Compiled Jinja templates shared by all worker processes (empty disables the cache)
+    JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'moune-jinja-cache'))
+    # Rendered catalog pages and product cards kept in memory per process (LRU, entries expire after the TTL)
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', '1') == '1'
+    PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 1000))
+    PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL', 60))
+    CARD_CACHE_SIZE = int(os.environ.get('CARD_CACHE_SIZE', 5000))
+    # Password hashing: werkzeug method with its parameters, and the bounded pool that runs it.
+    # Stored hashes made with other parameters are upgraded at the user's next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))  # 0: half the CPUs
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 16))  # Hashes waiting for a worker before rejecting
+    # Identical SQL statements within one request before it is reported as a possible N+1
+    METRICS_N_PLUS_ONE_THRESHOLD = int(os.environ.get('METRICS_N_PLUS_ONE_THRESHOLD', 5))
+    # Model audit log: JSON lines written after commit by a background thread
+    AUDIT_LOG_PATH = os.environ.get('AUDIT_LOG_PATH', 'logs/models.log')
+    AUDIT_LOG_MAX_BYTES = int(os.environ.get('AUDIT_LOG_MAX_BYTES', 10 * 1024 * 1024))
+    AUDIT_LOG_BACKUP_COUNT = int(os.environ.get('AUDIT_LOG_BACKUP_COUNT', 10))
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 1000))  # Committed transactions waiting to be written
+    AUDIT_DROP_POLICY = os.environ.get('AUDIT_DROP_POLICY', 'drop')  # 'drop' when the queue is full, or 'block' briefly
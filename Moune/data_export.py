@@ -0,0 +1,169 @@
+# data_export.py
+
+import csv
+import io
+import zlib
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from sqlalchemy import select
+
+from extensions import db
+from models import Category, Inventory, Order, OrderItem, Product, ProductStock, User, Warehouse
+from catalog_api import dumps
+
+FORMATS = ('csv', 'jsonl')
+MIMETYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+YIELD_PER = 1000  # Rows fetched from the cursor at a time; a server-side cursor on PostgreSQL
+CHUNK_SIZE = 64 * 1024  # Bytes of output buffered before a chunk is handed on
+
+PRODUCT_COLUMNS = {
+    'id': Product.id,
+    'name': Product.name,
+    'description': Product.description,
+    'price': Product.price,
+    'category_id': Product.category_id,
+    'category': Category.name,
+    'stock': db.func.coalesce(ProductStock.quantity, 0),
+}
+# The first three columns are the ones `flask import-inventory` reads back
+INVENTORY_COLUMNS = {
+    'product_id': Inventory.product_id,
+    'warehouse_id': Inventory.warehouse_id,
+    'quantity': Inventory.quantity,
+    'product': Product.name,
+    'warehouse': Warehouse.name,
+    'last_updated': Inventory.last_updated,
+}
+ORDER_COLUMNS = {
+    'order_id': Order.id,
+    'order_date': Order.order_date,
+    'status': Order.status,
+    'user_id': Order.user_id,
+    'username': User.username,
+    'total_amount': Order.total_amount,
+}
+ORDER_ITEM_COLUMNS = {
+    'product_id': OrderItem.product_id,
+    'product': Product.name,
+    'quantity': OrderItem.quantity,
+    'unit_price': OrderItem.unit_price,
+}
+
+def plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+# Run a select of plain columns and yield its rows without holding more than YIELD_PER of them
+def stream_rows(statement):
+    return db.session.execute(statement.execution_options(yield_per=YIELD_PER))
+
+def row_documents(fields, statement):
+    for row in stream_rows(statement):
+        yield {field: plain(value) for field, value in zip(fields, row)}
+
+# One export: the field names of its documents and a generator of the documents themselves.
+# Orders carry their lines in an 'items' list; in CSV each line becomes a row of its own.
+class Export:
+    def __init__(self, name, fields, documents, item_fields=()):
+        self.name = name
+        self.fields = tuple(fields)
+        self.item_fields = tuple(item_fields)
+        self.documents = documents
+        self.count = 0  # Documents written so far
+
+    def csv_header(self):
+        return self.fields + self.item_fields
+
+    def csv_rows(self):
+        for document in self.documents:
+            self.count += 1
+            row = [document[field] for field in self.fields]
+            if not self.item_fields:
+                yield row
+            elif not document['items']:
+                yield row + [''] * len(self.item_fields)
+            else:
+                for item in document['items']:
+                    yield row + [item[field] for field in self.item_fields]
+
+    def jsonl_lines(self):
+        for document in self.documents:
+            self.count += 1
+            yield dumps(document) + b'\n'
+
+    # The export encoded as byte chunks of about CHUNK_SIZE, optionally gzipped as they are produced
+    def chunks(self, output_format='csv', compress=False):
+        chunks = self.csv_chunks() if output_format == 'csv' else self.jsonl_chunks()
+        return gzip_chunks(chunks) if compress else chunks
+
+    def csv_chunks(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.csv_header())
+        for row in self.csv_rows():
+            writer.writerow(row)
+            if buffer.tell() >= CHUNK_SIZE:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+    def jsonl_chunks(self):
+        buffer = bytearray()
+        for line in self.jsonl_lines():
+            buffer += line
+            if len(buffer) >= CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+        yield bytes(buffer)
+
+def gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_products():
+    statement = (select(*PRODUCT_COLUMNS.values())
+                 .join(Category, Category.id == Product.category_id)
+                 .outerjoin(ProductStock, ProductStock.product_id == Product.id)
+                 .order_by(Product.id))
+    return Export('products', PRODUCT_COLUMNS, row_documents(tuple(PRODUCT_COLUMNS), statement))
+
+def export_inventory():
+    statement = (select(*INVENTORY_COLUMNS.values())
+                 .join(Product, Product.id == Inventory.product_id)
+                 .join(Warehouse, Warehouse.id == Inventory.warehouse_id)
+                 .order_by(Inventory.product_id, Inventory.warehouse_id))
+    return Export('inventory', INVENTORY_COLUMNS, row_documents(tuple(INVENTORY_COLUMNS), statement))
+
+# Orders placed from start to end (inclusive days, either may be None), oldest first, with their lines.
+# Order and line columns come from one joined query in order_date order, so the range is read
+# off ix_order_order_date and each order's lines arrive together.
+def export_orders(start=None, end=None):
+    statement = (select(*ORDER_COLUMNS.values(), *ORDER_ITEM_COLUMNS.values())
+                 .join(User, User.id == Order.user_id)
+                 .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+                 .outerjoin(Product, Product.id == OrderItem.product_id)
+                 .order_by(Order.order_date, Order.id, OrderItem.id))
+    if start:
+        statement = statement.where(Order.order_date >= start)
+    if end:
+        statement = statement.where(Order.order_date < end + timedelta(days=1))
+
+    fields, item_fields = tuple(ORDER_COLUMNS), tuple(ORDER_ITEM_COLUMNS)
+    width = len(fields)
+
+    def documents():
+        for _, rows in groupby(stream_rows(statement), key=lambda row: row[0]):
+            rows = list(rows)
+            document = {field: plain(value) for field, value in zip(fields, rows[0])}
+            document['items'] = [dict(zip(item_fields, row[width:])) for row in rows if row[width] is not None]
+            yield document
+
+    return Export('orders', fields, documents(), item_fields)
+
+def export_filename(export, output_format, compress=False):
+    return f'{export.name}-{datetime.utcnow():%Y%m%d}.{output_format}' + ('.gz' if compress else '')
@@ -0,0 +1,44 @@
+# engine_profile.py
+
+from functools import wraps
+
+from flask import g
+from sqlalchemy import create_engine, event
+
+from extensions import db
+
+# Run the configured PRAGMAs on every new DBAPI connection of a SQLite engine
+def apply_sqlite_pragmas(engine, pragmas, query_only=False):
+    if engine.dialect.name != 'sqlite':
+        return
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        if query_only:
+            cursor.execute('PRAGMA query_only=ON')
+        cursor.close()
+
+    event.listen(engine, 'connect', on_connect)
+
+# Apply the engine profile to the primary engine and create the optional read-only engine.
+# Must run before the first connection is opened, i.e. right after db.init_app().
+def init_engine_profile(app):
+    pragmas = app.config.get('SQLITE_PRAGMAS', {})
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, pragmas)
+
+    read_uri = app.config.get('SQLALCHEMY_READ_DATABASE_URI')
+    if read_uri:
+        read_engine = create_engine(read_uri, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        apply_sqlite_pragmas(read_engine, pragmas, query_only=True)
+        app.extensions['read_engine'] = read_engine
+
+# Mark a view as read-only so its queries go to the read engine
+def read_only(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.read_only = True
+        return f(*args, **kwargs)
+    return decorated_function
@@ -77,7 +77,7 @@ class AdminUserForm(FlaskForm):
 
 # forms.py
 from flask_wtf import FlaskForm
-from wtforms import FileField, SubmitField
+from wtforms import FileField, SubmitField, BooleanField, RadioField
 from flask_wtf.file import FileAllowed, FileRequired
 
 class BulkUploadForm(FlaskForm):
@@ -85,4 +85,15 @@ class BulkUploadForm(FlaskForm):
         FileRequired(),
         FileAllowed(['csv'], 'CSV files only!')
     ])
+    dry_run = BooleanField('Validate only (dry run)')
+    submit = SubmitField('Upload')
+
+class BulkInventoryForm(FlaskForm):
+    data_file = FileField('Stock file', validators=[
+        FileRequired(),
+        FileAllowed(['csv', 'jsonl'], 'CSV or JSON-lines files only!')
+    ])
+    mode = RadioField('Quantities are', choices=[('set', 'New stock levels'), ('delta', 'Changes to add (negative to remove)')],
+                      default='set')
+    dry_run = BooleanField('Validate only (dry run)')
     submit = SubmitField('Upload')
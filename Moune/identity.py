@@ -0,0 +1,118 @@
+# identity.py
+
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from flask import current_app, g, session
+from extensions import db
+from models import User
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Roles for users
+ROLE_PERMISSIONS = {
+    'super_admin': ['manage_products', 'manage_orders', 'manage_inventory', 'manage_categories', 'manage_users'],
+    'product_manager': ['manage_products'],
+    'order_manager': ['manage_orders'],
+    'inventory_manager': ['manage_inventory'],
+    'category_manager': ['manage_categories'],
+    'user_manager': ['manage_users'],
+}
+
+ADMIN_ROLES = [
+    'super_admin',
+    'product_manager',
+    'order_manager',
+    'inventory_manager',
+    'category_manager',
+    'user_manager'
+]
+
+# Detached snapshot of the logged-in user, with roles and permissions resolved once
+Identity = namedtuple('Identity', ['id', 'username', 'email', 'roles', 'permissions', 'is_admin', 'is_super_admin'])
+
+# Resolve a comma-separated roles string into (roles, permissions) frozensets.
+# Only a handful of distinct role combinations exist, so the result is memoized.
+@lru_cache(maxsize=256)
+def resolve_roles(roles):
+    user_roles = frozenset(role for role in roles.split(',') if role)
+    permissions = set()
+    for role in user_roles:
+        permissions.update(ROLE_PERMISSIONS.get(role, []))
+    return user_roles, frozenset(permissions)
+
+def build_identity(user_id, username, email, roles):
+    user_roles, permissions = resolve_roles(roles)
+    return Identity(
+        id=user_id,
+        username=username,
+        email=email,
+        roles=user_roles,
+        permissions=permissions,
+        is_admin=any(role in ADMIN_ROLES for role in user_roles),
+        is_super_admin='super_admin' in user_roles,
+    )
+
+# Short-lived process-wide identity cache keyed by user id, invalidated wholesale by bumping the
+# roles version once a transaction that changed a user's identity columns or deleted a user commits.
+# Bumping at flush time would let a concurrent request cache the still-committed old roles under
+# the new version.
+IDENTITY_COLUMNS = ('username', 'email', 'roles')
+
+_identity_cache = {}
+_identity_cache_lock = threading.Lock()
+_roles_version = 0
+
+def bump_roles_version():
+    global _roles_version
+    with _identity_cache_lock:
+        _roles_version += 1
+        _identity_cache.clear()
+
+def user_after_update(mapper, connection, target):
+    state = db.inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in IDENTITY_COLUMNS):
+        state.session.info['identity_changed'] = True
+
+def user_after_delete(mapper, connection, target):
+    db.inspect(target).session.info['identity_changed'] = True
+
+def identity_after_commit(session):
+    if session.info.pop('identity_changed', False):
+        bump_roles_version()
+
+def identity_after_rollback(session):
+    session.info.pop('identity_changed', None)
+
+event.listen(User, 'after_update', user_after_update)
+event.listen(User, 'after_delete', user_after_delete)
+event.listen(Session, 'after_commit', identity_after_commit)
+event.listen(Session, 'after_rollback', identity_after_rollback)
+
+def load_identity(user_id):
+    ttl = current_app.config.get('IDENTITY_CACHE_TTL', 0)
+    now = time.monotonic()
+    if ttl:
+        with _identity_cache_lock:
+            cached = _identity_cache.get(user_id)
+            if cached and cached[0] == _roles_version and cached[1] > now:
+                return cached[2]
+            version = _roles_version
+
+    row = db.session.query(User.id, User.username, User.email, User.roles).filter(User.id == user_id).first()
+    identity = build_identity(*row) if row else None
+
+    if ttl and identity is not None:
+        with _identity_cache_lock:
+            if version == _roles_version:
+                _identity_cache[user_id] = (version, now + ttl, identity)
+    return identity
+
+# Return the identity for the session's user, loading it at most once per request
+def get_current_user():
+    if 'current_user' not in g:
+        user_id = session.get('user_id')
+        g.current_user = load_identity(user_id) if user_id else None
+    return g.current_user
@@ -0,0 +1,246 @@
+# inventory_import.py
+
+import csv
+import json
+import time
+from datetime import datetime
+from itertools import islice
+
+from extensions import db
+from audit import record_rows
+from models import Inventory, Product, ProductStock, Warehouse
+from sqlalchemy import bindparam, func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+REQUIRED_FIELDS = ('product_id', 'warehouse_id', 'quantity')
+FORMATS = ('csv', 'jsonl')
+MODES = ('set', 'delta')  # 'set' replaces the stock level, 'delta' adds to it (negative to take away)
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100  # Row errors kept in the report; the rest are only counted
+
+inventory = Inventory.__table__
+product_stock = ProductStock.__table__
+
+class InventoryImportReport:
+    def __init__(self, mode, dry_run=False):
+        self.mode = mode
+        self.dry_run = dry_run
+        self.rows_read = 0
+        self.rows_applied = 0
+        self.error_count = 0
+        self.errors = []  # (line number, message)
+        self.clamped_count = 0
+        self.clamped = []  # (product_id, warehouse_id) of delta updates that would have gone below zero
+        self.product_ids = set()
+        self.batches = 0
+        self.elapsed = 0.0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def add_clamped(self, key):
+        self.clamped_count += 1
+        if len(self.clamped) < MAX_REPORTED_ERRORS:
+            self.clamped.append(key)
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        verb = 'Would apply' if self.dry_run else 'Applied'
+        return (f'{verb} {self.rows_applied} stock levels ({self.mode}) to {len(self.product_ids)} products from '
+                f'{self.rows_read} rows ({self.error_count} errors, {self.clamped_count} clamped at zero) '
+                f'in {self.elapsed:.2f}s '
+                f'({self.rows_per_second:.0f} rows/s).')
+
+    def to_dict(self):
+        return {
+            'mode': self.mode,
+            'dry_run': self.dry_run,
+            'rows_read': self.rows_read,
+            'rows_applied': self.rows_applied,
+            'products': len(self.product_ids),
+            'error_count': self.error_count,
+            'errors': [{'line': line, 'error': message} for line, message in self.errors],
+            'clamped_count': self.clamped_count,
+            'clamped': [{'product_id': product_id, 'warehouse_id': warehouse_id}
+                        for product_id, warehouse_id in self.clamped],
+            'batches': self.batches,
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+# (line number, record) pairs from a CSV or JSON-lines text stream, read lazily
+def read_records(stream, input_format):
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f'Missing CSV columns: {", ".join(missing)}')
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError:
+                yield line, None
+                continue
+            yield line, record if isinstance(record, dict) else None
+
+# Validate one record; returns (product_id, warehouse_id, quantity) or raises ValueError
+def parse_record(record, mode):
+    if record is None:
+        raise ValueError('Not a JSON object')
+    values = []
+    for field in REQUIRED_FIELDS:
+        value = record.get(field)
+        try:
+            values.append(int(str(value).strip()))
+        except ValueError:
+            raise ValueError(f'Invalid {field} "{value}"' if value not in (None, '') else f'Missing {field}')
+    if mode == 'set' and values[2] < 0:
+        raise ValueError(f'Negative quantity "{values[2]}"')
+    return tuple(values)
+
+# Deltas apply row by row and a level stops at zero, so taking 5 off 3 and then adding 3 leaves 3.
+# The deltas of one (product, warehouse) compose into a single step, quantity -> max(quantity + delta,
+# floor), which gives the same result whether the rows land in one batch or several.
+def add_delta(step, delta):
+    total, floor = step
+    return total + delta, max(floor + delta, 0)
+
+def apply_delta(quantity, step):
+    total, floor = step
+    return max(quantity + total, floor)
+
+# INSERT ... ON CONFLICT (product_id, warehouse_id) DO UPDATE, for the dialects that have it.
+# Delta rows carry their composed step as the delta and floor parameters; a new row is inserted
+# with the step applied to zero.
+def upsert_statement(mode):
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        statement, greatest = sqlite.insert(inventory), func.max
+    elif dialect == 'postgresql':
+        statement, greatest = postgresql.insert(inventory), func.greatest
+    else:
+        raise RuntimeError(f'Bulk inventory upserts are not supported on {dialect}.')
+    if mode == 'set':
+        quantity = statement.excluded.quantity
+    else:
+        quantity = greatest(inventory.c.quantity + bindparam('delta'), bindparam('floor'))
+    return statement.on_conflict_do_update(
+        index_elements=[inventory.c.product_id, inventory.c.warehouse_id],
+        set_={'quantity': quantity, 'last_updated': statement.excluded.last_updated},
+    )
+
+# Stock levels of the given (product_id, warehouse_id) keys that already exist
+def current_levels(keys):
+    rows = db.session.execute(
+        select(inventory.c.product_id, inventory.c.warehouse_id, inventory.c.quantity)
+        .where(tuple_(inventory.c.product_id, inventory.c.warehouse_id).in_(list(keys))))
+    return {(product_id, warehouse_id): quantity for product_id, warehouse_id, quantity in rows}
+
+# Recompute the ProductStock rollup of the given products from their Inventory rows.
+# Runs in the transaction that wrote those rows, so it sees exactly what will be committed.
+def refresh_product_stock(connection, product_ids):
+    totals = (select(func.coalesce(func.sum(inventory.c.quantity), 0))
+              .where(inventory.c.product_id == product_stock.c.product_id)
+              .scalar_subquery())
+    connection.execute(product_stock.update().where(product_stock.c.product_id.in_(product_ids))
+                       .values(quantity=totals))
+    existing = select(product_stock.c.product_id).where(product_stock.c.product_id.in_(product_ids))
+    connection.execute(product_stock.insert().from_select(
+        ['product_id', 'quantity'],
+        select(inventory.c.product_id, func.sum(inventory.c.quantity))
+        .where(inventory.c.product_id.in_(product_ids), inventory.c.product_id.not_in(existing))
+        .group_by(inventory.c.product_id)))
+
+# Stream stock levels into Inventory. Each batch is merged per (product, warehouse), checked against the
+# known products and warehouses, written with one executemany upsert, has its ProductStock rollup
+# refreshed and is committed in its own transaction. Delta updates never take a level below zero;
+# those that would have are listed in the report.
+# With dry_run the input is only validated.
+def import_inventory(stream, input_format='csv', mode='set', batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    if input_format not in FORMATS:
+        raise ValueError(f'Unknown format: {input_format}')
+    if mode not in MODES:
+        raise ValueError(f'Unknown mode: {mode}')
+    report = InventoryImportReport(mode, dry_run=dry_run)
+    started = time.perf_counter()
+
+    warehouse_ids = {warehouse_id for (warehouse_id,) in db.session.query(Warehouse.id)}
+    statement = None if dry_run else upsert_statement(mode)
+    records = read_records(stream, input_format)
+    try:
+        while True:
+            try:
+                chunk = list(islice(records, batch_size))
+            except ValueError as e:
+                report.add_error(1, str(e))
+                break
+            if not chunk:
+                break
+
+            levels = {}  # (product_id, warehouse_id) -> quantity, or the composed step of its deltas
+            lines = {}
+            for line, record in chunk:
+                report.rows_read += 1
+                try:
+                    product_id, warehouse_id, quantity = parse_record(record, mode)
+                except ValueError as e:
+                    report.add_error(line, str(e))
+                    continue
+                if warehouse_id not in warehouse_ids:
+                    report.add_error(line, f'Unknown warehouse {warehouse_id}')
+                    continue
+                key = (product_id, warehouse_id)
+                levels[key] = add_delta(levels.get(key, (0, 0)), quantity) if mode == 'delta' else quantity
+                lines.setdefault(product_id, []).append(line)
+
+            known = {product_id for (product_id,) in db.session.execute(
+                select(Product.id).where(Product.id.in_({product_id for product_id, _ in levels})))}
+            for product_id in set(lines) - known:
+                for line in lines[product_id]:
+                    report.add_error(line, f'Unknown product {product_id}')
+            levels = {key: level for key, level in levels.items() if key[0] in known}
+            now = datetime.utcnow()
+            if mode == 'set':
+                rows = [{'product_id': product_id, 'warehouse_id': warehouse_id, 'quantity': quantity,
+                         'last_updated': now}
+                        for (product_id, warehouse_id), quantity in levels.items()]
+            else:
+                # Read only to report clamping; the upsert itself computes the levels atomically
+                existing = current_levels(levels) if levels else {}
+                rows = []
+                for key, step in levels.items():
+                    quantity = existing.get(key, 0)
+                    if apply_delta(quantity, step) > quantity + step[0]:
+                        report.add_clamped(key)
+                    rows.append({'product_id': key[0], 'warehouse_id': key[1], 'quantity': apply_delta(0, step),
+                                 'delta': step[0], 'floor': step[1], 'last_updated': now})
+
+            if rows and not dry_run:
+                connection = db.session.connection()
+                connection.execute(statement, rows)
+                refresh_product_stock(connection, {row['product_id'] for row in rows})
+                change = 'quantity' if mode == 'set' else 'delta'
+                record_rows(db.session, 'upsert', Inventory,
+                            [{'product_id': row['product_id'], 'warehouse_id': row['warehouse_id'],
+                              change: row[change]} for row in rows])
+                db.session.commit()
+            report.rows_applied += sum(len(lines[product_id]) for product_id in known)
+            report.product_ids.update(known)
+            report.batches += 1
+    except Exception:
+        db.session.rollback()
+        raise
+
+    report.errors.sort()  # Unknown products are only found once their batch is complete
+    report.elapsed = time.perf_counter() - started
+    return report
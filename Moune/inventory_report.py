@@ -0,0 +1,70 @@
+# inventory_report.py
+
+from extensions import db
+from models import Inventory, Product, StockThreshold, Warehouse
+from sqlalchemy.orm import aliased
+
+product_threshold = aliased(StockThreshold)
+warehouse_threshold = aliased(StockThreshold)
+
+# Low-stock rows with product and warehouse names in one query. The effective threshold is the
+# product override, else the warehouse override, else the default. The plain `quantity <= highest
+# threshold` predicate lets the database narrow rows with the Inventory quantity index first.
+def low_stock_query(default_threshold, warehouse_id=None):
+    effective_threshold = db.func.coalesce(product_threshold.threshold, warehouse_threshold.threshold, default_threshold)
+    highest_threshold = max(default_threshold, db.session.query(db.func.max(StockThreshold.threshold)).scalar() or 0)
+
+    query = (db.session.query(
+                Inventory.id,
+                Inventory.product_id,
+                Inventory.warehouse_id,
+                Inventory.quantity,
+                Product.name.label('product_name'),
+                Warehouse.name.label('warehouse_name'),
+                effective_threshold.label('threshold'))
+             .join(Product, Product.id == Inventory.product_id)
+             .join(Warehouse, Warehouse.id == Inventory.warehouse_id)
+             .outerjoin(product_threshold, product_threshold.product_id == Inventory.product_id)
+             .outerjoin(warehouse_threshold, warehouse_threshold.warehouse_id == Inventory.warehouse_id)
+             .filter(Inventory.quantity <= highest_threshold, Inventory.quantity <= effective_threshold))
+    if warehouse_id:
+        query = query.filter(Inventory.warehouse_id == warehouse_id)
+    return query.order_by(Inventory.quantity, Product.name, Inventory.id)
+
+# Full warehouse stock grid, one row per Inventory record, ordered for grouping by warehouse
+def stock_grid_query(warehouse_id=None):
+    query = (db.session.query(
+                Inventory.id,
+                Inventory.quantity,
+                Product.name.label('product_name'),
+                Warehouse.id.label('warehouse_id'),
+                Warehouse.name.label('warehouse_name'),
+                Warehouse.location.label('warehouse_location'))
+             .join(Product, Product.id == Inventory.product_id)
+             .join(Warehouse, Warehouse.id == Inventory.warehouse_id))
+    if warehouse_id:
+        query = query.filter(Inventory.warehouse_id == warehouse_id)
+    return query.order_by(Warehouse.name, Warehouse.id, Product.name, Inventory.id)
+
+# Create, change or (with threshold=None) remove the override for a product or a warehouse
+def set_threshold(threshold, product_id=None, warehouse_id=None):
+    if (product_id is None) == (warehouse_id is None):
+        raise ValueError('Set a threshold for either a product or a warehouse.')
+    override = StockThreshold.query.filter_by(product_id=product_id, warehouse_id=warehouse_id).first()
+    if threshold is None:
+        if override:
+            db.session.delete(override)
+    elif override:
+        override.threshold = threshold
+    else:
+        db.session.add(StockThreshold(product_id=product_id, warehouse_id=warehouse_id, threshold=threshold))
+    db.session.commit()
+
+def list_thresholds():
+    return (db.session.query(StockThreshold.id, StockThreshold.product_id, StockThreshold.warehouse_id,
+                             StockThreshold.threshold, Product.name.label('product_name'),
+                             Warehouse.name.label('warehouse_name'))
+            .outerjoin(Product, Product.id == StockThreshold.product_id)
+            .outerjoin(Warehouse, Warehouse.id == StockThreshold.warehouse_id)
+            .order_by(Warehouse.name, Product.name)
+            .all())
@@ -0,0 +1,177 @@
+# log_reader.py
+
+import json
+import os
+import re
+import threading
+
+INDEX_STRIDE = 256  # Lines between two recorded offsets in a sparse line index
+READ_BLOCK_SIZE = 64 * 1024
+
+# Lines written by the pre-JSON model logger: "<asctime> INFO: Inserted Product: <Product x>"
+LEGACY_LINE = re.compile(r'^(?P<ts>\S+ \S+) \w+: (?P<op>Inserted|Updated|Deleted) (?P<model>\w+): (?P<repr>.*)$')
+LEGACY_OPERATIONS = {'Inserted': 'insert', 'Updated': 'update', 'Deleted': 'delete'}
+
+# Sparse line-offset index of one log file: offsets[k] is the byte offset of line k * INDEX_STRIDE.
+# Only complete lines are indexed; a growing file is extended from where the last build stopped.
+class LineIndex:
+    def __init__(self, path, inode):
+        self.path = path
+        self.inode = inode
+        self.offsets = [0]
+        self.line_count = 0
+        self.indexed_bytes = 0
+
+    def extend(self):
+        with open(self.path, 'rb') as f:
+            f.seek(self.indexed_bytes)
+            block_start = self.indexed_bytes
+            while True:
+                block = f.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                start = 0
+                while True:
+                    newline = block.find(b'\n', start)
+                    if newline == -1:
+                        break
+                    self.line_count += 1
+                    line_end = block_start + newline + 1
+                    if self.line_count % INDEX_STRIDE == 0:
+                        self.offsets.append(line_end)
+                    # A partial trailing line stays unindexed until it is completed
+                    self.indexed_bytes = line_end
+                    start = newline + 1
+                block_start += len(block)
+
+    # Read lines [first, first + count) with one seek to the nearest indexed offset
+    def read_lines(self, first, count):
+        lines = []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[first // INDEX_STRIDE])
+            for _ in range(first % INDEX_STRIDE):
+                f.readline()
+            for _ in range(count):
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    break
+                lines.append(line.decode('utf-8', errors='replace').rstrip('\n'))
+        return lines
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_line_index(path):
+    stat = os.stat(path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        # Rotation renames files, so a different inode or a shrunken file means a new file
+        if index is None or index.inode != stat.st_ino or stat.st_size < index.indexed_bytes:
+            index = LineIndex(path, stat.st_ino)
+            _indexes[path] = index
+        if stat.st_size > index.indexed_bytes:
+            index.extend()
+        return index
+
+# Rotated segments of a log, newest first: models.log, models.log.1, models.log.2, ...
+def log_segments(base_path):
+    segments = [base_path] if os.path.exists(base_path) else []
+    number = 1
+    while os.path.exists(f'{base_path}.{number}'):
+        segments.append(f'{base_path}.{number}')
+        number += 1
+    return segments
+
+def parse_entry(line):
+    try:
+        entry = json.loads(line)
+        if isinstance(entry, dict):
+            return entry
+    except ValueError:
+        pass
+    match = LEGACY_LINE.match(line)
+    if match:
+        return {'ts': match.group('ts'), 'op': LEGACY_OPERATIONS[match.group('op')],
+                'model': match.group('model'), 'id': None, 'repr': match.group('repr')}
+    return {'ts': None, 'op': None, 'model': None, 'id': None, 'repr': line}
+
+# Yield raw lines of one file from the end backwards, reading fixed-size blocks
+def iter_lines_reverse(path):
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+        while position > 0:
+            size = min(READ_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b'\n')
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line.decode('utf-8', errors='replace')
+        if remainder:
+            yield remainder.decode('utf-8', errors='replace')
+
+class LogPage:
+    def __init__(self, entries, page, per_page, has_next, total=None):
+        self.entries = entries
+        self.page = page
+        self.per_page = per_page
+        self.has_next = has_next
+        self.total = total  # Known only for unfiltered pages
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return max(1, -(-self.total // self.per_page))
+
+# One page of log entries, newest first, across the current and rotated log files.
+# Unfiltered pages are located through the line indexes; filtered pages stream backwards
+# from the end and stop as soon as the page is filled.
+def read_log_page(base_path, page=1, per_page=100, model=None, operation=None):
+    page = max(page, 1)
+    segments = log_segments(base_path)
+    skip = (page - 1) * per_page
+
+    if model or operation:
+        entries = []
+        for path in segments:
+            for line in iter_lines_reverse(path):
+                # Cheap substring checks before paying for JSON parsing
+                if model and model not in line:
+                    continue
+                entry = parse_entry(line)
+                if (model and entry.get('model') != model) or (operation and entry.get('op') != operation):
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                if len(entries) == per_page:
+                    return LogPage(entries, page, per_page, has_next=True)
+                entries.append(entry)
+        return LogPage(entries, page, per_page, has_next=False)
+
+    indexes = [get_line_index(path) for path in segments]
+    total = sum(index.line_count for index in indexes)
+    entries = []
+    wanted = per_page
+    for index in indexes:
+        if skip >= index.line_count:
+            skip -= index.line_count
+            continue
+        # Newest-first position `skip` in this file is line number line_count - 1 - skip
+        last = index.line_count - skip
+        first = max(0, last - wanted)
+        lines = index.read_lines(first, last - first)
+        entries.extend(parse_entry(line) for line in reversed(lines))
+        wanted -= len(lines)
+        skip = 0
+        if wanted <= 0:
+            break
+    return LogPage(entries, page, per_page, has_next=page * per_page < total, total=total)
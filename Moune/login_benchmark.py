@@ -0,0 +1,147 @@
+# login_benchmark.py
+#
+# Login benchmark: drives the customer login route and the catalog routes at the same time and
+# reports, for each size of the password hashing pool, login throughput and rejections next to
+# catalog latency. A catalog-only round gives the baseline. Results are written as JSON.
+#
+#   python login_benchmark.py --duration 10 --login-workers 16 --catalog-workers 4 --hash-workers 1,2,4
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmark import percentile, git_revision
+
+PASSWORD = 'Bench@1234'
+CATALOG_URLS = ['/products', '/products?sort=price', '/search?q=sample']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Login throughput against concurrent catalog traffic.')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per round')
+    parser.add_argument('--login-workers', type=int, default=16, help='Threads posting to /login')
+    parser.add_argument('--catalog-workers', type=int, default=4, help='Threads browsing the catalog')
+    parser.add_argument('--hash-workers', default='1,2,4', help='Comma-separated hashing pool sizes, one round each')
+    parser.add_argument('--hash-queue', type=int, default=16, help='Hashes allowed to wait for a pool worker')
+    parser.add_argument('--method', default=None, help='Password hash method (default: PASSWORD_HASH_METHOD)')
+    parser.add_argument('--customers', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='login_benchmark.json')
+    return parser.parse_args()
+
+def summarize(latencies, statuses, elapsed):
+    latencies.sort()
+    milliseconds = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'requests': len(latencies),
+        'statuses': statuses,
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'p50_ms': milliseconds(percentile(latencies, 0.50)),
+        'p95_ms': milliseconds(percentile(latencies, 0.95)),
+        'p99_ms': milliseconds(percentile(latencies, 0.99)),
+    }
+
+# One round: every worker loops until the deadline; returns the login and catalog summaries
+def run_round(app, args, emails, login_workers):
+    results = {'login': ([], {}), 'catalog': ([], {})}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def worker(kind, worker_id):
+        rng = random.Random(args.seed * 1000 + worker_id)
+        client = app.test_client()
+        local = []
+        statuses = {}
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if kind == 'login':
+                response = client.post('/login', data={'email': rng.choice(emails), 'password': PASSWORD})
+                with client.session_transaction() as session:
+                    session.clear()
+            else:
+                response = client.get(rng.choice(CATALOG_URLS))
+            local.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        with lock:
+            latencies, totals = results[kind]
+            latencies.extend(local)
+            for status, number in statuses.items():
+                totals[status] = totals.get(status, 0) + number
+
+    threads = [threading.Thread(target=worker, args=('login', i)) for i in range(login_workers)]
+    threads += [threading.Thread(target=worker, args=('catalog', i)) for i in range(args.catalog_workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {kind: summarize(latencies, statuses, elapsed) for kind, (latencies, statuses) in results.items()}
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix='moune-login-bench-')
+
+    # The app configures its database from the environment and writes logs to the working directory
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'benchmark.db')
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from app import create_app, init_database
+    from extensions import db
+    from models import User
+    from passwords import password_hasher
+
+    settings = {'WTF_CSRF_ENABLED': False, 'PAGE_CACHE_ENABLED': False, 'WARM_UP': False,
+                'PASSWORD_HASH_QUEUE': args.hash_queue}
+    if args.method:
+        settings['PASSWORD_HASH_METHOD'] = args.method
+
+    app = create_app(**settings)
+    with app.app_context():
+        init_database()
+        # Every customer shares one hash so that seeding costs a single hashing run
+        password_hash = password_hasher.hash(PASSWORD)
+        db.session.add_all([User(username=f'bench{i}', email=f'bench{i}@example.com', roles='customer',
+                                 password_hash=password_hash) for i in range(args.customers)])
+        db.session.commit()
+        method = password_hasher.method
+    emails = [f'bench{i}@example.com' for i in range(args.customers)]
+
+    rounds = {'catalog_only': run_round(app, args, emails, login_workers=0)}
+    print(f'{"round":<16}{"login rps":>10}{"rejected":>10}{"login p95":>11}{"catalog rps":>13}{"catalog p95":>13}')
+    for workers in [int(value) for value in args.hash_workers.split(',')]:
+        app = create_app(PASSWORD_HASH_WORKERS=workers, **settings)
+        rounds[f'hash_workers_{workers}'] = run_round(app, args, emails, login_workers=args.login_workers)
+    for name, result in rounds.items():
+        login, catalog = result['login'], result['catalog']
+        print(f'{name:<16}{login["rps"] or 0:>10}{login["statuses"].get("503", 0):>10}{login["p95_ms"] or "-":>11}'
+              f'{catalog["rps"]:>13}{catalog["p95_ms"]:>13}', flush=True)
+
+    report = {
+        'started_at': datetime.utcnow().isoformat(),
+        'git_revision': git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'parameters': dict(vars(args), method=method),
+        'rounds': rounds,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+# metrics.py
+
+import logging
+import threading
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5  # Identical statements in one request before it is flagged
+
+logger = logging.getLogger('main_logger')
+
+# Cumulative Prometheus-style histogram with one series per label value
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}  # label -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, label, value):
+        series = self.series.get(label)
+        if series is None:
+            series = self.series[label] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self, label_name):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label, series in sorted(self.series.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="+Inf"}} {series[-2]}')
+            lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {series[-1]:.6f}')
+            lines.append(f'{self.name}_count{{{label_name}="{label}"}} {series[-2]}')
+        return lines
+
+# Monotonic counter keyed by a tuple of label values
+class LabeledCounter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values = Counter()
+
+    def inc(self, labels, amount=1):
+        self.values[labels] += amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self.values.items()):
+            pairs = ','.join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+            lines.append(f'{self.name}{{{pairs}}} {value}')
+        return lines
+
+# Per-request measurements, kept on flask.g while the request runs
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.render_started = None
+        self.statements = Counter()
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = Histogram('moune_request_duration_seconds', 'Total request latency.', LATENCY_BUCKETS)
+        self.sql_time = Histogram('moune_request_sql_seconds', 'Time spent executing SQL per request.', LATENCY_BUCKETS)
+        self.render_time = Histogram('moune_request_render_seconds', 'Time spent rendering templates per request.', LATENCY_BUCKETS)
+        self.query_count = Histogram('moune_request_queries', 'SQL statements executed per request.', QUERY_COUNT_BUCKETS)
+        self.requests = LabeledCounter('moune_requests_total', 'Requests served.', ('endpoint', 'status'))
+        self.n_plus_one = LabeledCounter('moune_n_plus_one_suspects_total',
+                                         'Requests that repeated an identical SQL statement.', ('endpoint',))
+
+    def observe(self, endpoint, status, stats, latency, repeated):
+        with self.lock:
+            self.latency.observe(endpoint, latency)
+            self.sql_time.observe(endpoint, stats.sql_time)
+            self.render_time.observe(endpoint, stats.render_time)
+            self.query_count.observe(endpoint, stats.query_count)
+            self.requests.inc((endpoint, str(status)))
+            if repeated:
+                self.n_plus_one.inc((endpoint,))
+
+    # Prometheus text exposition format
+    def render(self):
+        with self.lock:
+            lines = []
+            for histogram in (self.latency, self.sql_time, self.render_time, self.query_count):
+                lines.extend(histogram.render('endpoint'))
+            lines.extend(self.requests.render())
+            lines.extend(self.n_plus_one.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+_threshold = DEFAULT_N_PLUS_ONE_THRESHOLD
+
+def _current_stats():
+    if has_request_context():
+        return g.get('request_stats')
+    return None
+
+# Engine-class listeners see every engine, including the read engine
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    if _current_stats() is not None:
+        connection.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    stats = _current_stats()
+    started = connection.info.get('query_started')
+    if stats is None or not started:
+        return
+    stats.sql_time += time.perf_counter() - started.pop()
+    stats.query_count += 1
+    stats.statements[statement] += 1
+
+event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+def _before_render(sender, template, context, **extra):
+    stats = _current_stats()
+    if stats is not None:
+        stats.render_started = time.perf_counter()
+
+def _after_render(sender, template, context, **extra):
+    stats = _current_stats()
+    if stats is not None and stats.render_started is not None:
+        stats.render_time += time.perf_counter() - stats.render_started
+        stats.render_started = None
+
+def _start_request():
+    g.request_stats = RequestStats()
+
+def _finish_request(response):
+    stats = g.pop('request_stats', None)
+    if stats is None:
+        return response
+    endpoint = request.endpoint or 'unmatched'
+    repeated = [(statement, count) for statement, count in stats.statements.items() if count >= _threshold]
+    if repeated:
+        statement, count = max(repeated, key=lambda item: item[1])
+        logger.warning(f'Possible N+1 in {endpoint}: statement ran {count} times: {" ".join(statement.split())[:200]}')
+    registry.observe(endpoint, response.status_code, stats, time.perf_counter() - stats.started, bool(repeated))
+    return response
+
+def init_metrics(app):
+    global _threshold
+    _threshold = app.config.get('METRICS_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
@@ -0,0 +1,75 @@
+# migrations.py
+
+from datetime import datetime
+
+from extensions import db
+from models import CartItem, Inventory
+from sqlalchemy import func, select
+
+# Applied schema migrations, one row per version
+schema_migration = db.Table(
+    'schema_migration',
+    db.Column('version', db.Integer, primary_key=True),
+    db.Column('description', db.String(200), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False, default=datetime.utcnow),
+)
+
+# Collapse rows sharing `key_columns` into the lowest id, summing `quantity_column`
+def merge_duplicates(connection, table, key_columns, quantity_column):
+    groups = connection.execute(
+        select(*key_columns, func.min(table.c.id), func.sum(quantity_column))
+        .group_by(*key_columns)
+        .having(func.count() > 1)
+    ).all()
+    for *key, keep_id, total in groups:
+        match = [column == value for column, value in zip(key_columns, key)]
+        connection.execute(table.update().where(table.c.id == keep_id).values({quantity_column.key: total}))
+        connection.execute(table.delete().where(*match, table.c.id != keep_id))
+    return len(groups)
+
+def create_indexes(connection, names):
+    indexes = {index.name: index for table in db.metadata.tables.values() for index in table.indexes}
+    for name in names:
+        indexes[name].create(connection, checkfirst=True)
+
+def add_hot_query_indexes(connection):
+    inventory = Inventory.__table__
+    cart_item = CartItem.__table__
+    # The unique indexes below require one row per key; totals are preserved by summing
+    merge_duplicates(connection, inventory, [inventory.c.product_id, inventory.c.warehouse_id], inventory.c.quantity)
+    merge_duplicates(connection, cart_item, [cart_item.c.cart_id, cart_item.c.product_id], cart_item.c.quantity)
+    create_indexes(connection, [
+        'uq_inventory_product_warehouse', 'ix_inventory_warehouse_id', 'ix_inventory_quantity',
+        'uq_cart_item_cart_product',
+        'ix_product_name', 'ix_product_price', 'ix_product_category_name', 'ix_product_category_price',
+        'ix_order_order_date', 'ix_order_user_id', 'ix_order_status',
+        'ix_order_item_order_id', 'ix_order_item_product_id',
+        'ix_category_name', 'ix_category_parent_id',
+    ])
+
+def add_admin_grid_indexes(connection):
+    # Status-filtered order lists sorted by date
+    create_indexes(connection, ['ix_order_status_order_date'])
+
+# Ordered list of (version, description, function); append new migrations, never edit applied ones
+MIGRATIONS = [
+    (1, 'Add indexes for hot queries and uniqueness on inventory and cart lines', add_hot_query_indexes),
+    (2, 'Add an order status and date index for the admin order grid', add_admin_grid_indexes),
+]
+
+def current_version(connection):
+    return connection.execute(select(func.coalesce(func.max(schema_migration.c.version), 0))).scalar()
+
+# Apply every pending migration, each in its own transaction. Returns the versions applied.
+def upgrade_schema():
+    schema_migration.create(db.engine, checkfirst=True)
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        with db.engine.begin() as connection:
+            if version <= current_version(connection):
+                continue
+            migrate(connection)
+            connection.execute(schema_migration.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()))
+        applied.append(version)
+    return applied
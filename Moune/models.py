@@ -2,7 +2,7 @@
 
 from extensions import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import password_hasher, PasswordHasherBusy
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -16,10 +16,19 @@ class User(db.Model):
     def set_password(self, password):
         if not self.is_password_allowed(password):
             raise ValueError("Password does not meet the criteria")
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
+    # Hashes made with older parameters are replaced on a successful check; the caller commits.
+    # Raises PasswordHasherBusy when the hashing pool is saturated.
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            try:
+                self.password_hash = password_hasher.hash(password)
+            except PasswordHasherBusy:
+                pass  # Upgraded on a later login
+        return True
     
     def is_password_allowed(self, password):
         allowlist = [
@@ -35,6 +44,11 @@ class User(db.Model):
         return f'<User {self.username}>'
 
 class Category(db.Model):
+    __table_args__ = (
+        db.Index('ix_category_name', 'name'),
+        db.Index('ix_category_parent_id', 'parent_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     parent_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=True)
@@ -44,22 +58,42 @@ class Category(db.Model):
         return f'<Category {self.name}>'
 
 class Product(db.Model):
+    __table_args__ = (
+        db.Index('ix_product_name', 'name'),
+        db.Index('ix_product_price', 'price'),
+        db.Index('ix_product_category_name', 'category_id', 'name'),
+        db.Index('ix_product_category_price', 'category_id', 'price'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     price = db.Column(db.Float, nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
     category = db.relationship('Category', backref=db.backref('products', lazy=True))
+    stock = db.relationship('ProductStock', uselist=False, lazy='joined', cascade='all, delete-orphan')
 
     # Method to get total inventory across all warehouses
+    # Reads the ProductStock rollup instead of summing Inventory rows on every call
     def get_total_inventory(self):
-        total = db.session.query(db.func.sum(Inventory.quantity)).filter_by(product_id=self.id).scalar()
-        return total or 0
+        return self.stock.quantity if self.stock else 0
+
+    # Same name as the stock column projected by the product listing
+    @property
+    def inventory_count(self):
+        return self.get_total_inventory()
 
     def __repr__(self):
         return f'<Product {self.name}>'
 
 class Order(db.Model):
+    __table_args__ = (
+        db.Index('ix_order_order_date', 'order_date'),
+        db.Index('ix_order_user_id', 'user_id'),
+        db.Index('ix_order_status', 'status'),
+        db.Index('ix_order_status_order_date', 'status', 'order_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     user = db.relationship('User', backref=db.backref('orders', lazy=True))
@@ -72,6 +106,11 @@ class Order(db.Model):
         return f'<Order {self.id}>'
 
 class OrderItem(db.Model):
+    __table_args__ = (
+        db.Index('ix_order_item_order_id', 'order_id'),
+        db.Index('ix_order_item_product_id', 'product_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
@@ -95,6 +134,11 @@ class Cart(db.Model):
         return f'<Cart {self.id} for User {self.user_id}>'
 
 class CartItem(db.Model):
+    __table_args__ = (
+        # One line per product in a cart; add_to_cart merges quantities into it
+        db.Index('uq_cart_item_cart_product', 'cart_id', 'product_id', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     cart_id = db.Column(db.Integer, db.ForeignKey('cart.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
@@ -118,10 +162,19 @@ class Warehouse(db.Model):
         return f'<Warehouse {self.name}>'
 
 class Inventory(db.Model):
+    __table_args__ = (
+        # One stock row per product and warehouse; admin_update_inventory updates it in place
+        db.Index('uq_inventory_product_warehouse', 'product_id', 'warehouse_id', unique=True),
+        db.Index('ix_inventory_warehouse_id', 'warehouse_id'),
+        db.Index('ix_inventory_quantity', 'quantity'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    # active_history loads the old value of an expired row on assignment, so the stock listeners see the change
+    product_id = db.column_property(db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False),
+                                    active_history=True)
     warehouse_id = db.Column(db.Integer, db.ForeignKey('warehouse.id'), nullable=False)
-    quantity = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.column_property(db.Column(db.Integer, nullable=False, default=0), active_history=True)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     product = db.relationship('Product', backref=db.backref('inventories', lazy=True))
@@ -129,3 +182,64 @@ class Inventory(db.Model):
     def __repr__(self):
         return f'<Inventory Product {self.product_id} in Warehouse {self.warehouse_id} Quantity {self.quantity}>'
 
+class StockThreshold(db.Model):
+    # Low-stock threshold override for one product (in every warehouse) or one warehouse (for every product).
+    # Exactly one of product_id / warehouse_id is set; a product override wins over a warehouse override.
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=True, unique=True)
+    warehouse_id = db.Column(db.Integer, db.ForeignKey('warehouse.id'), nullable=True, unique=True)
+    threshold = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        scope = f'Product {self.product_id}' if self.product_id else f'Warehouse {self.warehouse_id}'
+        return f'<StockThreshold {scope} Threshold {self.threshold}>'
+
+class ProductStock(db.Model):
+    # Per-product total of Inventory.quantity across all warehouses.
+    # Maintained incrementally by stock.py in the same transaction as every Inventory write.
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ProductStock Product {self.product_id} Quantity {self.quantity}>'
+
+
+# Daily sales rollups: units, revenue and number of orders per day, for the whole store, per product
+# and per product category. Orders count on the day they were placed unless they are cancelled.
+# Maintained incrementally by sales_report.py in the same transaction as the order writes.
+class SalesDaily(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<SalesDaily {self.day} Revenue {self.revenue}>'
+
+class ProductSalesDaily(db.Model):
+    __table_args__ = (
+        db.Index('ix_product_sales_daily_product_id', 'product_id'),
+    )
+
+    day = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), primary_key=True)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ProductSalesDaily {self.day} Product {self.product_id} Units {self.units}>'
+
+class CategorySalesDaily(db.Model):
+    __table_args__ = (
+        db.Index('ix_category_sales_daily_category_id', 'category_id'),
+    )
+
+    day = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), primary_key=True)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CategorySalesDaily {self.day} Category {self.category_id} Units {self.units}>'
@@ -0,0 +1,195 @@
+# page_cache.py
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, current_app, make_response, request, session
+from markupsafe import Markup
+
+from extensions import db
+from models import Product
+from catalog import SORT_KEYS
+from category_cache import category_cache_version
+
+# Bounded LRU cache whose entries also expire after `ttl` seconds.
+# Other processes never see this process's invalidations, so the TTL bounds their staleness.
+class LRUCache:
+    def __init__(self, max_entries=1000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires, value)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard_where(self, predicate):
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+# A rendered page with the ETag of the versions it was rendered from
+class CachedPage:
+    def __init__(self, body, mimetype, etag):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+MAX_CATEGORY_LOOKUP = 500  # Products whose categories invalidate_products looks up to target listings
+
+page_cache = LRUCache()
+card_cache = LRUCache(max_entries=5000)
+
+# Versions bumped by the invalidation functions below, which every product, stock and category write calls:
+# ('product', product_id), ('listing', category_id) with None for the all-products listing, and ALL_LISTINGS.
+ALL_LISTINGS = ('listing', '*')
+_versions = {}
+_versions_lock = threading.Lock()
+# Other processes count their own versions, so their ETags must never match this process's
+_process_token = os.urandom(8).hex()
+
+def _bump_versions(keys):
+    with _versions_lock:
+        for key in keys:
+            _versions[key] = _versions.get(key, 0) + 1
+
+# ETag of a page, derived from the versions its content depends on instead of from the rendered body,
+# so a conditional GET can be answered without rendering. The TTL window bounds how long a client can
+# keep revalidating a page that another process's writes have changed.
+def page_etag(key):
+    if key[1] == 'product':
+        versions = (_versions.get(key[1:3], 0),)
+    else:
+        versions = (_versions.get(key[1:3], 0), _versions.get(ALL_LISTINGS, 0))
+    state = (_process_token, int(time.time() // page_cache.ttl), category_cache_version(), versions, key)
+    return hashlib.blake2b(repr(state).encode(), digest_size=16).hexdigest()
+
+# Page keys: (variant, 'product', product_id) and (variant, 'listing', category_id, sort, page, after, before)
+def listing_key():
+    sort = request.args.get('sort', 'name')
+    return ('listing', request.args.get('category', type=int), sort if sort in SORT_KEYS else 'name',
+            request.args.get('page', 1, type=int), request.args.get('after'), request.args.get('before'))
+
+def product_key(product_id):
+    return ('product', product_id)
+
+# The navigation bar differs per kind of visitor, so each kind gets its own copy of a page.
+# Pages with pending flash messages are personal and never cached.
+def page_variant():
+    if session.get('_flashes'):
+        return None
+    if session.get('customer_logged_in'):
+        return 'customer'
+    if session.get('admin_logged_in'):
+        return 'admin'
+    return 'anonymous'
+
+# Serve a view from the page cache, with an ETag and Last-Modified, answering conditional GETs with 304.
+# make_key receives the view arguments and returns the page's cache key.
+def cached_page(make_key):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            variant = page_variant()
+            if variant is None or request.method != 'GET' or not current_app.config.get('PAGE_CACHE_ENABLED', True):
+                return f(*args, **kwargs)
+            key = (variant,) + make_key(*args, **kwargs)
+            etag = page_etag(key)
+            if etag in request.if_none_match:
+                return page_headers(Response(status=304), variant, etag)
+            # A request with Cache-Control: no-cache re-renders the page and refreshes the entry
+            page = None if request.cache_control.no_cache else page_cache.get(key)
+            if page is None or page.etag != etag:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                page = CachedPage(response.get_data(), response.mimetype, etag)
+                page_cache.set(key, page)
+            response = page_headers(Response(page.body, mimetype=page.mimetype), variant, etag)
+            response.last_modified = page.last_modified
+            return response.make_conditional(request)
+        return decorated_function
+    return decorator
+
+def page_headers(response, variant, etag):
+    response.set_etag(etag)
+    response.cache_control.no_cache = True  # Always revalidate; a match costs a 304
+    if variant == 'anonymous':
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    # Visitors get different copies of a page under the same URL, depending on their session cookie
+    response.vary.add('Cookie')
+    return response
+
+# Listing card for one product, cached by the values it displays so it never needs invalidating
+def product_card(product):
+    key = (product.id, product.name, product.price, product.inventory_count)
+    card = card_cache.get(key)
+    if card is None:
+        card = Markup(current_app.jinja_env.get_template('_product_card.html').render(product=product))
+        card_cache.set(key, card)
+    return card
+
+# Drop the cached detail pages of the given products and the listings that can show them:
+# their categories' listings and the all-products listing. Call after committing the write.
+def invalidate_products(product_ids, category_ids=None):
+    product_ids = set(product_ids)
+    if category_ids is None and len(product_ids) > MAX_CATEGORY_LOOKUP:
+        # Too many to look up their categories; every listing goes
+        _bump_versions([('product', product_id) for product_id in product_ids] + [ALL_LISTINGS])
+        page_cache.discard_where(lambda key: (key[1] == 'product' and key[2] in product_ids) or key[1] == 'listing')
+        return
+    if category_ids is None:
+        category_ids = [category_id for (category_id,) in
+                        db.session.query(Product.category_id).filter(Product.id.in_(product_ids)).distinct()]
+    category_ids = set(category_ids) | {None}
+    _bump_versions([('product', product_id) for product_id in product_ids]
+                   + [('listing', category_id) for category_id in category_ids])
+    page_cache.discard_where(lambda key: (key[1] == 'product' and key[2] in product_ids)
+                             or (key[1] == 'listing' and key[2] in category_ids))
+
+# Drop cached listings: those of the given categories (and the all-products listing), or every listing
+def invalidate_listings(category_ids=None):
+    if category_ids is None:
+        _bump_versions([ALL_LISTINGS])
+        page_cache.discard_where(lambda key: key[1] == 'listing')
+    else:
+        category_ids = set(category_ids) | {None}
+        _bump_versions([('listing', category_id) for category_id in category_ids])
+        page_cache.discard_where(lambda key: key[1] == 'listing' and key[2] in category_ids)
+
+def init_page_cache(app):
+    page_cache.max_entries = app.config.get('PAGE_CACHE_SIZE', page_cache.max_entries)
+    page_cache.ttl = app.config.get('PAGE_CACHE_TTL', page_cache.ttl)
+    card_cache.max_entries = app.config.get('CARD_CACHE_SIZE', card_cache.max_entries)
+    card_cache.ttl = page_cache.ttl
+    app.jinja_env.globals['product_card'] = product_card
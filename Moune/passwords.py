@@ -0,0 +1,64 @@
+# passwords.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+class PasswordHasherBusy(Exception):
+    def __init__(self):
+        super().__init__('Too many sign-in attempts are being processed. Please try again in a moment.')
+
+# Runs password hashing on a small dedicated thread pool so that a burst of logins cannot take every
+# CPU away from the other requests (hashlib releases the GIL while it hashes). At most
+# `max_workers + max_queue` hashes are admitted at once; the next one is rejected immediately.
+class PasswordHasher:
+    def __init__(self, method=DEFAULT_METHOD, max_workers=2, max_queue=16):
+        self.configure(method, max_workers, max_queue)
+
+    def configure(self, method, max_workers, max_queue):
+        self.method = method
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hasher')
+        self.rejected = 0
+        self._prefix = None  # Parameters as written into stored hashes, e.g. 'scrypt:32768:8:1'
+
+    def _run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    # True when a stored hash was made with other parameters than the configured ones
+    def needs_rehash(self, password_hash):
+        if self._prefix is None:
+            # Werkzeug fills in defaults (e.g. 'pbkdf2' becomes 'pbkdf2:sha256:600000'); hash once to learn them
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+password_hasher = PasswordHasher()
+
+def init_passwords(app):
+    password_hasher.shutdown()
+    password_hasher.configure(
+        app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        app.config.get('PASSWORD_HASH_WORKERS') or max((os.cpu_count() or 2) // 2, 1),
+        app.config.get('PASSWORD_HASH_QUEUE', 16),
+    )
@@ -0,0 +1,156 @@
+# sales_report.py
+
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Order, OrderItem, Product, Category, SalesDaily, ProductSalesDaily, CategorySalesDaily
+from sqlalchemy import Date, cast, func, select
+
+orders = Order.__table__
+order_items = OrderItem.__table__
+products = Product.__table__
+sales_daily = SalesDaily.__table__
+product_sales_daily = ProductSalesDaily.__table__
+category_sales_daily = CategorySalesDaily.__table__
+
+DASHBOARD_DAYS = 30
+TOP_SELLERS = 10
+
+# Every order counts as a sale except cancelled ones
+def counts_as_sale(status):
+    return status != 'Cancelled'
+
+# Add (or with negative values, remove) sales to one rollup row, creating it on first use.
+# Must be called with the connection of the transaction that wrote the order.
+def add_sales(connection, table, key, units, revenue, order_count):
+    match = [table.c[name] == value for name, value in key.items()]
+    result = connection.execute(
+        table.update()
+        .where(*match)
+        .values(units=table.c.units + units, revenue=table.c.revenue + revenue,
+                order_count=table.c.order_count + order_count)
+    )
+    if result.rowcount == 0:
+        # First sale of the day; days predating the rollup are covered by rebuild_sales_rollups
+        connection.execute(table.insert().values(units=units, revenue=revenue, order_count=order_count, **key))
+
+# Add an order's items to the daily rollups (sign=1) or take them back out (sign=-1)
+def record_order_sales(connection, order_id, sign=1):
+    rows = connection.execute(
+        select(orders.c.order_date, order_items.c.product_id, products.c.category_id,
+               order_items.c.quantity, order_items.c.unit_price)
+        .select_from(order_items.join(orders, orders.c.id == order_items.c.order_id)
+                     .outerjoin(products, products.c.id == order_items.c.product_id))
+        .where(order_items.c.order_id == order_id)
+    ).all()
+    if not rows:
+        return
+    day = rows[0].order_date.date()
+
+    by_product = {}
+    by_category = {}
+    for row in rows:
+        revenue = row.quantity * row.unit_price
+        for totals, key in ((by_product, row.product_id), (by_category, row.category_id)):
+            if key is None:
+                continue
+            units_so_far, revenue_so_far = totals.get(key, (0, 0.0))
+            totals[key] = (units_so_far + row.quantity, revenue_so_far + revenue)
+
+    for product_id, (units, revenue) in by_product.items():
+        add_sales(connection, product_sales_daily, {'day': day, 'product_id': product_id},
+                  sign * units, sign * revenue, sign)
+    for category_id, (units, revenue) in by_category.items():
+        add_sales(connection, category_sales_daily, {'day': day, 'category_id': category_id},
+                  sign * units, sign * revenue, sign)
+    add_sales(connection, sales_daily, {'day': day},
+              sign * sum(row.quantity for row in rows),
+              sign * sum(row.quantity * row.unit_price for row in rows), sign)
+
+# Keep the rollups in step with an order's status change; call before committing it
+def record_status_change(connection, order_id, old_status, new_status):
+    if counts_as_sale(old_status) and not counts_as_sale(new_status):
+        record_order_sales(connection, order_id, -1)
+    elif counts_as_sale(new_status) and not counts_as_sale(old_status):
+        record_order_sales(connection, order_id, 1)
+
+# Calendar day of a timestamp column, in the form the Date rollup columns store
+def day_of(column):
+    if db.engine.dialect.name == 'sqlite':
+        return func.date(column)
+    return cast(column, Date)
+
+# Rebuild the rollups from the raw orders in one transaction, either entirely or for the days
+# from `start` to `end` (inclusive). Returns the number of store-wide days written.
+def rebuild_sales_rollups(start=None, end=None):
+    day = day_of(orders.c.order_date)
+    revenue = func.sum(order_items.c.quantity * order_items.c.unit_price)
+    sold = (select().select_from(order_items.join(orders, orders.c.id == order_items.c.order_id))
+            .where(orders.c.status != 'Cancelled'))
+    if start:
+        sold = sold.where(orders.c.order_date >= datetime.combine(start, datetime.min.time()))
+    if end:
+        sold = sold.where(orders.c.order_date < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+
+    def in_range(table):
+        conditions = []
+        if start:
+            conditions.append(table.c.day >= start)
+        if end:
+            conditions.append(table.c.day <= end)
+        return conditions
+
+    for table in (sales_daily, product_sales_daily, category_sales_daily):
+        db.session.execute(table.delete().where(*in_range(table)))
+
+    columns = ['day', 'units', 'revenue', 'order_count']
+    db.session.execute(sales_daily.insert().from_select(columns, sold.add_columns(
+        day, func.sum(order_items.c.quantity), revenue, func.count(func.distinct(orders.c.id))).group_by(day)))
+    db.session.execute(product_sales_daily.insert().from_select(['product_id'] + columns, sold.add_columns(
+        order_items.c.product_id, day, func.sum(order_items.c.quantity), revenue,
+        func.count(func.distinct(orders.c.id))).group_by(day, order_items.c.product_id)))
+    db.session.execute(category_sales_daily.insert().from_select(['category_id'] + columns, sold.add_columns(
+        products.c.category_id, day, func.sum(order_items.c.quantity), revenue,
+        func.count(func.distinct(orders.c.id)))
+        .join(products, products.c.id == order_items.c.product_id)
+        .group_by(day, products.c.category_id)))
+    days = db.session.execute(select(func.count()).select_from(sales_daily).where(*in_range(sales_daily))).scalar()
+    db.session.commit()
+    return days
+
+# Dashboard figures for the `days` days up to and including today, read from the rollups only
+def sales_summary(days=DASHBOARD_DAYS, limit=TOP_SELLERS):
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    daily = (db.session.query(SalesDaily.day, SalesDaily.units, SalesDaily.revenue, SalesDaily.order_count)
+             .filter(SalesDaily.day.between(start, end))
+             .order_by(SalesDaily.day)
+             .all())
+    top_products = (db.session.query(ProductSalesDaily.product_id, Product.name,
+                                     func.sum(ProductSalesDaily.units).label('units'),
+                                     func.sum(ProductSalesDaily.revenue).label('revenue'))
+                    .outerjoin(Product, Product.id == ProductSalesDaily.product_id)
+                    .filter(ProductSalesDaily.day.between(start, end))
+                    .group_by(ProductSalesDaily.product_id, Product.name)
+                    .order_by(func.sum(ProductSalesDaily.revenue).desc(), ProductSalesDaily.product_id)
+                    .limit(limit)
+                    .all())
+    top_categories = (db.session.query(CategorySalesDaily.category_id, Category.name,
+                                       func.sum(CategorySalesDaily.units).label('units'),
+                                       func.sum(CategorySalesDaily.revenue).label('revenue'))
+                      .outerjoin(Category, Category.id == CategorySalesDaily.category_id)
+                      .filter(CategorySalesDaily.day.between(start, end))
+                      .group_by(CategorySalesDaily.category_id, Category.name)
+                      .order_by(func.sum(CategorySalesDaily.revenue).desc(), CategorySalesDaily.category_id)
+                      .limit(limit)
+                      .all())
+    return {
+        'start': start,
+        'days': days,
+        'daily': daily,
+        'revenue': sum(row.revenue for row in daily),
+        'units': sum(row.units for row in daily),
+        'order_count': sum(row.order_count for row in daily),
+        'top_products': top_products,
+        'top_categories': top_categories,
+    }
@@ -0,0 +1,151 @@
+# search.py
+
+import math
+import re
+
+from extensions import db
+from models import Category, Product
+from sqlalchemy import DDL, bindparam, event, text
+
+# Full-text index over product name, description and category name.
+# The FTS5 rowid is the product id. Only maintained on SQLite; other databases fall back to ilike.
+SEARCH_TABLE = 'product_search'
+
+# bm25 column weights: name, description, category
+RANK_WEIGHTS = (10.0, 1.0, 4.0)
+
+create_search_index = DDL(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    "USING fts5(name, description, category, tokenize='unicode61 remove_diacritics 2')"
+)
+event.listen(db.metadata, 'after_create', create_search_index.execute_if(dialect='sqlite'))
+
+def uses_search_index(connection):
+    return connection.dialect.name == 'sqlite'
+
+# The INSERT ... SELECT that fills index rows from the product and category tables, for the given
+# products or, without ids, for all of them. Every indexing path goes through it.
+def index_statement(product_ids=None):
+    sql = (f'INSERT INTO {SEARCH_TABLE} (rowid, name, description, category) '
+           'SELECT product.id, product.name, product.description, coalesce(category.name, \'\') '
+           'FROM product LEFT OUTER JOIN category ON category.id = product.category_id')
+    if product_ids is None:
+        return text(sql), {}
+    return text(sql + ' WHERE product.id IN :ids').bindparams(bindparam('ids', expanding=True)), \
+        {'ids': list(product_ids)}
+
+# Index many products at once, for writes that bypass the ORM (bulk imports)
+def index_products(connection, product_ids):
+    if not product_ids or not uses_search_index(connection):
+        return
+    connection.execute(text(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids')
+                       .bindparams(bindparam('ids', expanding=True)), {'ids': list(product_ids)})
+    connection.execute(*index_statement(product_ids))
+
+# Event Listeners keeping the index in sync with Product and Category writes
+def index_product(connection, product_id):
+    index_products(connection, [product_id])
+
+def product_after_insert(mapper, connection, target):
+    if uses_search_index(connection):
+        index_product(connection, target.id)
+
+def product_after_update(mapper, connection, target):
+    if uses_search_index(connection):
+        index_product(connection, target.id)
+
+def product_after_delete(mapper, connection, target):
+    if uses_search_index(connection):
+        connection.execute(text(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = :id'), {'id': target.id})
+
+def category_after_update(mapper, connection, target):
+    if uses_search_index(connection) and db.inspect(target).attrs.name.history.has_changes():
+        connection.execute(text(
+            f'UPDATE {SEARCH_TABLE} SET category = :name '
+            'WHERE rowid IN (SELECT id FROM product WHERE category_id = :id)'
+        ), {'name': target.name, 'id': target.id})
+
+event.listen(Product, 'after_insert', product_after_insert)
+event.listen(Product, 'after_update', product_after_update)
+event.listen(Product, 'after_delete', product_after_delete)
+event.listen(Category, 'after_update', category_after_update)
+
+# Rebuild the whole index from the product and category tables
+def rebuild_search_index():
+    connection = db.session.connection()
+    if not uses_search_index(connection):
+        return 0
+    connection.execute(text(f'DELETE FROM {SEARCH_TABLE}'))
+    connection.execute(*index_statement())
+    count = connection.execute(text(f'SELECT count(*) FROM {SEARCH_TABLE}')).scalar()
+    db.session.commit()
+    return count
+
+def search_index_size():
+    connection = db.session.connection()
+    if not uses_search_index(connection):
+        return 0
+    return connection.execute(text(f'SELECT count(*) FROM {SEARCH_TABLE}')).scalar()
+
+# Turn free text into an FTS5 query: every word must match, as a prefix
+def build_match_query(query):
+    terms = re.findall(r'\w+', query)
+    return ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+class SearchPagination:
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def pages(self):
+        return max(1, math.ceil(self.total / self.per_page))
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+# Search products by relevance, returning one page of results
+def search_catalog(query, page=1, per_page=10):
+    page = max(page, 1)
+    connection = db.session.connection()
+
+    if not uses_search_index(connection):
+        pattern = f'%{query}%'
+        products = (Product.query
+                    .filter(db.or_(Product.name.ilike(pattern), Product.description.ilike(pattern)))
+                    .order_by(Product.name)
+                    .paginate(page=page, per_page=per_page, error_out=False))
+        return SearchPagination(products.items, page, per_page, products.total)
+
+    match = build_match_query(query)
+    if not match:
+        return SearchPagination([], page, per_page, 0)
+
+    total = connection.execute(
+        text(f'SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match'), {'match': match}
+    ).scalar()
+    rows = connection.execute(text(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match '
+        f'ORDER BY bm25({SEARCH_TABLE}, {", ".join(str(w) for w in RANK_WEIGHTS)}) '
+        'LIMIT :limit OFFSET :offset'
+    ), {'match': match, 'limit': per_page, 'offset': (page - 1) * per_page})
+    product_ids = [row[0] for row in rows]
+
+    products = {p.id: p for p in Product.query.filter(Product.id.in_(product_ids))} if product_ids else {}
+    items = [products[product_id] for product_id in product_ids if product_id in products]
+    return SearchPagination(items, page, per_page, total)
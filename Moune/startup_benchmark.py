@@ -0,0 +1,105 @@
+# startup_benchmark.py
+#
+# Startup benchmark: measures, in fresh interpreter processes, how long importing app.py,
+# create_app() and the first request to each route take, with and without the boot warm-up.
+# Results are written as JSON so runs can be compared.
+#
+#   python startup_benchmark.py --runs 10 --output startup.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROUTES = ['/products', '/products/1', '/search?q=sample', '/login']
+
+# Runs in the child process; prints one JSON line of timings in milliseconds
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app as app_module
+imported = time.perf_counter()
+app = app_module.create_app()
+created = time.perf_counter()
+client = app.test_client()
+first_requests = {}
+for url in sys.argv[1:]:
+    request_started = time.perf_counter()
+    status = client.get(url).status_code
+    first_requests[url] = round((time.perf_counter() - request_started) * 1000, 3)
+    assert status == 200, (url, status)
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': round((imported - started) * 1000, 3),
+    'create_app_ms': round((created - imported) * 1000, 3),
+    'first_requests_ms': first_requests,
+    'import_to_first_response_ms': round((created - started) * 1000 + first_requests[sys.argv[1]], 3),
+    'total_ms': round((finished - started) * 1000, 3),
+}))
+'''
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure import-to-first-request time of the Moune app.')
+    parser.add_argument('--runs', type=int, default=10, help='Fresh processes per configuration')
+    parser.add_argument('--workdir', help='Directory for the database and logs (default: a new temp dir)')
+    parser.add_argument('--output', default='startup_results.json')
+    return parser.parse_args()
+
+def run_child(env, workdir):
+    result = subprocess.run([sys.executable, '-c', CHILD, *ROUTES], env=env, cwd=workdir,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def summarize(runs):
+    summary = {}
+    for key in ('import_ms', 'create_app_ms', 'import_to_first_response_ms', 'total_ms'):
+        values = [run[key] for run in runs]
+        summary[key] = {'median': round(statistics.median(values), 3), 'min': min(values), 'max': max(values)}
+    summary['first_requests_ms'] = {
+        url: round(statistics.median(run['first_requests_ms'][url] for run in runs), 3) for url in ROUTES
+    }
+    return summary
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix='moune-startup-'))
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    env['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'startup.db')
+    env['PYTHONPATH'] = source_dir + os.pathsep + env.get('PYTHONPATH', '')
+    env['JINJA_CACHE_DIR'] = os.path.join(workdir, 'jinja-cache')
+
+    # The database is created once, outside the measured processes
+    subprocess.run([sys.executable, '-c', 'import app; a = app.create_app(WARM_UP=False); '
+                    'ctx = a.app_context(); ctx.push(); app.init_database()'],
+                   env=env, cwd=workdir, check=True)
+
+    results = {}
+    print(f'{"configuration":<16}{"import ms":>11}{"create ms":>11}{"first resp ms":>15}')
+    for name, warm_up in (('cold', '0'), ('warm_up', '1')):
+        runs = [run_child(dict(env, WARM_UP=warm_up), workdir) for _ in range(args.runs)]
+        results[name] = summarize(runs)
+        print(f'{name:<16}{results[name]["import_ms"]["median"]:>11}{results[name]["create_app_ms"]["median"]:>11}'
+              f'{results[name]["import_to_first_response_ms"]["median"]:>15}', flush=True)
+
+    report = {
+        'started_at': datetime.utcnow().isoformat(),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'parameters': vars(args),
+        'routes': ROUTES,
+        'results': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {output}')
+
+if __name__ == '__main__':
+    main()
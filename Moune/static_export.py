@@ -0,0 +1,185 @@
+# static_export.py
+
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+from urllib.parse import urlsplit, parse_qs
+
+from extensions import db
+from models import Category, Product, ProductStock
+from catalog import SORT_KEYS, encode_cursor
+
+MANIFEST_NAME = 'manifest.json'
+LISTING_PER_PAGE = 10  # Must match view_products
+RENDER_BATCH_SIZE = 200  # Pages handed to a worker process at a time
+PAGE_TEMPLATES = ('base.html', 'view_products.html', '_product_card.html', 'view_product_detail.html')
+
+# Catalog links inside rendered pages, rewritten to point at the exported files
+CATALOG_LINK = re.compile(r'(href|value)="(/products(?:/\d+)?(?:\?[^"]*)?)"')
+
+class ExportReport:
+    def __init__(self):
+        self.rendered = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.failed = []  # (path, status code)
+        self.elapsed = 0.0
+
+    def summary(self):
+        return (f'Rendered {self.rendered} pages, {self.unchanged} unchanged, {self.removed} removed '
+                f'in {self.elapsed:.2f}s.')
+
+def listing_path(category_id, sort, page):
+    return f'catalog/{category_id or "all"}/{sort}/{page}.html'
+
+def product_path(product_id):
+    return f'products/{product_id}.html'
+
+# Map a dynamic catalog URL to the exported file serving the same content
+def static_url(url):
+    parts = urlsplit(unescape(url))
+    if parts.path != '/products':
+        return parts.path + '.html'
+    args = parse_qs(parts.query)
+    category = args.get('category', [None])[0]
+    sort = args.get('sort', ['name'])[0]
+    sort = sort if sort in SORT_KEYS else 'name'
+    page = args.get('page', ['1'])[0]
+    # Without a cursor the live listing always shows its first page
+    if 'after' not in args and 'before' not in args:
+        page = '1'
+    return '/' + listing_path(category, sort, page)
+
+def rewrite_links(html):
+    return CATALOG_LINK.sub(lambda match: f'{match.group(1)}="{static_url(match.group(2))}"', html)
+
+def fingerprint(*values):
+    return hashlib.blake2b(repr(values).encode(), digest_size=16).hexdigest()
+
+def template_signature(template_folder):
+    digest = hashlib.blake2b(digest_size=16)
+    for name in PAGE_TEMPLATES:
+        with open(os.path.join(template_folder, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+# Every page of the public catalog as {relative path: (fingerprint, request URL)}.
+# Fingerprints are computed from the same rows the pages render, in the same order, so a page
+# is only re-rendered when something it shows has changed.
+def plan_pages():
+    categories = dict(db.session.query(Category.id, Category.name))
+    rows = (db.session.query(Product.id, Product.name, Product.description, Product.price, Product.category_id,
+                             db.func.coalesce(ProductStock.quantity, 0))
+            .outerjoin(ProductStock, ProductStock.product_id == Product.id)
+            .all())
+
+    pages = {}
+    members = {None: []}
+    members.update((category_id, []) for category_id in categories)
+    for product_id, name, description, price, category_id, stock in rows:
+        pages[product_path(product_id)] = (fingerprint(name, description, price, stock), f'/products/{product_id}')
+        listed = (product_id, name, price, stock)
+        members[None].append(listed)
+        if category_id is not None and category_id in members:
+            members[category_id].append(listed)
+
+    for category_id, listed in members.items():
+        category_name = categories.get(category_id)
+        page_count = max(math.ceil(len(listed) / LISTING_PER_PAGE), 1)
+        for sort, (column, descending) in SORT_KEYS.items():
+            # Same order as paginate_products: the sort column, tie-broken on the id
+            position = 2 if column.key == 'price' else 1
+            ordered = sorted(listed, key=lambda row: (row[position], row[0]), reverse=descending)
+            for page in range(1, page_count + 1):
+                items = ordered[(page - 1) * LISTING_PER_PAGE:page * LISTING_PER_PAGE]
+                url = f'/products?sort={sort}' + (f'&category={category_id}' if category_id else '')
+                if page > 1:
+                    previous = ordered[(page - 1) * LISTING_PER_PAGE - 1]
+                    url += f'&page={page}&after={encode_cursor(previous[position], previous[0])}'
+                pages[listing_path(category_id, sort, page)] = (
+                    fingerprint(category_name, page, page_count, items), url)
+    return pages
+
+_worker_client = None
+
+def _init_worker():
+    global _worker_client
+    from app import create_app
+    _worker_client = create_app(WARM_UP=False).test_client()
+
+# Render a batch of (path, url) pairs into output_dir; returns the pages that failed
+def render_batch(client, output_dir, batch):
+    failed = []
+    for path, url in batch:
+        response = client.get(url, headers={'Cache-Control': 'no-cache'})
+        if response.status_code != 200:
+            failed.append((path, response.status_code))
+            continue
+        target = os.path.join(output_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = target + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(rewrite_links(response.get_data(as_text=True)))
+        os.replace(temporary, target)
+    return failed
+
+def _render_batch_in_worker(args):
+    return render_batch(_worker_client, *args)
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# Render the public catalog to static HTML under output_dir.
+# A manifest of page fingerprints from the previous run limits the work to changed pages;
+# pages that no longer exist are deleted. Rendering is spread over `workers` processes.
+def export_catalog(app, output_dir, workers=1, full=False):
+    report = ExportReport()
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+
+    signature = template_signature(os.path.join(app.root_path, app.template_folder))
+    previous = load_manifest(output_dir)
+    previous_pages = previous.get('pages', {}) if previous.get('templates') == signature and not full else {}
+
+    pages = plan_pages()
+    todo = [(path, url) for path, (page_fingerprint, url) in pages.items()
+            if previous_pages.get(path) != page_fingerprint or not os.path.exists(os.path.join(output_dir, path))]
+    report.unchanged = len(pages) - len(todo)
+
+    batches = [todo[i:i + RENDER_BATCH_SIZE] for i in range(0, len(todo), RENDER_BATCH_SIZE)]
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            for failed in executor.map(_render_batch_in_worker, [(output_dir, batch) for batch in batches]):
+                report.failed.extend(failed)
+    else:
+        client = app.test_client()
+        for batch in batches:
+            report.failed.extend(render_batch(client, output_dir, batch))
+    failed_paths = {path for path, status in report.failed}
+    report.rendered = len(todo) - len(report.failed)
+
+    for path in previous.get('pages', {}):
+        if path not in pages:
+            try:
+                os.remove(os.path.join(output_dir, path))
+                report.removed += 1
+            except FileNotFoundError:
+                pass
+
+    # Failed pages are left out of the manifest so the next run retries them
+    manifest = {'templates': signature,
+                'pages': {path: entry[0] for path, entry in pages.items() if path not in failed_paths}}
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f)
+
+    report.elapsed = time.perf_counter() - started
+    return report
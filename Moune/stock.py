@@ -0,0 +1,98 @@
+# stock.py
+
+from extensions import db
+from models import Inventory, Product, ProductStock
+from sqlalchemy import event, select, func, literal
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.util import identity_key
+
+product_stock = ProductStock.__table__
+inventory = Inventory.__table__
+product = Product.__table__
+
+# Apply a change in available stock to the ProductStock rollup.
+# Must be called with the connection of the transaction that wrote the Inventory rows.
+def adjust_product_stock(connection, product_id, delta):
+    if product_id is None:
+        return
+    result = connection.execute(
+        product_stock.update()
+        .where(product_stock.c.product_id == product_id)
+        .values(quantity=product_stock.c.quantity + delta)
+    )
+    if result.rowcount == 0:
+        # First stock row for this product; rows predating the rollup are covered by rebuild_product_stock.
+        # Products that no longer exist get no row.
+        connection.execute(product_stock.insert().from_select(
+            ['product_id', 'quantity'],
+            select(product.c.id, literal(delta)).where(product.c.id == product_id)))
+
+# True when the product is deleted in the flush that writes this Inventory row. Its rollup row is
+# deleted with it, so the row's stock must not be taken off (and re-create it).
+def product_deleted_in_flush(target, product_id):
+    session = object_session(target)
+    if session is None:
+        return False
+    deleted_product = session.identity_map.get(identity_key(Product, product_id))
+    return deleted_product is not None and deleted_product in session.deleted
+
+# Event Listeners keeping ProductStock in sync with ORM Inventory writes
+def inventory_after_insert(mapper, connection, target):
+    adjust_product_stock(connection, target.product_id, target.quantity or 0)
+
+def inventory_after_update(mapper, connection, target):
+    state = db.inspect(target)
+    quantity_history = state.attrs.quantity.history
+    product_history = state.attrs.product_id.history
+    if not quantity_history.has_changes() and not product_history.has_changes():
+        return
+
+    old_quantity = quantity_history.deleted[0] if quantity_history.deleted else target.quantity
+    old_product_id = product_history.deleted[0] if product_history.deleted else target.product_id
+
+    if old_product_id == target.product_id:
+        adjust_product_stock(connection, target.product_id, (target.quantity or 0) - (old_quantity or 0))
+    else:
+        if not product_deleted_in_flush(target, old_product_id):
+            adjust_product_stock(connection, old_product_id, -(old_quantity or 0))
+        adjust_product_stock(connection, target.product_id, target.quantity or 0)
+
+def inventory_after_delete(mapper, connection, target):
+    if not product_deleted_in_flush(target, target.product_id):
+        adjust_product_stock(connection, target.product_id, -(target.quantity or 0))
+
+event.listen(Inventory, 'after_insert', inventory_after_insert)
+event.listen(Inventory, 'after_update', inventory_after_update)
+event.listen(Inventory, 'after_delete', inventory_after_delete)
+
+# Compute the expected rollup from the raw Inventory rows
+def compute_stock_totals():
+    rows = db.session.execute(
+        select(inventory.c.product_id, func.sum(inventory.c.quantity)).group_by(inventory.c.product_id)
+    )
+    return {product_id: total or 0 for product_id, total in rows}
+
+# Compare the ProductStock rollup against the raw Inventory rows.
+# Returns a list of (product_id, rollup_quantity, expected_quantity) for every mismatch.
+def check_product_stock():
+    expected = compute_stock_totals()
+    actual = dict(db.session.execute(select(product_stock.c.product_id, product_stock.c.quantity)).all())
+    mismatches = []
+    for product_id in sorted(set(expected) | set(actual)):
+        expected_quantity = expected.get(product_id, 0)
+        actual_quantity = actual.get(product_id)
+        if actual_quantity != expected_quantity and not (actual_quantity is None and expected_quantity == 0):
+            mismatches.append((product_id, actual_quantity, expected_quantity))
+    return mismatches
+
+# Rebuild the whole ProductStock rollup from the raw Inventory rows in one transaction
+def rebuild_product_stock():
+    totals = compute_stock_totals()
+    db.session.execute(product_stock.delete())
+    if totals:
+        db.session.execute(
+            product_stock.insert(),
+            [{'product_id': product_id, 'quantity': quantity} for product_id, quantity in totals.items()]
+        )
+    db.session.commit()
+    return len(totals)
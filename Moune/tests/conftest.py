@@ -0,0 +1,108 @@
+# tests/conftest.py
+
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+# create_app() configures itself from the environment and writes logs relative to the working
+# directory, so point it at a throwaway directory before config.py is imported.
+_workdir = tempfile.mkdtemp(prefix='moune-tests-')
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_workdir, 'test.db')
+os.chdir(_workdir)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, init_database
+from extensions import db
+from models import User, Category, Product, Warehouse, Inventory
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    flask_app = create_app(TESTING=True, WTF_CSRF_ENABLED=False)
+    with flask_app.app_context():
+        init_database()
+        db.session.remove()
+    return flask_app
+
+
+@pytest.fixture
+def app(flask_app):
+    with flask_app.app_context():
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# Factory for committed test products; returns their ids. Each product gets one inventory row per
+# quantity in `stock`, in distinct warehouses, and `price` may be a list with one price per product.
+@pytest.fixture
+def make_products(app):
+    def make(count=1, name='Test Product', price=1.0, category_id=None, stock=()):
+        if category_id is None:
+            category_id = Category.query.order_by(Category.id).first().id
+        warehouses = Warehouse.query.order_by(Warehouse.id).limit(len(stock)).all()
+        while len(warehouses) < len(stock):
+            warehouses.append(Warehouse(name=f'Test Warehouse {len(warehouses)}', location='Test'))
+            db.session.add(warehouses[-1])
+        prices = price if isinstance(price, (list, tuple)) else [price] * count
+        products = [Product(name=f'{name} {i:02}', description=f'{name}.', price=prices[i], category_id=category_id)
+                    for i in range(count)]
+        db.session.add_all(products)
+        db.session.flush()
+        db.session.add_all([Inventory(product_id=product.id, warehouse_id=warehouse.id, quantity=quantity)
+                            for product in products for warehouse, quantity in zip(warehouses, stock)])
+        db.session.commit()
+        return [product.id for product in products]
+    return make
+
+
+# A second client, logged in to the admin area as the seeded super admin, so a test can compare
+# what it sees with what the anonymous `client` sees
+@pytest.fixture
+def admin_client(app):
+    admin_client = app.test_client()
+    with admin_client.session_transaction() as session:
+        session['admin_logged_in'] = True
+        session['user_id'] = User.query.filter_by(username='admin').first().id
+    return admin_client
+
+
+# `with count_statements() as statements:` collects the SQL sent to the database inside the block
+@pytest.fixture
+def count_statements(app):
+    @contextmanager
+    def count():
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    return count
+
+
+# Audit records written since the test started; core bulk writes must reach the log like ORM ones
+@pytest.fixture
+def audit_records(app):
+    import audit
+    audit.audit_log.flush()
+    path = app.config['AUDIT_LOG_PATH']
+    start = os.path.getsize(path) if os.path.exists(path) else 0
+
+    def read():
+        audit.audit_log.flush()
+        with open(path, encoding='utf-8') as f:
+            f.seek(start)
+            return [json.loads(line) for line in f if line.strip()]
+    return read
@@ -0,0 +1,49 @@
+# tests/test_admin_grid.py
+
+from datetime import datetime
+
+from extensions import db
+from models import User, Category, Product, Order
+
+
+def test_product_grid_filters_sorts_and_pages_as_json(admin_client):
+    category = Category(name='Grid Category')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([Product(name=f'Grid Product {i}', description='Listed.', price=float(10 - i),
+                                category_id=category.id) for i in range(5)])
+    db.session.commit()
+
+    data = admin_client.get(f'/admin/products?category={category.id}&sort=price&per_page=2&format=json').get_json()
+    assert [item['price'] for item in data['items']] == [6.0, 7.0]
+    assert data['total'] == 5 and data['pages'] == 3
+    assert data['filters'] == {'category': str(category.id)} and data['prev'] is None
+
+    following = admin_client.get(data['next']).get_json()
+    assert [item['price'] for item in following['items']] == [8.0, 9.0]
+
+    # Unknown sort columns fall back to the default; bad filter values are ignored
+    data = admin_client.get('/admin/products?sort=description&category=abc&q=Grid%20Product&format=json').get_json()
+    assert data['sort'] == 'name' and data['filters'] == {'q': 'Grid Product'} and data['total'] == 5
+
+    Product.query.filter_by(category_id=category.id).delete()
+    db.session.delete(category)
+    db.session.commit()
+
+
+def test_order_grid_filters_by_status_and_inclusive_dates(admin_client):
+    customer = User.query.filter_by(username='customer').first()
+    db.session.add_all([
+        Order(user_id=customer.id, order_date=datetime(2023, 3, 1, 23, 30), status='Shipped', total_amount=1.0),
+        Order(user_id=customer.id, order_date=datetime(2023, 3, 2, 8, 0), status='Shipped', total_amount=2.0),
+        Order(user_id=customer.id, order_date=datetime(2023, 3, 1, 9, 0), status='Cancelled', total_amount=3.0),
+    ])
+    db.session.commit()
+
+    data = admin_client.get('/admin/orders?status=Shipped&date_from=2023-03-01&date_to=2023-03-01',
+                            headers={'Accept': 'application/json'}).get_json()
+    assert [item['total_amount'] for item in data['items']] == [1.0]
+
+    response = admin_client.get('/admin/orders?status=Shipped&date_from=2023-03-01&date_to=2023-03-02&sort=order_date')
+    assert response.status_code == 200
+    assert b'Cancelled</td>' not in response.data
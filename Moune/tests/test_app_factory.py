@@ -0,0 +1,21 @@
+# tests/test_app_factory.py
+
+import os
+import subprocess
+import sys
+
+MOUNE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_has_no_side_effects(tmp_path):
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + str(tmp_path / 'app.db'), PYTHONPATH=MOUNE_DIR)
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=tmp_path, env=env, check=True)
+
+    # No database, log directory or log files
+    assert os.listdir(tmp_path) == []
+
+
+def test_create_app_registers_views_and_commands(flask_app):
+    endpoints = {rule.endpoint for rule in flask_app.url_map.iter_rules()}
+    assert {'view_products', 'checkout', 'admin_metrics'} <= endpoints
+    assert {'init-db', 'upgrade-schema', 'export-catalog'} <= set(flask_app.cli.commands)
@@ -0,0 +1,59 @@
+# tests/test_audit.py
+
+import json
+import threading
+
+import pytest
+
+from extensions import db
+from models import Category
+from audit import AuditLog
+
+
+def test_changes_are_logged_on_commit_only(app, audit_records):
+    category = Category(name='Audited Category')
+    db.session.add(category)
+    db.session.flush()
+    assert audit_records() == []  # Flushed but not committed
+    db.session.commit()
+    category_id = category.id
+
+    category.name = 'Audited Category (renamed)'
+    db.session.flush()
+    db.session.rollback()
+    db.session.delete(db.session.get(Category, category_id))
+    db.session.commit()
+
+    records = [(record['op'], record['model'], record['id']) for record in audit_records()]
+    assert records == [('insert', 'Category', category_id), ('delete', 'Category', category_id)]
+    assert 'Audited Category' in audit_records()[0]['repr']
+
+
+def test_full_queue_drops_and_counts_records(tmp_path):
+    log = AuditLog(str(tmp_path / 'models.log'), max_bytes=0, backup_count=0, queue_size=1)
+    writing, blocked = threading.Event(), threading.Event()
+    original_write = log._write
+
+    def slow_write(records):
+        writing.set()
+        blocked.wait()
+        original_write(records)
+    log._write = slow_write
+
+    log.submit([{'op': 'insert', 'id': 1}])
+    writing.wait()  # The writer thread has taken it and is stuck writing
+    log.submit([{'op': 'insert', 'id': 2}])  # Fills the queue
+    log.submit([{'op': 'insert', 'id': 3}, {'op': 'insert', 'id': 4}])  # Dropped
+    blocked.set()
+    log.flush()
+    log.submit([{'op': 'insert', 'id': 5}])
+    log.close()
+
+    lines = [json.loads(line) for line in (tmp_path / 'models.log').read_text().splitlines()]
+    assert [line.get('id') for line in lines if line['op'] == 'insert'] == [1, 2, 5]
+    assert [line['count'] for line in lines if line['op'] == 'dropped'] == [2]
+
+
+def test_unknown_drop_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        AuditLog(str(tmp_path / 'models.log'), max_bytes=0, backup_count=0, drop_policy='ignore')
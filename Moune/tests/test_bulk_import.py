@@ -0,0 +1,67 @@
+# tests/test_bulk_import.py
+
+import io
+
+import bulk_import
+from models import Category, Product
+from bulk_import import import_products
+
+
+def csv_stream(*rows):
+    return io.StringIO('\n'.join(['name,description,price,category', *rows]) + '\n')
+
+
+def test_import_audits_every_created_row(app, audit_records):
+    report = import_products(csv_stream(
+        'Imported Lamp,Bright.,12.5,Imported Lighting',
+        'Imported Shade,Soft.,4,Imported Lighting',
+        'Imported Rug,Warm.,30,Imported Floors',
+    ), batch_size=2)
+    assert (report.products_added, report.categories_created) == (3, 2)
+
+    created = {(record['op'], record['model'], record['id']) for record in audit_records()}
+    categories = Category.query.filter(Category.name.like('Imported %')).all()
+    products = Product.query.filter(Product.name.like('Imported %')).all()
+    assert created == {('insert', 'Category', category.id) for category in categories} \
+        | {('insert', 'Product', product.id) for product in products}
+    assert len(audit_records()) == 5
+    values = {record['values']['name']: record['values'] for record in audit_records()}
+    assert values['Imported Rug']['price'] == 30.0
+    assert values['Imported Rug']['category_id'] == values['Imported Floors']['id']
+
+
+def test_dry_run_reports_without_writing(admin_client):
+    products, categories = Product.query.count(), Category.query.count()
+    body = '\n'.join(['name,description,price,category', 'Dry Lamp,Bright.,5,Dry Lighting',
+                      'Dry Lamp,Bright.,5,Dry Lighting', 'Dry Shade,Soft.,2,Dry Lighting'])
+    response = admin_client.post('/admin/products/bulk_upload', content_type='multipart/form-data', data={
+        'csv_file': (io.BytesIO(body.encode()), 'products.csv', 'text/csv'), 'dry_run': 'y'})
+
+    assert b'Would add 2 products and 1 categories from 3 rows (1 duplicates, 0 errors)' in response.data
+    assert (Product.query.count(), Category.query.count()) == (products, categories)
+
+
+def test_row_errors_are_reported_by_line(app, monkeypatch):
+    monkeypatch.setattr(bulk_import, 'MAX_REPORTED_ERRORS', 3)
+    report = import_products(csv_stream(
+        'Erring Lamp,Bright.,12,Erring Lighting',
+        'Erring Shade,,3,Erring Lighting',
+        'Erring Rug,Warm.,cheap,Erring Floors',
+        'Erring Vase,Tall.,-1,Erring Floors',
+        ',,,',
+        'Erring Mat,Flat.,4,Erring Floors',
+    ))
+    assert report.errors == [(3, 'Missing description'), (4, 'Invalid price "cheap"'), (5, 'Negative price "-1"')]
+    assert report.error_count == 4 and report.rows_read == 6 and report.products_added == 2
+    assert Product.query.filter(Product.name.like('Erring %')).count() == 2
+
+    report = import_products(io.StringIO('name,price\nLamp,1\n'))
+    assert report.errors == [(1, 'Missing CSV columns: description, category')] and report.rows_read == 0
+
+
+def test_cli_lists_row_errors(app, tmp_path):
+    path = tmp_path / 'products.csv'
+    path.write_text('name,description,price,category\nCli Lamp,Bright.,free,Cli Lighting\n')
+    result = app.test_cli_runner().invoke(args=['import-products', str(path), '--dry-run'])
+    assert 'Line 2: Invalid price "free"' in result.output
+    assert 'Would add 0 products and 0 categories from 1 rows (0 duplicates, 1 errors)' in result.output
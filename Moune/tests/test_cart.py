@@ -0,0 +1,37 @@
+# tests/test_cart.py
+
+from extensions import db
+from models import User, Cart, CartItem
+
+
+def log_in_customer_with_cart(client, username, product_ids):
+    user = User(username=username, email=f'{username}@example.com', roles='customer', password_hash='unused')
+    db.session.add(user)
+    db.session.flush()
+    cart = Cart(user_id=user.id)
+    db.session.add(cart)
+    db.session.flush()
+    db.session.add_all([CartItem(cart_id=cart.id, product_id=product_id, quantity=1) for product_id in product_ids])
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['customer_logged_in'] = True
+        session['user_id'] = user.id
+
+
+def test_cart_page_query_count_does_not_grow_with_the_cart(client, make_products, count_statements):
+    product_ids = make_products(8, name='Carted Item', price=1.5, stock=[3, 4])
+
+    log_in_customer_with_cart(client, 'small_cart', product_ids[:1])
+    with count_statements() as small:
+        response = client.get('/cart')
+    assert response.status_code == 200 and b'Carted Item 00' in response.data
+
+    log_in_customer_with_cart(client, 'large_cart', product_ids)
+    with count_statements() as large:
+        response = client.get('/cart')
+    page = response.get_data(as_text=True)
+    assert all(f'Carted Item {i:02}' in page for i in range(8))
+    assert 'max="7"' in page and '$12.00' in page
+
+    assert len(large) == len(small)
+    assert len([statement for statement in large if 'cart_item' in statement]) == 1
@@ -0,0 +1,100 @@
+# tests/test_cart_batch.py
+
+from extensions import db
+from models import User, CartItem
+
+_user_counter = iter(range(1, 1_000_000))
+
+
+def log_in_new_customer(client):
+    number = next(_user_counter)
+    user = User(username=f'batcher{number}', email=f'batcher{number}@example.com', roles='customer',
+                password_hash='unused')
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['customer_logged_in'] = True
+        session['user_id'] = user.id
+    return user.id
+
+
+def post_batch(client, operations):
+    return client.post('/cart/batch', json={'operations': operations})
+
+
+def test_batch_applies_operations_in_order(client, make_products, audit_records):
+    first, second, third = make_products(3, name='Batch Item', price=2.0, stock=[10])
+    log_in_new_customer(client)
+
+    response = post_batch(client, [
+        {'op': 'add', 'product_id': first, 'quantity': 2},
+        {'op': 'add', 'product_id': second},
+        {'op': 'add', 'product_id': first, 'quantity': 3},
+    ])
+    assert response.status_code == 200
+    assert [(item['product_id'], item['quantity']) for item in response.get_json()['items']] == [(first, 5), (second, 1)]
+
+    response = post_batch(client, [
+        {'op': 'update', 'product_id': first, 'quantity': 7},
+        {'op': 'remove', 'product_id': second},
+        {'op': 'add', 'product_id': third, 'quantity': 4},
+    ])
+    cart = response.get_json()
+    assert [(item['product_id'], item['quantity']) for item in cart['items']] == [(first, 7), (third, 4)]
+    assert cart['total'] == 22.0
+    assert sorted((item.product_id, item.quantity) for item in CartItem.query.filter_by(cart_id=cart['cart_id'])) \
+        == [(first, 7), (third, 4)]
+
+    item_ids = {item['product_id']: item['item_id'] for item in cart['items']}
+    changes = [(record['op'], record['model'], record['id']) for record in audit_records()
+               if record['model'] in ('Cart', 'CartItem')]
+    assert ('insert', 'Cart', cart['cart_id']) in changes
+    assert ('update', 'CartItem', item_ids[first]) in changes
+    assert ('insert', 'CartItem', item_ids[third]) in changes
+    assert [op for op, model, _ in changes if model == 'CartItem'].count('delete') == 1
+
+
+def test_batch_is_all_or_nothing(client, make_products):
+    plenty, scarce = make_products(2, name='Batch Item', price=2.0, stock=[3])
+    log_in_new_customer(client)
+
+    response = post_batch(client, [
+        {'op': 'add', 'product_id': plenty, 'quantity': 1},
+        {'op': 'add', 'product_id': scarce, 'quantity': 4},
+        {'op': 'add', 'product_id': 999999},
+        {'op': 'explode'},
+    ])
+    assert response.status_code == 422
+    assert [error['index'] for error in response.get_json()['errors']] == [3]
+
+    response = post_batch(client, [
+        {'op': 'add', 'product_id': plenty, 'quantity': 1},
+        {'op': 'add', 'product_id': scarce, 'quantity': 4},
+        {'op': 'add', 'product_id': 999999},
+    ])
+    assert response.status_code == 422
+    assert [error['index'] for error in response.get_json()['errors']] == [1, 2]
+    assert CartItem.query.filter(CartItem.product_id.in_([plenty, scarce])).count() == 0
+
+
+def test_statement_count_does_not_grow_with_the_batch(client, make_products, count_statements):
+    product_ids = make_products(40, name='Batch Item', price=2.0, stock=[5])
+
+    def statements_for(operations):
+        with count_statements() as statements:
+            assert post_batch(client, operations).status_code == 200
+        return len(statements)
+
+    log_in_new_customer(client)
+    small = statements_for([{'op': 'add', 'product_id': product_ids[0]}])
+    small_mixed = statements_for([{'op': 'update', 'product_id': product_ids[0], 'quantity': 2},
+                                  {'op': 'add', 'product_id': product_ids[1]}])
+
+    log_in_new_customer(client)
+    large = statements_for([{'op': 'add', 'product_id': product_id} for product_id in product_ids])
+    large_mixed = statements_for([{'op': 'update', 'product_id': product_id, 'quantity': 2}
+                                  for product_id in product_ids[:20]]
+                                 + [{'op': 'remove', 'product_id': product_id} for product_id in product_ids[20:30]])
+
+    assert large == small
+    assert large_mixed <= small_mixed + 1  # The second batch adds a DELETE
@@ -0,0 +1,40 @@
+# tests/test_catalog.py
+
+from extensions import db
+from models import Category
+from catalog import paginate_products, decode_cursor
+
+
+def test_cursor_pages_walk_both_ways_through_tied_prices(make_products):
+    category = Category(name='Paged Category')
+    db.session.add(category)
+    db.session.commit()
+    prices = [3.0, 1.0, 2.0, 1.0, 3.0, 1.0, 2.0]
+    product_ids = make_products(len(prices), name='Paged Item', price=prices, category_id=category.id, stock=[2])
+    # Ties on price are broken by id, in the same direction
+    expected = [product_id for _, product_id in sorted(zip(prices, product_ids), reverse=True)]
+
+    pages, after = [], None
+    while True:
+        page = paginate_products(category_id=category.id, sort='price_desc', after=after, page=len(pages) + 1,
+                                 per_page=3)
+        pages.append(page)
+        if not page.has_next:
+            break
+        after = page.next_cursor
+    assert [row.id for page in pages for row in page.items] == expected
+    assert [len(page.items) for page in pages] == [3, 3, 1] and not pages[0].has_prev
+    assert pages[0].total == len(prices) and pages[0].items[0].inventory_count == 2
+    assert 'description' not in pages[0].items[0]._fields
+
+    back = paginate_products(category_id=category.id, sort='price_desc', before=pages[2].prev_cursor, per_page=3)
+    assert [row.id for row in back.items] == [row.id for row in pages[1].items]
+    assert back.has_prev and back.has_next
+
+
+def test_malformed_cursor_falls_back_to_the_first_page(make_products):
+    make_products(2, name='Paged Item')
+    assert decode_cursor('not a cursor') is None
+    page = paginate_products(after='not a cursor', per_page=2)
+    assert [row.id for row in page.items] == [row.id for row in paginate_products(per_page=2).items]
+    assert not page.has_prev
@@ -0,0 +1,62 @@
+# tests/test_catalog_api.py
+
+import pytest
+
+from extensions import db
+from models import Category, Product, Warehouse, Inventory
+
+
+@pytest.fixture
+def make_api_products(make_products):
+    # A fresh category of products priced 0, 1, 2, ...; only the first one is in stock
+    def make(count):
+        category = Category(name='API Category')
+        db.session.add(category)
+        db.session.commit()
+        product_ids = make_products(count, name='API Product', price=[float(i) for i in range(count)],
+                                    category_id=category.id)
+        db.session.add(Inventory(product_id=product_ids[0], warehouse_id=Warehouse.query.first().id, quantity=6))
+        db.session.commit()
+        return category.id, product_ids
+    return make
+
+
+def test_batch_lookup_is_one_query_and_keeps_the_requested_order(client, count_statements, make_api_products):
+    _, product_ids = make_api_products(3)
+    ids = ','.join(str(product_id) for product_id in [product_ids[2], 999999, product_ids[0]])
+    with count_statements() as statements:
+        body = client.get(f'/api/v1/products?ids={ids}&fields=name,stock').get_json()
+
+    assert len(statements) == 1 and 'description' not in statements[0]
+    assert body['data'] == [{'id': product_ids[2], 'name': 'API Product 02', 'stock': 0},
+                            {'id': product_ids[0], 'name': 'API Product 00', 'stock': 6}]
+    assert body['missing'] == [999999]
+
+
+def test_cursor_pages_walk_the_category(client, make_api_products):
+    category_id, product_ids = make_api_products(5)
+    seen = []
+    url = f'/api/v1/products?category={category_id}&sort=price_desc&limit=2&fields=name'
+    while url:
+        body = client.get(url).get_json()
+        assert all(set(document) == {'id', 'name'} for document in body['data'])
+        seen.extend(document['id'] for document in body['data'])
+        url = body['links']['next']
+    assert seen == list(reversed(product_ids))
+
+    assert client.get('/api/v1/products?fields=secret').status_code == 400
+    assert client.get('/api/v1/products?sort=random').status_code == 400
+    assert client.get('/api/v1/products/999999').status_code == 404
+
+
+def test_etag_answers_conditional_requests(client, make_api_products):
+    _, product_ids = make_api_products(1)
+    first = client.get(f'/api/v1/products/{product_ids[0]}')
+    assert first.get_json()['data']['description'] == 'API Product.'
+    assert client.get(f'/api/v1/products/{product_ids[0]}',
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    db.session.get(Product, product_ids[0]).price = 42.0
+    db.session.commit()
+    assert client.get(f'/api/v1/products/{product_ids[0]}',
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 200
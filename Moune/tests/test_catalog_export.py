@@ -0,0 +1,54 @@
+# tests/test_catalog_export.py
+
+import os
+import re
+
+from extensions import db
+from models import Category, Product
+from static_export import export_catalog, plan_pages, rewrite_links
+
+
+def exported_links(output_dir):
+    for root, _, files in os.walk(output_dir):
+        for name in files:
+            if name.endswith('.html'):
+                with open(os.path.join(root, name), encoding='utf-8') as f:
+                    yield from re.findall(r'(?:href|value)="(/(?:catalog|products)[^"]*)"', f.read())
+
+
+def test_export_is_incremental_and_self_contained(app, tmp_path):
+    category = Category.query.first()
+    products = [Product(name=f'Export Item {i:02}', description='Static.', price=float(i), category_id=category.id)
+                for i in range(25)]
+    db.session.add_all(products)
+    db.session.commit()
+    output_dir = str(tmp_path)
+
+    first = export_catalog(app, output_dir)
+    assert first.rendered > 0 and not first.failed
+    assert all(os.path.exists(output_dir + link) for link in exported_links(output_dir))
+
+    assert export_catalog(app, output_dir).rendered == 0
+
+    products[0].description = 'Changed.'
+    db.session.commit()
+    second = export_catalog(app, output_dir)
+    # Only the product's own page: the listings do not show descriptions
+    assert second.rendered == 1
+
+    pages_before = set(plan_pages())
+    db.session.delete(products[1])
+    db.session.commit()
+    third = export_catalog(app, output_dir)
+    # The product's page, plus any listing page that no longer exists with one product fewer
+    removed = pages_before - set(plan_pages())
+    assert f'products/{products[1].id}.html' in removed
+    assert third.removed == len(removed)
+    assert not os.path.exists(os.path.join(output_dir, 'products', f'{products[1].id}.html'))
+
+
+def test_links_point_at_exported_files():
+    html = ('<a href="/products/7">x</a><a href="/products?page=2&amp;after=abc&amp;category=3&amp;sort=price_desc">'
+            'Next</a><option value="/products?sort=name">')
+    assert rewrite_links(html) == ('<a href="/products/7.html">x</a><a href="/catalog/3/price_desc/2.html">Next</a>'
+                                   '<option value="/catalog/all/name/1.html">')
@@ -0,0 +1,33 @@
+# tests/test_category_cache.py
+
+from models import Category
+from category_cache import get_category_tree, category_cache_version
+
+
+def test_tree_is_loaded_once_between_writes(app, count_statements):
+    tree = get_category_tree()
+    with count_statements() as statements:
+        assert get_category_tree() is tree
+    assert statements == []
+
+
+def test_category_writes_invalidate_the_tree(client, admin_client):
+    version = category_cache_version()
+    tree = get_category_tree()
+    parent = tree.categories[0]
+
+    admin_client.post('/admin/categories/add', data={'name': 'Cached Teaware', 'parent_id': parent.id})
+    tree = get_category_tree()
+    assert category_cache_version() == version + 1
+    category_id = Category.query.filter_by(name='Cached Teaware').one().id
+    assert tree.get(category_id).parent_id == parent.id and category_id in tree.descendant_ids(parent.id)
+    assert b'Products in "Cached Teaware"' in client.get(f'/products?category={category_id}').data
+
+    admin_client.post(f'/admin/categories/edit/{category_id}', data={'name': 'Cached Glassware', 'parent_id': 0})
+    tree = get_category_tree()
+    assert tree.names[category_id] == 'Cached Glassware' and category_id in tree.children[None]
+    assert b'Products in "Cached Glassware"' in client.get(f'/products?category={category_id}').data
+
+    admin_client.post(f'/admin/categories/delete/{category_id}')
+    assert get_category_tree().get(category_id) is None
+    assert b'Cached Glassware' not in client.get(f'/products?category={category_id}').data
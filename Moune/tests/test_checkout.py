@@ -0,0 +1,124 @@
+# tests/test_checkout.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from extensions import db
+from models import User, Product, Cart, CartItem, Inventory, Order
+from checkout import place_order, InsufficientStockError, EmptyCartError
+from stock import check_product_stock
+
+_user_counter = iter(range(1, 1_000_000))
+
+
+def make_customer():
+    number = next(_user_counter)
+    user = User(username=f'buyer{number}', email=f'buyer{number}@example.com', roles='customer',
+                password_hash='unused')
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def fill_cart(user_id, product_id, quantity):
+    cart = Cart(user_id=user_id)
+    db.session.add(cart)
+    db.session.flush()
+    db.session.add(CartItem(cart_id=cart.id, product_id=product_id, quantity=quantity))
+
+
+def inventory_rows(product_id):
+    return [row.quantity for row in Inventory.query.filter_by(product_id=product_id)]
+
+
+def test_checkout_spans_warehouses_and_empties_cart(make_products, audit_records):
+    product_id, = make_products(1, name='Flash Sale Item', price=5.0, stock=[2, 3])
+    user = make_customer()
+    fill_cart(user.id, product_id, 4)
+    db.session.commit()
+    item_id = CartItem.query.join(Cart).filter(Cart.user_id == user.id).one().id
+    start = len(audit_records())
+
+    order = place_order(user.id)
+
+    assert order.total_amount == 20.0
+    assert [(item.product_id, item.quantity) for item in order.order_items] == [(product_id, 4)]
+    assert sorted(inventory_rows(product_id)) == [0, 1]
+    assert CartItem.query.join(Cart).filter(Cart.user_id == user.id).count() == 0
+    assert db.session.get(Product, product_id).get_total_inventory() == 1
+    changes = [(record['op'], record['model'], record.get('values')) for record in audit_records()[start:]]
+    stock_rows = {row.id: row.quantity for row in Inventory.query.filter_by(product_id=product_id)}
+    assert sorted(values['quantity'] for op, model, values in changes if (op, model) == ('update', 'Inventory')) \
+        == [0, 1]
+    assert all(stock_rows[values['id']] == values['quantity']
+               for op, model, values in changes if (op, model) == ('update', 'Inventory'))
+    assert ('delete', 'CartItem', {'id': item_id, 'product_id': product_id}) in changes
+    with pytest.raises(EmptyCartError):
+        place_order(user.id)
+
+
+def test_checkout_with_insufficient_stock_changes_nothing(make_products):
+    product_id, = make_products(1, name='Flash Sale Item', price=5.0, stock=[1, 1])
+    user = make_customer()
+    fill_cart(user.id, product_id, 3)
+    db.session.commit()
+    orders_before = Order.query.count()
+
+    with pytest.raises(InsufficientStockError):
+        place_order(user.id)
+
+    assert sorted(inventory_rows(product_id)) == [1, 1]
+    assert Order.query.count() == orders_before
+    assert CartItem.query.join(Cart).filter(Cart.user_id == user.id).count() == 1
+
+
+def test_concurrent_checkouts_never_oversell(app, make_products, record_property):
+    stock = [7, 5, 8]
+    buyers, units_each, workers = 40, 2, 16
+    product_id, = make_products(1, name='Flash Sale Item', price=5.0, stock=stock)
+    user_ids = []
+    for _ in range(buyers):
+        user = make_customer()
+        fill_cart(user.id, product_id, units_each)
+        user_ids.append(user.id)
+    db.session.commit()
+
+    results = {'placed': 0, 'sold_out': 0}
+    lock = threading.Lock()
+    start = threading.Barrier(workers)
+
+    def buy(user_id):
+        with app.app_context():
+            try:
+                place_order(user_id)
+                outcome = 'placed'
+            except InsufficientStockError:
+                outcome = 'sold_out'
+            finally:
+                db.session.remove()
+        with lock:
+            results[outcome] += 1
+
+    def worker(chunk):
+        start.wait()
+        for user_id in chunk:
+            buy(user_id)
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, [user_ids[i::workers] for i in range(workers)]))
+    elapsed = time.perf_counter() - began
+
+    db.session.expire_all()
+    remaining = inventory_rows(product_id)
+    sold = results['placed'] * units_each
+    record_property('checkouts_per_second', round(buyers / elapsed))  # Shows up in --junitxml reports
+
+    assert all(quantity >= 0 for quantity in remaining)
+    assert results['placed'] + results['sold_out'] == buyers
+    assert results['placed'] == sum(stock) // units_each
+    assert sold + sum(remaining) == sum(stock)
+    assert check_product_stock() == []
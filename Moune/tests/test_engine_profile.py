@@ -0,0 +1,44 @@
+# tests/test_engine_profile.py
+
+import pytest
+from sqlalchemy import create_engine, event, exc, text
+
+from config import engine_options
+from engine_profile import apply_sqlite_pragmas
+from extensions import db
+from models import Product
+
+
+def test_connections_get_the_configured_pragmas(app):
+    connection = db.session.connection()
+    assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+    assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+    assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == app.config['SQLITE_PRAGMAS']['busy_timeout']
+    assert connection.exec_driver_sql('PRAGMA temp_store').scalar() == 2  # MEMORY
+
+
+def test_pool_settings_skip_in_memory_databases():
+    assert engine_options('sqlite://') == {} and engine_options('sqlite:///:memory:') == {}
+    options = engine_options('sqlite:////tmp/moune.db')
+    assert options['pool_pre_ping'] and options['pool_size'] > 0 and options['max_overflow'] >= 0
+
+
+def test_read_only_routes_use_the_query_only_read_engine(flask_app):
+    read_engine = create_engine(flask_app.config['SQLALCHEMY_DATABASE_URI'])
+    apply_sqlite_pragmas(read_engine, flask_app.config['SQLITE_PRAGMAS'], query_only=True)
+    statements = []
+    event.listen(read_engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    with flask_app.app_context():
+        product_id = Product.query.order_by(Product.id).first().id
+
+    flask_app.extensions['read_engine'] = read_engine
+    try:
+        assert flask_app.test_client().get(f'/api/v1/products/{product_id}').status_code == 200
+        with read_engine.connect() as connection:
+            with pytest.raises(exc.OperationalError):
+                connection.execute(text("UPDATE product SET price = price WHERE id = :id"), {'id': product_id})
+    finally:
+        del flask_app.extensions['read_engine']
+        read_engine.dispose()
+    assert any('FROM product' in statement for statement in statements)
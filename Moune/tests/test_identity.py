@@ -0,0 +1,65 @@
+# tests/test_identity.py
+
+import identity
+from extensions import db
+from models import User
+
+# These tests use flask_app directly: requests made inside the app fixture's context would share
+# its g, and with it the identity loaded by the first request.
+
+
+def make_manager(flask_app, username):
+    with flask_app.app_context():
+        user = User(username=username, email=f'{username}@example.com', roles='product_manager',
+                    password_hash='unused')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = flask_app.test_client()
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+        session['user_id'] = user_id
+    assert client.get('/admin/products').status_code == 200  # Now in the identity cache
+    return client, user_id
+
+
+def test_demoted_admin_is_refused_on_the_next_request(flask_app):
+    client, user_id = make_manager(flask_app, 'demoted_manager')
+
+    with flask_app.app_context():
+        db.session.get(User, user_id).roles = 'customer'
+        db.session.flush()
+        with flask_app.app_context():
+            # A concurrent request between flush and commit still reads, and caches, the old roles
+            assert 'product_manager' in identity.load_identity(user_id).roles
+        db.session.commit()
+    response = client.get('/admin/products')
+    assert response.status_code == 302 and response.location.endswith('/admin/dashboard')
+
+
+def test_deleted_admin_is_refused_on_the_next_request(flask_app):
+    client, user_id = make_manager(flask_app, 'deleted_manager')
+
+    with flask_app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+    response = client.get('/admin/products')
+    assert response.status_code == 302 and response.location.endswith('/admin/login')
+
+
+def test_only_committed_identity_changes_clear_the_cache(flask_app):
+    client, user_id = make_manager(flask_app, 'rehashed_manager')
+    version = identity._roles_version
+
+    with flask_app.app_context():
+        user = db.session.get(User, user_id)
+        user.password_hash = 'rehashed'
+        db.session.commit()
+        assert identity._roles_version == version
+
+        user.roles = 'customer'
+        db.session.flush()
+        assert identity._roles_version == version  # Not until the change is committed
+        db.session.rollback()
+    assert identity._roles_version == version
+    assert client.get('/admin/products').status_code == 200
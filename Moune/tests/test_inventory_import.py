@@ -0,0 +1,108 @@
+# tests/test_inventory_import.py
+
+import io
+import json
+
+from extensions import db
+from models import Category, Product, Warehouse, Inventory
+from stock import check_product_stock
+from inventory_import import import_inventory
+
+
+def make_stock():
+    category = Category.query.first()
+    products = [Product(name=f'Synced Item {i}', description='Synced.', price=1.0, category_id=category.id)
+                for i in range(2)]
+    warehouses = [Warehouse(name=f'Sync Warehouse {i}', location='Test') for i in range(2)]
+    db.session.add_all(products + warehouses)
+    db.session.flush()
+    db.session.add(Inventory(product_id=products[0].id, warehouse_id=warehouses[0].id, quantity=10))
+    db.session.commit()
+    return [product.id for product in products], [warehouse.id for warehouse in warehouses]
+
+
+def levels(product_ids):
+    return {(row.product_id, row.warehouse_id): row.quantity
+            for row in Inventory.query.filter(Inventory.product_id.in_(product_ids))}
+
+
+def assert_rollup_matches(product_ids):
+    assert [mismatch for mismatch in check_product_stock() if mismatch[0] in product_ids] == []
+
+
+def test_csv_body_sets_stock_levels(admin_client):
+    (first, second), (north, south) = make_stock()
+
+    body = '\n'.join([
+        'product_id,warehouse_id,quantity',
+        f'{first},{north},4',      # Updates the existing row
+        f'{first},{south},7',
+        f'{second},{north},2',
+        f'{second},{north},3',     # Later rows for the same key win
+        f'999999,{north},1',
+        f'{second},999999,1',
+        f'{second},{south},-1',
+    ])
+    response = admin_client.post('/admin/inventory/bulk', data=body, content_type='text/csv')
+    report = response.get_json()
+
+    assert report['rows_read'] == 7 and report['rows_applied'] == 4
+    assert [error['line'] for error in report['errors']] == [6, 7, 8]
+    assert levels([first, second]) == {(first, north): 4, (first, south): 7, (second, north): 3}
+    assert_rollup_matches([first, second])
+
+
+def test_jsonl_deltas_from_the_cli(app, admin_client, tmp_path, audit_records):
+    (first, second), (north, south) = make_stock()
+    rows = [
+        {'product_id': first, 'warehouse_id': north, 'quantity': -3},
+        {'product_id': first, 'warehouse_id': north, 'quantity': -2},
+        {'product_id': second, 'warehouse_id': south, 'quantity': 5},
+        {'product_id': first, 'warehouse_id': south, 'quantity': -4},  # Never below zero
+        {'product_id': second, 'warehouse_id': south, 'quantity': 1},
+    ]
+    path = tmp_path / 'stock.jsonl'
+    path.write_text('\n'.join(json.dumps(row) for row in rows) + '\nnot json\n')
+
+    result = app.test_cli_runner().invoke(args=['import-inventory', str(path), '--mode', 'delta', '--batch-size', '2'])
+
+    assert 'Line 6: Not a JSON object' in result.output
+    assert 'Applied 5 stock levels (delta) to 2 products from 6 rows (1 errors, 1 clamped at zero)' in result.output
+    assert f'Clamped at zero: product {first} in warehouse {south}' in result.output
+    db.session.expire_all()
+    assert levels([first, second]) == {(first, north): 5, (first, south): 0, (second, south): 6}
+    assert_rollup_matches([first, second])
+    assert sorted((record['values']['product_id'], record['values']['warehouse_id'], record['values']['delta'])
+                  for record in audit_records() if record['model'] == 'Inventory' and record['op'] == 'upsert') \
+        == sorted([(first, north, -5), (second, south, 5), (first, south, -4), (second, south, 1)])
+
+    page = admin_client.get('/admin/view_logs?model=Inventory&op=upsert').get_data(as_text=True)
+    assert '<option value="upsert" selected>' in page
+    assert f'product_id={first}, warehouse_id={south}, delta=-4' in page
+
+
+def test_deltas_do_not_depend_on_the_batch_size(app):
+    results = []
+    for batch_size in (1, 3, 100):
+        (first, second), (north, south) = make_stock()
+        db.session.add(Inventory(product_id=second, warehouse_id=south, quantity=3))
+        db.session.commit()
+        body = '\n'.join([
+            'product_id,warehouse_id,quantity',
+            f'{second},{south},-5',    # Stops at zero...
+            f'{second},{south},3',     # ...so this brings it back to 3, not to 1
+            f'{first},{north},-4',
+            f'{first},{south},-1',     # New row, clamped
+            f'{first},{north},-7',     # 10 - 4 - 7 stops at zero
+            f'{first},{north},2',
+        ])
+        report = import_inventory(io.StringIO(body), mode='delta', batch_size=batch_size)
+        names = {first: 'first', second: 'second', north: 'north', south: 'south'}
+        results.append(({(names[product_id], names[warehouse_id]): quantity
+                         for (product_id, warehouse_id), quantity in levels([first, second]).items()},
+                        sorted((names[product_id], names[warehouse_id]) for product_id, warehouse_id in report.clamped)))
+        assert_rollup_matches([first, second])
+
+    assert results[0] == results[1] == results[2]
+    assert results[0] == ({('first', 'north'): 2, ('first', 'south'): 0, ('second', 'south'): 3},
+                          [('first', 'north'), ('first', 'south'), ('second', 'south')])
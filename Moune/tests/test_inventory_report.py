@@ -0,0 +1,61 @@
+# tests/test_inventory_report.py
+
+import pytest
+
+from extensions import db
+from models import Warehouse, Inventory
+from inventory_report import low_stock_query, set_threshold, list_thresholds
+
+DEFAULT_THRESHOLD = 5
+
+
+def low_stock(warehouse_id):
+    return [(row.product_name, row.quantity, row.threshold) for row in low_stock_query(DEFAULT_THRESHOLD, warehouse_id)]
+
+
+def test_overrides_decide_which_rows_are_low(make_products):
+    warehouse = Warehouse(name='Threshold Warehouse', location='Test')
+    db.session.add(warehouse)
+    db.session.commit()
+    quantities = [2, 5, 6, 9, 12]
+    product_ids = make_products(len(quantities), name='Threshold Item')
+    db.session.add_all([Inventory(product_id=product_id, warehouse_id=warehouse.id, quantity=quantity)
+                        for product_id, quantity in zip(product_ids, quantities)])
+    db.session.commit()
+
+    assert low_stock(warehouse.id) == [('Threshold Item 00', 2, 5), ('Threshold Item 01', 5, 5)]
+
+    set_threshold(8, warehouse_id=warehouse.id)
+    set_threshold(12, product_id=product_ids[4])  # A product override beats the warehouse one
+    set_threshold(1, product_id=product_ids[0])
+    assert low_stock(warehouse.id) == [('Threshold Item 01', 5, 8), ('Threshold Item 02', 6, 8),
+                                       ('Threshold Item 04', 12, 12)]
+    assert {(row.product_name, row.warehouse_name, row.threshold) for row in list_thresholds()} >= {
+        (None, 'Threshold Warehouse', 8), ('Threshold Item 04', None, 12), ('Threshold Item 00', None, 1)}
+
+    for product_id in (product_ids[0], product_ids[4]):
+        set_threshold(None, product_id=product_id)
+    set_threshold(None, warehouse_id=warehouse.id)
+    assert low_stock(warehouse.id) == [('Threshold Item 00', 2, 5), ('Threshold Item 01', 5, 5)]
+
+
+def test_threshold_needs_exactly_one_target(app):
+    with pytest.raises(ValueError):
+        set_threshold(3)
+    with pytest.raises(ValueError):
+        set_threshold(3, product_id=1, warehouse_id=1)
+
+
+def test_admin_page_pages_the_low_stock_table(admin_client, make_products):
+    warehouse = Warehouse(name='Paged Threshold Warehouse', location='Test')
+    db.session.add(warehouse)
+    db.session.commit()
+    product_ids = make_products(55, name='Scarce Item')
+    db.session.add_all([Inventory(product_id=product_id, warehouse_id=warehouse.id, quantity=1)
+                        for product_id in product_ids])
+    db.session.commit()
+
+    first = admin_client.get(f'/admin/inventory?warehouse={warehouse.id}').get_data(as_text=True)
+    second = admin_client.get(f'/admin/inventory?warehouse={warehouse.id}&low_page=2').get_data(as_text=True)
+    assert 'Low Stock (55)' in first and 'Page 1 of 2' in first
+    assert 'Page 2 of 2' in second
@@ -0,0 +1,50 @@
+# tests/test_log_reader.py
+
+import json
+
+from log_reader import INDEX_STRIDE, read_log_page
+
+
+def write_entries(path, ids, model='Product'):
+    with open(path, 'a', encoding='utf-8') as f:
+        for entry_id in ids:
+            f.write(json.dumps({'ts': '2024-01-01T00:00:00', 'op': 'insert' if entry_id % 3 else 'delete',
+                                'model': model, 'id': entry_id}) + '\n')
+
+
+def page_ids(log_page):
+    return [entry['id'] for entry in log_page.entries]
+
+
+def test_pages_run_newest_first_across_rotated_files(tmp_path):
+    base = str(tmp_path / 'models.log')
+    rotated = INDEX_STRIDE * 2 + 10
+    write_entries(base + '.1', range(rotated))
+    write_entries(base, range(rotated, rotated + 50))
+    newest_first = list(reversed(range(rotated + 50)))
+
+    first = read_log_page(base, page=1, per_page=40)
+    assert page_ids(first) == newest_first[:40] and first.total == rotated + 50 and not first.has_prev
+    assert page_ids(read_log_page(base, page=2, per_page=40)) == newest_first[40:80]  # Spans both files
+    deep = read_log_page(base, page=10, per_page=40)
+    assert page_ids(deep) == newest_first[360:400] and deep.has_next
+    last = read_log_page(base, page=first.pages, per_page=40)
+    assert page_ids(last) == newest_first[(first.pages - 1) * 40:] and not last.has_next
+
+    # Lines appended later are picked up by extending the cached index
+    write_entries(base, [9999])
+    assert page_ids(read_log_page(base, page=1, per_page=2)) == [9999, rotated + 49]
+
+
+def test_filtered_pages_stream_from_the_end(tmp_path):
+    base = str(tmp_path / 'models.log')
+    write_entries(base + '.1', range(30))
+    write_entries(base, range(30, 40), model='Order')
+    with open(base, 'a', encoding='utf-8') as f:
+        f.write('2024-01-01 00:00:00,000 INFO: Deleted Product: <Product 7>\nnot an entry\n')
+
+    deletes = read_log_page(base, page=1, per_page=4, model='Product', operation='delete')
+    assert [entry['id'] for entry in deletes.entries] == [None, 27, 24, 21] and deletes.has_next
+    assert deletes.entries[0]['repr'] == '<Product 7>' and deletes.total is None
+    assert page_ids(read_log_page(base, page=3, per_page=4, model='Product', operation='delete')) == [6, 3, 0]
+    assert page_ids(read_log_page(base, model='Order', per_page=100)) == list(reversed(range(30, 40)))
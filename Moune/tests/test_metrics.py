@@ -0,0 +1,36 @@
+# tests/test_metrics.py
+
+from flask import Response
+
+from extensions import db
+from models import User
+from metrics import registry, _start_request, _finish_request
+
+
+def test_metrics_endpoint_requires_super_admin(client):
+    response = client.get('/admin/metrics')
+    assert response.status_code == 302
+
+
+def test_requests_are_recorded_per_endpoint(client, admin_client):
+    client.get('/products')
+
+    response = admin_client.get('/admin/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'moune_request_queries_count{endpoint="view_products"}' in body
+    assert 'moune_request_render_seconds_sum{endpoint="view_products"}' in body
+    assert 'moune_requests_total{endpoint="view_products",status="200"}' in body
+
+
+def test_repeated_statements_are_flagged(app):
+    before = registry.n_plus_one.values[('view_products',)]
+    with app.test_request_context('/products'):
+        _start_request()
+        for user_id in range(10):
+            db.session.query(User.username).filter(User.id == user_id).first()
+        _finish_request(Response())
+
+    assert registry.n_plus_one.values[('view_products',)] == before + 1
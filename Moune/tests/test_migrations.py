@@ -0,0 +1,35 @@
+# tests/test_migrations.py
+
+from sqlalchemy import inspect, text
+
+from extensions import db
+from models import Category, Product, Warehouse, Inventory
+from migrations import schema_migration, upgrade_schema, current_version
+
+
+def test_upgrade_merges_duplicates_and_restores_indexes(app):
+    category = Category.query.first()
+    product = Product(name='Migrated Product', description='Has duplicate stock rows.', price=1.0,
+                      category_id=category.id)
+    warehouse = Warehouse(name='Migration Warehouse', location='Test')
+    db.session.add_all([product, warehouse])
+    db.session.commit()
+
+    # Simulate a database from before the migration: no index, duplicate rows
+    with db.engine.begin() as connection:
+        connection.execute(text('DROP INDEX uq_inventory_product_warehouse'))
+        connection.execute(schema_migration.delete())
+        connection.execute(Inventory.__table__.insert(), [
+            {'product_id': product.id, 'warehouse_id': warehouse.id, 'quantity': 3},
+            {'product_id': product.id, 'warehouse_id': warehouse.id, 'quantity': 4},
+        ])
+
+    assert upgrade_schema() == [1, 2]
+
+    rows = Inventory.query.filter_by(product_id=product.id, warehouse_id=warehouse.id).all()
+    assert [row.quantity for row in rows] == [7]
+    index_names = {index['name'] for index in inspect(db.engine).get_indexes('inventory')}
+    assert 'uq_inventory_product_warehouse' in index_names
+    with db.engine.connect() as connection:
+        assert current_version(connection) == 2
+    assert upgrade_schema() == []
@@ -0,0 +1,51 @@
+# tests/test_page_cache.py
+
+from models import Warehouse
+from page_cache import page_cache
+
+
+def test_conditional_get_returns_304(client, make_products):
+    product_id, = make_products(1, name='Cached Lamp', price=3.0, stock=[4])
+
+    first = client.get(f'/products/{product_id}')
+    assert first.status_code == 200 and first.headers['ETag']
+
+    second = client.get(f'/products/{product_id}', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert 'Cookie' in first.headers['Vary'] and 'Cookie' in second.headers['Vary']
+
+
+def test_conditional_get_on_a_cache_miss_does_not_render(client, make_products, count_statements):
+    product_id, = make_products(1, name='Cached Stool', price=3.0, stock=[4])
+    etag = client.get(f'/products/{product_id}').headers['ETag']
+    page_cache.clear()
+
+    with count_statements() as statements:
+        response = client.get(f'/products/{product_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and statements == []
+    assert len(page_cache) == 0
+
+
+def test_cached_listing_skips_the_database(client, count_statements):
+    client.get('/products?sort=price_desc')
+    with count_statements() as statements:
+        client.get('/products?sort=price_desc')
+    assert statements == []
+
+
+def test_inventory_update_invalidates_product_pages(client, admin_client, make_products, count_statements):
+    product_id, = make_products(1, name='Cached Kettle', price=3.0, stock=[4])
+    warehouse_id = Warehouse.query.first().id
+    first = client.get(f'/products/{product_id}')
+    assert b'Available Stock: 4' in first.data
+    client.get('/products')
+
+    admin_client.post('/admin/inventory/update',
+                      data={'warehouse_id': warehouse_id, 'product_id': product_id, 'quantity': 9})
+
+    response = client.get(f'/products/{product_id}', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200 and b'Available Stock: 9' in response.data
+    with count_statements() as statements:
+        client.get('/products')
+    assert statements
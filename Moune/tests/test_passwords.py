@@ -0,0 +1,51 @@
+# tests/test_passwords.py
+
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User
+from passwords import PasswordHasher, PasswordHasherBusy, password_hasher
+
+
+def test_saturated_pool_rejects_immediately():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', max_workers=1, max_queue=0)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=hasher._run, args=(slow,))
+    thread.start()
+    started.wait(5)
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash('Secret@123')
+        assert hasher.rejected == 1
+    finally:
+        release.set()
+        thread.join()
+    assert hasher.verify(hasher.hash('Secret@123'), 'Secret@123')
+    hasher.shutdown()
+
+
+def test_login_rehashes_outdated_hash(client):
+    user = User(username='rehash', email='rehash@example.com', roles='customer',
+                password_hash=generate_password_hash('Rehash@123', 'pbkdf2:sha256:1000'))
+    db.session.add(user)
+    db.session.commit()
+    assert password_hasher.needs_rehash(user.password_hash)
+
+    response = client.post('/login', data={'email': 'rehash@example.com', 'password': 'Wrong@123'})
+    db.session.refresh(user)
+    assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+
+    response = client.post('/login', data={'email': 'rehash@example.com', 'password': 'Rehash@123'})
+    assert response.status_code == 302
+    db.session.refresh(user)
+    assert not password_hasher.needs_rehash(user.password_hash)
+    assert user.check_password('Rehash@123')
@@ -0,0 +1,213 @@
+# tests/test_query_plans.py
+
+import random
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from html import unescape
+
+import pytest
+from sqlalchemy import event, text
+
+from extensions import db
+from models import User, Category, Product, Order, OrderItem, Cart, CartItem, Warehouse, Inventory, \
+    SalesDaily, ProductSalesDaily, CategorySalesDaily
+from search import rebuild_search_index
+from stock import rebuild_product_stock
+
+# Dimension tables small enough that a full scan is the right plan
+SMALL_TABLES = {'category', 'warehouse', 'stock_threshold', 'schema_migration'}
+
+# "SCAN product" or "SCAN product AS product_1": a full table scan with no index
+FULL_SCAN = re.compile(r'^SCAN (?P<table>[\w"]+)(?: AS \w+)?$')
+
+PRODUCTS = 20000
+CATEGORIES = 200
+WAREHOUSES = 20
+CUSTOMERS = 300
+ORDERS = 5000
+SALES_DAYS = 4 * 365  # Years of daily sales rollups, so the dashboard has to seek on the day
+
+
+@pytest.fixture(scope='module')
+def catalog(flask_app):
+    # Every request must reach the database for its queries to be checked
+    flask_app.config['PAGE_CACHE_ENABLED'] = False
+    with flask_app.app_context():
+        yield seed_catalog()
+    flask_app.config['PAGE_CACHE_ENABLED'] = True
+
+
+def seed_catalog():
+    rng = random.Random(12)
+    connection = db.session.connection()
+    first_category = connection.execute(
+        Category.__table__.insert().returning(Category.__table__.c.id),
+        [{'name': f'Plan Category {i}', 'parent_id': None} for i in range(CATEGORIES)],
+    ).scalars().all()[0]
+    category_ids = list(range(first_category, first_category + CATEGORIES))
+    warehouse_ids = connection.execute(
+        Warehouse.__table__.insert().returning(Warehouse.__table__.c.id),
+        [{'name': f'Plan Warehouse {i}', 'location': 'Test'} for i in range(WAREHOUSES)],
+    ).scalars().all()
+    product_ids = connection.execute(
+        Product.__table__.insert().returning(Product.__table__.c.id),
+        [{'name': f'Plan Widget {i:05}', 'description': 'Seeded for query plan tests.',
+          'price': round(rng.uniform(1, 500), 2), 'category_id': rng.choice(category_ids)}
+         for i in range(PRODUCTS)],
+    ).scalars().all()
+    connection.execute(Inventory.__table__.insert(), [
+        {'product_id': product_id, 'warehouse_id': warehouse_id, 'quantity': rng.randint(0, 40)}
+        for product_id in product_ids for warehouse_id in rng.sample(warehouse_ids, 2)
+    ])
+    user_ids = connection.execute(
+        User.__table__.insert().returning(User.__table__.c.id),
+        [{'username': f'plan{i}', 'email': f'plan{i}@example.com', 'password_hash': 'unused',
+          'role': 'customer', 'membership_tier': 'Normal', 'roles': 'customer'} for i in range(CUSTOMERS)],
+    ).scalars().all()
+    start = datetime(2024, 1, 1)
+    order_ids = connection.execute(
+        Order.__table__.insert().returning(Order.__table__.c.id),
+        [{'user_id': rng.choice(user_ids), 'order_date': start + timedelta(minutes=i), 'status': 'Pending',
+          'total_amount': 10.0} for i in range(ORDERS)],
+    ).scalars().all()
+    connection.execute(OrderItem.__table__.insert(), [
+        {'order_id': order_id, 'product_id': rng.choice(product_ids), 'quantity': 1, 'unit_price': 10.0}
+        for order_id in order_ids
+    ])
+    today = datetime.utcnow().date()
+    recorded = set(connection.execute(SalesDaily.__table__.select().with_only_columns(SalesDaily.day)).scalars())
+    days = [day for day in (today - timedelta(days=offset) for offset in range(SALES_DAYS)) if day not in recorded]
+    connection.execute(SalesDaily.__table__.insert(), [
+        {'day': day, 'units': 3, 'revenue': 30.0, 'order_count': 2} for day in days
+    ])
+    connection.execute(ProductSalesDaily.__table__.insert(), [
+        {'day': day, 'product_id': product_id, 'units': 1, 'revenue': 10.0, 'order_count': 1}
+        for day in days for product_id in rng.sample(product_ids, 3)
+    ])
+    connection.execute(CategorySalesDaily.__table__.insert(), [
+        {'day': day, 'category_id': category_id, 'units': 1, 'revenue': 10.0, 'order_count': 1}
+        for day in days for category_id in rng.sample(category_ids, 3)
+    ])
+    db.session.commit()
+    rebuild_product_stock()
+    rebuild_search_index()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+    return {'category_id': category_ids[0], 'warehouse_id': warehouse_ids[0], 'product_id': product_ids[0],
+            'customer_id': user_ids[0], 'order_id': order_ids[0]}
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+
+def full_scans(statements):
+    scans = []
+    with db.engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+            for row in plan:
+                match = FULL_SCAN.match(row[3])
+                # Subqueries show up as scans of their alias; only real tables count
+                table = match.group('table').strip('"') if match else None
+                if table in db.metadata.tables and table not in SMALL_TABLES:
+                    scans.append(f'{row[3]} in: {" ".join(statement.split())}')
+    return scans
+
+
+def log_in_customer(client, user_id):
+    with client.session_transaction() as session:
+        session['customer_logged_in'] = True
+        session['user_id'] = user_id
+
+
+def assert_no_full_scans(statements):
+    assert statements, 'no queries were captured'
+    scans = full_scans(statements)
+    assert not scans, 'Full table scans:\n' + '\n'.join(scans)
+
+
+@pytest.mark.parametrize('url', [
+    '/products',
+    '/products?sort=price_asc',
+    '/products?sort=price_desc',
+    '/products?sort=name&category={category_id}',
+    '/products?sort=price_asc&category={category_id}',
+    '/products?sort=price_desc&category={category_id}',
+    '/products/{product_id}',
+    '/search?q=widget 0042',
+    '/api/v1/products?sort=price_desc&limit=50',
+    '/api/v1/products?category={category_id}&fields=name,stock',
+    '/api/v1/products?ids={product_id},1,2,3',
+    '/api/v1/products/{product_id}',
+    '/api/v1/categories',
+])
+def test_catalog_pages_use_indexes(client, catalog, url):
+    client.get(url.format(**catalog))  # Warm process caches so only per-request queries are checked
+    with captured_statements() as statements:
+        response = client.get(url.format(**catalog))
+        assert response.status_code == 200
+        # Follow the cursor a few pages deep
+        for _ in range(3):
+            next_link = re.search(r'href="([^"]+)">Next', response.get_data(as_text=True))
+            if not next_link:
+                break
+            response = client.get(unescape(next_link.group(1)))
+            assert response.status_code == 200
+    assert_no_full_scans(statements)
+
+
+def test_cart_and_checkout_use_indexes(client, catalog):
+    log_in_customer(client, catalog['customer_id'])
+    with captured_statements() as statements:
+        assert client.post(f'/add_to_cart/{catalog["product_id"]}', data={'quantity': 1}).status_code == 302
+        assert client.get('/cart').status_code == 200
+        item_id = CartItem.query.join(Cart).filter(Cart.user_id == catalog['customer_id']).first().id
+        assert client.post(f'/update_cart_item/{item_id}', data={'quantity': 1}).status_code == 302
+        assert client.post('/checkout').status_code == 302
+        assert client.get('/customer/dashboard').status_code == 200
+    assert_no_full_scans(statements)
+
+
+@pytest.mark.parametrize('url', [
+    '/admin/dashboard',
+    '/admin/orders',
+    '/admin/orders?page=40',
+    '/admin/orders?status=Pending',
+    '/admin/orders?status=Pending&sort=order_date',
+    '/admin/orders?date_from=2024-01-02&date_to=2024-01-02',
+    '/admin/orders?sort=-total_amount&user={customer_id}',
+    '/admin/orders/{order_id}',
+    '/admin/products',
+    '/admin/products?sort=-price&page=3',
+    '/admin/products?category={category_id}',
+    '/admin/products?category={category_id}&sort=price',
+    '/admin/users?sort=email',
+    '/admin/inventory',
+    '/admin/inventory?warehouse={warehouse_id}',
+])
+def test_admin_pages_use_indexes(admin_client, catalog, url):
+    with captured_statements() as statements:
+        assert admin_client.get(url.format(**catalog)).status_code == 200
+    assert_no_full_scans(statements)
+
+
+def test_inventory_update_uses_indexes(admin_client, catalog):
+    with captured_statements() as statements:
+        response = admin_client.post('/admin/inventory/update', data={
+            'warehouse_id': catalog['warehouse_id'], 'product_id': catalog['product_id'], 'quantity': 7})
+        assert response.status_code == 302
+    assert_no_full_scans(statements)
+
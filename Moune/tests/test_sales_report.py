@@ -0,0 +1,64 @@
+# tests/test_sales_report.py
+
+from datetime import datetime
+
+from extensions import db
+from models import User, Category, Cart, CartItem, ProductSalesDaily, CategorySalesDaily
+from checkout import place_order
+from sales_report import rebuild_sales_rollups, sales_summary
+
+
+def buy(username, lines):
+    user = User(username=username, email=f'{username}@example.com', roles='customer', password_hash='unused')
+    db.session.add(user)
+    db.session.flush()
+    cart = Cart(user_id=user.id)
+    db.session.add(cart)
+    db.session.flush()
+    db.session.add_all([CartItem(cart_id=cart.id, product_id=product_id, quantity=quantity)
+                        for product_id, quantity in lines])
+    db.session.commit()
+    return place_order(user.id)
+
+
+def product_sales(product_id):
+    row = ProductSalesDaily.query.filter_by(product_id=product_id, day=datetime.utcnow().date()).first()
+    return (row.units, row.revenue, row.order_count)
+
+
+def test_rollups_follow_checkout_and_status_changes(admin_client, make_products):
+    category = Category(name='Rollup Category')
+    db.session.add(category)
+    db.session.commit()
+    category_id = category.id
+    lamp_id, shade_id = make_products(2, name='Rollup Item', price=[10.0, 2.5], category_id=category_id, stock=[50])
+
+    first = buy('rollup1', [(lamp_id, 2), (shade_id, 4)])
+    buy('rollup2', [(lamp_id, 1)])
+
+    assert product_sales(lamp_id) == (3, 30.0, 2)
+    assert product_sales(shade_id) == (4, 10.0, 1)
+    row = CategorySalesDaily.query.filter_by(category_id=category_id).one()
+    assert (row.units, row.revenue, row.order_count) == (7, 40.0, 2)
+
+    summary = sales_summary(limit=1000)
+    top = {row.product_id: (row.units, row.revenue) for row in summary['top_products']}
+    assert top[lamp_id] == (3, 30.0) and top[shade_id] == (4, 10.0)
+    assert summary['revenue'] >= 40.0
+
+    admin_client.post(f'/admin/orders/{first.id}/update', data={'status': 'Cancelled'})
+    assert product_sales(lamp_id) == (1, 10.0, 1)
+    assert product_sales(shade_id) == (0, 0.0, 0)
+
+    admin_client.post(f'/admin/orders/{first.id}/update', data={'status': 'Processing'})
+    assert product_sales(lamp_id) == (3, 30.0, 2)
+
+    assert admin_client.get('/admin/dashboard').status_code == 200
+
+    # Rebuilding today's rollups from the raw orders lands on the same figures
+    today = datetime.utcnow().date()
+    assert rebuild_sales_rollups(today, today) == 1
+    assert product_sales(lamp_id) == (3, 30.0, 2)
+    assert ProductSalesDaily.query.filter_by(product_id=shade_id).count() == 1
+    row = CategorySalesDaily.query.filter_by(category_id=category_id).one()
+    assert (row.units, row.revenue, row.order_count) == (7, 40.0, 2)
@@ -0,0 +1,47 @@
+# tests/test_search.py
+
+from extensions import db
+from models import Category, Product
+from search import build_match_query, search_catalog
+
+
+def result_names(query, **kwargs):
+    return [product.name for product in search_catalog(query, **kwargs).items]
+
+
+def test_name_matches_rank_above_description_matches(make_products):
+    category = Category(name='Searchable Pottery')
+    db.session.add(category)
+    db.session.commit()
+    mention_id, named_id = make_products(2, name='Glazed Piece', category_id=category.id)
+    db.session.get(Product, mention_id).description = 'Pairs well with a zanzibar teapot.'
+    db.session.get(Product, named_id).name = 'Zanzibar Teapot'
+    db.session.commit()
+
+    assert result_names('zanzib teap') == ['Zanzibar Teapot', 'Glazed Piece 00']  # Every word, as a prefix
+    assert sorted(result_names('searchable pottery')) == ['Glazed Piece 00', 'Zanzibar Teapot']  # Category name
+    page = search_catalog('zanzibar', page=2, per_page=1)
+    assert page.total == 2 and [product.id for product in page.items] == [mention_id] and not page.has_next
+
+
+def test_index_follows_product_and_category_writes(make_products):
+    category = Category(name='Quokka Supplies')
+    db.session.add(category)
+    db.session.commit()
+    product_id, = make_products(1, name='Wombat Brush', category_id=category.id)
+    assert result_names('quokka') == ['Wombat Brush 00']
+
+    category.name = 'Numbat Supplies'
+    db.session.get(Product, product_id).name = 'Wombat Comb'
+    db.session.commit()
+    assert result_names('quokka') == []
+    assert result_names('numbat comb') == ['Wombat Comb']
+
+    db.session.delete(db.session.get(Product, product_id))
+    db.session.commit()
+    assert result_names('numbat') == []
+
+
+def test_match_query_keeps_only_words(app):
+    assert build_match_query('tea "pot" -cup*') == '"tea"* "pot"* "cup"*'
+    assert build_match_query('?!') == '' and search_catalog('?!').total == 0
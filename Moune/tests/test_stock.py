@@ -0,0 +1,65 @@
+# tests/test_stock.py
+
+from extensions import db
+from models import Product, Warehouse, Inventory, ProductStock
+from stock import check_product_stock
+
+
+def rollup(product_id):
+    row = db.session.get(ProductStock, product_id, populate_existing=True)
+    return row.quantity if row else None
+
+
+def test_listeners_follow_inventory_writes(make_products):
+    first, second = make_products(2, name='Stocked Item')
+    warehouses = Warehouse.query.limit(2).all()
+    rows = [Inventory(product_id=first, warehouse_id=warehouse.id, quantity=4) for warehouse in warehouses]
+    db.session.add_all(rows)
+    db.session.commit()
+    assert rollup(first) == 8
+
+    rows[0].quantity = 1
+    db.session.commit()
+    assert rollup(first) == 5
+
+    rows[1].product_id = second  # Moves its stock from one product to the other
+    db.session.commit()
+    assert (rollup(first), rollup(second)) == (1, 4)
+
+    db.session.delete(rows[0])
+    db.session.commit()
+    assert rollup(first) == 0
+    assert [mismatch for mismatch in check_product_stock() if mismatch[0] in (first, second)] == []
+
+
+def test_deleted_products_leave_no_rollup_row(make_products):
+    product_id, = make_products(1, name='Stocked Item', stock=[3])
+    orphaned_id, = make_products(1, name='Stocked Item', stock=[2])
+
+    for row in Inventory.query.filter_by(product_id=product_id):
+        db.session.delete(row)
+    db.session.delete(db.session.get(Product, product_id))
+    db.session.commit()
+    assert rollup(product_id) is None
+
+    # Inventory rows outliving their product (e.g. after a core delete) do not bring the row back
+    db.session.execute(ProductStock.__table__.delete().where(ProductStock.product_id == orphaned_id))
+    db.session.execute(Product.__table__.delete().where(Product.id == orphaned_id))
+    db.session.commit()
+    for row in Inventory.query.filter_by(product_id=orphaned_id):
+        db.session.delete(row)
+    db.session.commit()
+    assert rollup(orphaned_id) is None
+
+
+def test_check_stock_reports_and_rebuilds_drift(app, make_products):
+    product_id, = make_products(1, name='Stocked Item', stock=[7])
+    db.session.execute(ProductStock.__table__.update().where(ProductStock.product_id == product_id).values(quantity=2))
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['check-stock', '--rebuild'])
+    assert f'Product ID {product_id}: rollup 2, inventory 7' in result.output
+    assert 'Rebuilt stock rollup' in result.output
+    assert rollup(product_id) == 7
+    assert '0 mismatched products.' in runner.invoke(args=['check-stock']).output
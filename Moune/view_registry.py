@@ -0,0 +1,31 @@
+# view_registry.py
+
+from flask.cli import AppGroup
+
+# Routes, error handlers and CLI commands declared with decorators at import time and attached
+# to an application by create_app(). Unlike a blueprint, endpoints keep their bare names.
+class ViewRegistry:
+    def __init__(self):
+        self.rules = []  # (rule, endpoint, view function, options)
+        self.error_handlers = []  # (code or exception, handler)
+        self.cli = AppGroup()
+
+    def route(self, rule, endpoint=None, **options):
+        def decorator(f):
+            self.rules.append((rule, endpoint, f, options))
+            return f
+        return decorator
+
+    def errorhandler(self, code_or_exception):
+        def decorator(f):
+            self.error_handlers.append((code_or_exception, f))
+            return f
+        return decorator
+
+    def init_app(self, app):
+        for rule, endpoint, view_func, options in self.rules:
+            app.add_url_rule(rule, endpoint, view_func, **options)
+        for code_or_exception, handler in self.error_handlers:
+            app.register_error_handler(code_or_exception, handler)
+        for command in self.cli.commands.values():
+            app.cli.add_command(command)
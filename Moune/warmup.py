@@ -0,0 +1,27 @@
+# warmup.py
+
+import os
+
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.orm import configure_mappers
+
+from extensions import db
+
+# Compiled templates are kept on disk, so every worker after the first skips Jinja compilation.
+# Must run before app.jinja_env is first used.
+def init_template_cache(app):
+    cache_dir = app.config.get('JINJA_CACHE_DIR')
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(cache_dir)}
+
+# Do the one-off work of a worker's first request at boot: configure the mappers,
+# load every template and open the first pool connections (running the connect pragmas)
+def warm_up(app):
+    configure_mappers()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    with app.app_context():
+        connections = [db.engine.connect() for _ in range(app.config.get('WARM_UP_CONNECTIONS', 0))]
+        for connection in connections:
+            connection.close()